@@ -0,0 +1,43 @@
+"""Add code_counters table for customer/item code allocation
+
+Revision ID: 018
+Revises: 017
+Create Date: 2025-02-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "018"
+down_revision: Union[str, None] = "017"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "code_counters",
+        sa.Column("prefix", sa.String(8), primary_key=True),
+        sa.Column("last_value", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # 기존 최대 코드 번호로 시작값 설정
+    op.execute(
+        sa.text(
+            "INSERT INTO code_counters (prefix, last_value) "
+            "SELECT 'P', COALESCE(MAX(CAST(SUBSTRING(code FROM 2) AS BIGINT)), 0) "
+            "FROM items WHERE code ~ '^P[0-9]+$'"
+        )
+    )
+    op.execute(
+        sa.text(
+            "INSERT INTO code_counters (prefix, last_value) "
+            "SELECT 'C', COALESCE(MAX(CAST(SUBSTRING(code FROM 2) AS BIGINT)), 0) "
+            "FROM customers WHERE code ~ '^C[0-9]+$'"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("code_counters")
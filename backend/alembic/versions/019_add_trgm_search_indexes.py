@@ -0,0 +1,54 @@
+"""Add pg_trgm GIN indexes for customer/item search
+
+Revision ID: 019
+Revises: 018
+Create Date: 2025-02-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "019"
+down_revision: Union[str, None] = "018"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_INDEXES = [
+    ("ix_customers_name_trgm", "customers", "name"),
+    ("ix_customers_code_trgm", "customers", "code"),
+    ("ix_customers_address_trgm", "customers", "address"),
+    ("ix_customers_representative_name_trgm", "customers", "representative_name"),
+    ("ix_items_product_trgm", "items", "product"),
+    ("ix_items_code_trgm", "items", "code"),
+]
+
+
+def upgrade() -> None:
+    # 확장 생성 권한이 없거나 contrib 패키지가 없으면 건너뜀 (검색 API는 rapidfuzz 인메모리 검색으로 폴백)
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        EXCEPTION WHEN insufficient_privilege OR undefined_file OR feature_not_supported THEN
+            RAISE NOTICE 'pg_trgm extension not available, skipping trigram indexes';
+        END $$;
+        """
+    )
+    for name, table, column in TRGM_INDEXES:
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') THEN
+                    CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops);
+                END IF;
+            END $$;
+            """
+        )
+
+
+def downgrade() -> None:
+    for name, _, _ in TRGM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
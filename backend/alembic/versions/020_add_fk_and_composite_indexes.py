@@ -0,0 +1,54 @@
+"""Add foreign-key and composite indexes for hot join paths
+
+Revision ID: 020
+Revises: 019
+Create Date: 2025-02-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "020"
+down_revision: Union[str, None] = "019"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (인덱스명, 테이블, 컬럼) - 루트/스탑은 정렬 순서까지 포함해 ORDER BY 없이 인덱스 순서로 읽음
+INDEXES = [
+    ("ix_routes_plan_id_sequence", "routes", ["plan_id", "sequence", "id"]),
+    ("ix_stops_route_id_sequence", "stops", ["route_id", "sequence", "id"]),
+    ("ix_stops_customer_id", "stops", ["customer_id"]),
+    ("ix_stop_order_items_stop_id", "stop_order_items", ["stop_id"]),
+    ("ix_stop_order_items_item_id", "stop_order_items", ["item_id"]),
+    ("ix_stop_completions_stop_id", "stop_completions", ["stop_id"]),
+    ("ix_stop_completions_completed_by_user_id", "stop_completions", ["completed_by_user_id"]),
+    ("ix_photos_completion_id", "photos", ["completion_id"]),
+    ("ix_route_assignments_driver_id", "route_assignments", ["driver_id"]),
+    ("ix_sessions_user_id", "sessions", ["user_id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    # 같은 루트에 같은 기사 중복 배정 정리 후 유니크 제약 (route_id 선두 → route_id 조회도 이 인덱스 사용)
+    op.execute(
+        sa.text(
+            "DELETE FROM route_assignments a USING route_assignments b "
+            "WHERE a.route_id = b.route_id AND a.driver_id = b.driver_id AND a.id > b.id"
+        )
+    )
+    op.create_index(
+        "uq_route_assignments_route_id_driver_id",
+        "route_assignments",
+        ["route_id", "driver_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_route_assignments_route_id_driver_id", "route_assignments")
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table)
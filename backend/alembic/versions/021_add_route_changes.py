@@ -0,0 +1,114 @@
+"""Add route_changes log filled by triggers for driver delta sync
+
+Revision ID: 021
+Revises: 020
+Create Date: 2025-02-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "021"
+down_revision: Union[str, None] = "020"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 스탑/주문 품목/완료/사진 변경을 루트별로 기록. txid = 변경한 트랜잭션 id (동기화 토큰 비교용).
+# 스탑이 다른 루트로 옮겨지면 이전 루트에는 삭제, 새 루트에는 스탑과 하위 행 전체를 기록.
+FUNCTIONS = """
+CREATE FUNCTION log_route_change(p_route_id integer, p_entity text, p_entity_id integer, p_deleted boolean)
+RETURNS void AS $$
+BEGIN
+    IF p_route_id IS NOT NULL THEN
+        INSERT INTO route_changes (route_id, entity, entity_id, deleted)
+        VALUES (p_route_id, p_entity, p_entity_id, p_deleted);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION route_changes_stops() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM log_route_change(OLD.route_id, 'stop', OLD.id, true);
+        RETURN OLD;
+    END IF;
+    IF TG_OP = 'UPDATE' AND OLD.route_id <> NEW.route_id THEN
+        PERFORM log_route_change(OLD.route_id, 'stop', OLD.id, true);
+        INSERT INTO route_changes (route_id, entity, entity_id, deleted)
+        SELECT NEW.route_id, 'order_item', id, false FROM stop_order_items WHERE stop_id = NEW.id
+        UNION ALL
+        SELECT NEW.route_id, 'completion', id, false FROM stop_completions WHERE stop_id = NEW.id;
+    END IF;
+    PERFORM log_route_change(NEW.route_id, 'stop', NEW.id, false);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION route_changes_stop_children() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') AND (TG_OP = 'DELETE' OR OLD.stop_id <> NEW.stop_id) THEN
+        PERFORM log_route_change((SELECT route_id FROM stops WHERE id = OLD.stop_id), TG_ARGV[0], OLD.id, true);
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    PERFORM log_route_change((SELECT route_id FROM stops WHERE id = NEW.stop_id), TG_ARGV[0], NEW.id, false);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION route_changes_photos() RETURNS trigger AS $$
+DECLARE
+    v_completion_id integer := CASE WHEN TG_OP = 'DELETE' THEN OLD.completion_id ELSE NEW.completion_id END;
+BEGIN
+    -- 사진은 완료 항목의 일부로 전달 (완료가 함께 삭제되는 중이면 기록 안 함)
+    PERFORM log_route_change(
+        (SELECT s.route_id FROM stop_completions c JOIN stops s ON s.id = c.stop_id WHERE c.id = v_completion_id),
+        'completion', v_completion_id, false
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGERS = [
+    ("trg_route_changes_stops", "stops", "route_changes_stops()"),
+    ("trg_route_changes_stop_order_items", "stop_order_items", "route_changes_stop_children('order_item')"),
+    ("trg_route_changes_stop_completions", "stop_completions", "route_changes_stop_children('completion')"),
+    ("trg_route_changes_photos", "photos", "route_changes_photos()"),
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "route_changes",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("route_id", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(16), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column(
+            "txid", sa.BigInteger(), nullable=False,
+            server_default=sa.text("(pg_current_xact_id()::text)::bigint"),
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_route_changes_route_id_txid", "route_changes", ["route_id", "txid"])
+    op.create_index("ix_route_changes_created_at", "route_changes", ["created_at"])
+    op.execute(sa.text(FUNCTIONS))
+    for name, table, function in TRIGGERS:
+        op.execute(sa.text(
+            f"CREATE TRIGGER {name} AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {function}"
+        ))
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(TRIGGERS):
+        op.execute(sa.text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+    for function in ("route_changes_photos", "route_changes_stop_children", "route_changes_stops"):
+        op.execute(sa.text(f"DROP FUNCTION IF EXISTS {function}()"))
+    op.execute(sa.text("DROP FUNCTION IF EXISTS log_route_change(integer, text, integer, boolean)"))
+    op.drop_table("route_changes")
@@ -0,0 +1,31 @@
+"""Add client idempotency keys to stop_completions and photos
+
+Revision ID: 022
+Revises: 021
+Create Date: 2025-02-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "022"
+down_revision: Union[str, None] = "021"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 기사 앱이 만든 키 - 오프라인 재전송/응답 유실 후 재시도를 같은 요청으로 인식
+    op.add_column("stop_completions", sa.Column("client_key", sa.String(64), nullable=True))
+    op.create_index("uq_stop_completions_client_key", "stop_completions", ["client_key"], unique=True)
+    op.add_column("photos", sa.Column("client_key", sa.String(80), nullable=True))
+    op.create_index("uq_photos_client_key", "photos", ["client_key"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_photos_client_key", "photos")
+    op.drop_column("photos", "client_key")
+    op.drop_index("uq_stop_completions_client_key", "stop_completions")
+    op.drop_column("stop_completions", "client_key")
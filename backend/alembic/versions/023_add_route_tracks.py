@@ -0,0 +1,40 @@
+"""Add route_tracks table for compressed driver GPS breadcrumbs
+
+Revision ID: 023
+Revises: 022
+Create Date: 2025-02-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "023"
+down_revision: Union[str, None] = "022"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 수신 묶음 1건 = 1행 (단순화 후 델타 인코딩 + zlib, 약 수십 바이트/묶음)
+    op.create_table(
+        "route_tracks",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("route_id", sa.Integer(), sa.ForeignKey("routes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("driver_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("point_count", sa.Integer(), nullable=False),
+        sa.Column("raw_count", sa.Integer(), nullable=False),
+        sa.Column("points", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_route_tracks_route_id_ended_at", "route_tracks", ["route_id", "ended_at"])
+    op.create_index("ix_route_tracks_created_at", "route_tracks", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_route_tracks_created_at", "route_tracks")
+    op.drop_index("ix_route_tracks_route_id_ended_at", "route_tracks")
+    op.drop_table("route_tracks")
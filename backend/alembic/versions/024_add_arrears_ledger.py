@@ -0,0 +1,75 @@
+"""Add append-only arrears ledger with running balances
+
+Revision ID: 024
+Revises: 023
+Create Date: 2025-02-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "024"
+down_revision: Union[str, None] = "023"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 원장은 추가만 - 수정은 스탑 삭제로 stop_id가 NULL이 되는 경우만 허용 (삭제는 거래처 삭제 시 CASCADE)
+APPEND_ONLY = """
+CREATE FUNCTION arrears_ledger_append_only() RETURNS trigger AS $$
+BEGIN
+    IF NEW.stop_id IS NULL AND OLD.stop_id IS NOT NULL
+       AND (NEW.id, NEW.customer_id, NEW.kind, NEW.amount, NEW.balance, NEW.user_id, NEW.memo, NEW.posted_at)
+           IS NOT DISTINCT FROM
+           (OLD.id, OLD.customer_id, OLD.kind, OLD.amount, OLD.balance, OLD.user_id, OLD.memo, OLD.posted_at) THEN
+        RETURN NEW;
+    END IF;
+    RAISE EXCEPTION 'arrears_ledger is append-only';
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER arrears_ledger_append_only BEFORE UPDATE ON arrears_ledger
+    FOR EACH ROW EXECUTE FUNCTION arrears_ledger_append_only();
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        "arrears_ledger",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("customer_id", sa.Integer(), sa.ForeignKey("customers.id", ondelete="CASCADE"), nullable=False),
+        sa.Column(
+            "kind", sa.Enum("CHARGE", "PAYMENT", "ADJUSTMENT", "IMPORT", name="arrears_kind"), nullable=False
+        ),
+        sa.Column("amount", sa.Numeric(14, 2), nullable=False),
+        sa.Column("balance", sa.Numeric(14, 2), nullable=False),
+        sa.Column("stop_id", sa.Integer(), sa.ForeignKey("stops.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("memo", sa.String(256), nullable=True),
+        sa.Column(
+            "posted_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("clock_timestamp()")
+        ),
+    )
+    # 기준 시각 잔액 = (customer_id, posted_at) 역순 첫 행
+    op.create_index("ix_arrears_ledger_customer_id_posted_at", "arrears_ledger", ["customer_id", "posted_at"])
+    op.create_index(
+        "uq_arrears_ledger_charge_stop_id", "arrears_ledger", ["stop_id"],
+        unique=True, postgresql_where=sa.text("kind = 'CHARGE'"),
+    )
+    op.execute(APPEND_ONLY)
+    # 기존 미수금은 이월 1건으로 (customers.arrears는 현재 잔액 캐시로 유지)
+    op.execute(
+        "INSERT INTO arrears_ledger (customer_id, kind, amount, balance, memo) "
+        "SELECT id, 'IMPORT', arrears, arrears, '원장 도입 전 미수금 이월' FROM customers "
+        "WHERE arrears IS NOT NULL AND arrears <> 0 ORDER BY id"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER arrears_ledger_append_only ON arrears_ledger")
+    op.execute("DROP FUNCTION arrears_ledger_append_only()")
+    op.drop_index("uq_arrears_ledger_charge_stop_id", "arrears_ledger")
+    op.drop_index("ix_arrears_ledger_customer_id_posted_at", "arrears_ledger")
+    op.drop_table("arrears_ledger")
+    sa.Enum(name="arrears_kind").drop(op.get_bind())
@@ -0,0 +1,39 @@
+"""Make stop completion unique per stop
+
+Revision ID: 025
+Revises: 024
+Create Date: 2025-03-04
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "025"
+down_revision: Union[str, None] = "024"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 동시 탭으로 중복 완료된 스탑: 가장 먼저 완료된 것만 남기고 사진은 그쪽으로 옮김
+    op.execute("""
+        CREATE TEMP TABLE dup_completions ON COMMIT DROP AS
+        SELECT id, first_value(id) OVER (PARTITION BY stop_id ORDER BY completed_at, id) AS keep_id
+        FROM stop_completions
+    """)
+    op.execute("""
+        UPDATE photos p SET completion_id = d.keep_id
+        FROM dup_completions d WHERE p.completion_id = d.id AND d.id <> d.keep_id
+    """)
+    op.execute("""
+        DELETE FROM stop_completions c
+        USING dup_completions d WHERE c.id = d.id AND d.id <> d.keep_id
+    """)
+    op.drop_index("ix_stop_completions_stop_id", "stop_completions")
+    op.create_index("uq_stop_completions_stop_id", "stop_completions", ["stop_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_stop_completions_stop_id", "stop_completions")
+    op.create_index("ix_stop_completions_stop_id", "stop_completions", ["stop_id"])
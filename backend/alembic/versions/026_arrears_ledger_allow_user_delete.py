@@ -0,0 +1,53 @@
+"""Allow user deletion to null arrears ledger user_id
+
+Revision ID: 026
+Revises: 025
+Create Date: 2025-03-11
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "026"
+down_revision: Union[str, None] = "025"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 원장은 추가만 - 스탑/사용자 삭제로 stop_id/user_id가 NULL이 되는 경우만 허용
+APPEND_ONLY = """
+CREATE OR REPLACE FUNCTION arrears_ledger_append_only() RETURNS trigger AS $$
+BEGIN
+    IF (NEW.stop_id IS NOT DISTINCT FROM OLD.stop_id OR NEW.stop_id IS NULL)
+       AND (NEW.user_id IS NOT DISTINCT FROM OLD.user_id OR NEW.user_id IS NULL)
+       AND (NEW.id, NEW.customer_id, NEW.kind, NEW.amount, NEW.balance, NEW.memo, NEW.posted_at)
+           IS NOT DISTINCT FROM
+           (OLD.id, OLD.customer_id, OLD.kind, OLD.amount, OLD.balance, OLD.memo, OLD.posted_at) THEN
+        RETURN NEW;
+    END IF;
+    RAISE EXCEPTION 'arrears_ledger is append-only';
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+STOP_ONLY = """
+CREATE OR REPLACE FUNCTION arrears_ledger_append_only() RETURNS trigger AS $$
+BEGIN
+    IF NEW.stop_id IS NULL AND OLD.stop_id IS NOT NULL
+       AND (NEW.id, NEW.customer_id, NEW.kind, NEW.amount, NEW.balance, NEW.user_id, NEW.memo, NEW.posted_at)
+           IS NOT DISTINCT FROM
+           (OLD.id, OLD.customer_id, OLD.kind, OLD.amount, OLD.balance, OLD.user_id, OLD.memo, OLD.posted_at) THEN
+        RETURN NEW;
+    END IF;
+    RAISE EXCEPTION 'arrears_ledger is append-only';
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.execute(APPEND_ONLY)
+
+
+def downgrade() -> None:
+    op.execute(STOP_ONLY)
@@ -1,5 +1,5 @@
 """인증 API - 로그인/로그아웃/회원가입"""
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -9,7 +9,8 @@ from app.core.auth import (
     clear_session_cookie,
     require_user,
 )
-from app.core.security import hash_password, verify_password
+from app.core.login_limit import login_slot
+from app.core.security import hash_password_pooled, verify_password_pooled
 from app.database import get_db
 from app.models import User
 from app.models.user import Role
@@ -43,7 +44,7 @@ def signup(
     preferred_locale = (data.preferred_locale or "").strip() or "대한민국"
     user = User(
         username=data.username,
-        password_hash=hash_password(data.password),
+        password_hash=hash_password_pooled(data.password),
         role=Role.DRIVER,
         display_name=data.display_name,
         phone=data.phone,
@@ -59,14 +60,16 @@ def signup(
 @router.post("/login")
 def login(
     data: LoginRequest,
+    request: Request,
     response: Response,
     db: Session = Depends(get_db),
 ):
-    """로그인 - 성공 시 HttpOnly 쿠키 설정"""
-    stmt = select(User).where(User.username == data.username)
-    user = db.execute(stmt).scalar_one_or_none()
-    if not user or not verify_password(data.password, user.password_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="아이디 또는 비밀번호가 잘못되었습니다")
+    """로그인 - 성공 시 HttpOnly 쿠키 설정. 비밀번호 검증은 프로세스 풀에서, IP별 동시 처리 수 제한."""
+    with login_slot(request):
+        stmt = select(User).where(User.username == data.username)
+        user = db.execute(stmt).scalar_one_or_none()
+        if not user or not verify_password_pooled(data.password, user.password_hash):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="아이디 또는 비밀번호가 잘못되었습니다")
     session_id = create_session(db, user)
     set_session_cookie(response, session_id)
     return {"ok": True, "user": UserResponse.model_validate(user)}
@@ -92,8 +95,8 @@ def change_password(
     current_user: User = Depends(require_user),
 ):
     """로그인 사용자가 본인 비밀번호 변경 (임시 비밀번호 사용 시 필수)"""
-    if not verify_password(data.current_password, current_user.password_hash):
+    if not verify_password_pooled(data.current_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="현재 비밀번호가 일치하지 않습니다")
-    current_user.password_hash = hash_password(data.new_password)
+    current_user.password_hash = hash_password_pooled(data.new_password)
     current_user.must_change_password = False
     db.commit()
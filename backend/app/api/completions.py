@@ -1,17 +1,31 @@
-"""기사 완료/사진 업로드 - DRIVER는 배정된 스탑만 완료 가능"""
+"""
+기사 완료/사진 업로드 - DRIVER는 배정된 스탑만 완료 가능.
+Idempotency-Key(기사 앱이 만든 키)를 주면 같은 키의 재요청은 처음 결과를 그대로 돌려준다 (오프라인 재전송/응답 유실 대비).
+"""
 import uuid
+from datetime import datetime, timezone
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Response, UploadFile, status
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 
-from app.api.stops import add_arrears_for_completed_stop
+from app.api.plans import publish_route_event
 from app.config import get_settings
 from app.core.auth import require_user
 from app.core.route_access import require_route_access
 from app.database import get_db
 from app.models import User, Stop, StopCompletion, Photo, Route, StopOrderItem
-from app.schemas.completion import CompletionCreate, CompletionResponse, PhotoResponse
+from app.services.arrears import charge_completed_stop
+from app.schemas.completion import (
+    CLIENT_KEY_MAX,
+    CompletionReplayRequest,
+    CompletionReplayResult,
+    CompletionResponse,
+    PhotoResponse,
+)
 
 router = APIRouter(prefix="/api/completions", tags=["completions"])
 
@@ -29,40 +43,134 @@ def _get_stop_with_route(db: Session, stop_id: int) -> Stop | None:
     )
 
 
+def _client_key(value: str | None) -> str | None:
+    if value is not None and not 0 < len(value) <= CLIENT_KEY_MAX:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key는 1~{CLIENT_KEY_MAX}자여야 합니다")
+    return value
+
+
+def _complete(
+    db: Session,
+    stop: Stop,
+    user: User,
+    memo: str | None,
+    client_key: str | None,
+    completed_at: datetime | None = None,
+) -> tuple[StopCompletion, bool]:
+    """
+    완료 처리 (커밋은 호출자가). 같은 키로 이미 처리되었으면 그 완료를 돌려준다. 반환: (완료, 새로 만들었는지)
+    스탑당 완료는 unique 색인 + INSERT ... ON CONFLICT DO NOTHING으로 하나만 생기고, 미수금 청구는 삽입한 요청만 한다.
+    동시에 들어온 요청은 먼저 넣은 쪽이 커밋할 때까지 기다린 뒤 아무것도 넣지 않는다.
+    """
+    if client_key:
+        existing = _completion_by_key(db, stop, client_key)
+        if existing:
+            return existing, False
+    if stop.completions:
+        raise HTTPException(status_code=400, detail="이미 완료된 스탑입니다")
+    now = datetime.now(timezone.utc)
+    if completed_at is not None and completed_at.tzinfo is None:
+        completed_at = completed_at.replace(tzinfo=timezone.utc)
+    with db.begin_nested():
+        completion_id = db.execute(
+            pg_insert(StopCompletion)
+            .values(
+                stop_id=stop.id,
+                completed_by_user_id=user.id,
+                memo=memo,
+                client_key=client_key,
+                completed_at=min(completed_at, now) if completed_at else now,
+            )
+            .on_conflict_do_nothing()
+            .returning(StopCompletion.id)
+        ).scalar()
+        if completion_id is not None:
+            charge_completed_stop(db, stop, user.id)
+            publish_route_event(db, stop.route, "stop_completed", stop_id=stop.id)
+    db.expire(stop, ["completions"])
+    if completion_id is None:
+        # 동시 요청이 먼저 완료 - 같은 키면 그 결과, 아니면 중복 완료
+        existing = _completion_by_key(db, stop, client_key) if client_key else None
+        if existing:
+            return existing, False
+        raise HTTPException(status_code=400, detail="이미 완료된 스탑입니다")
+    return db.get(StopCompletion, completion_id), True
+
+
+def _completion_by_key(db: Session, stop: Stop, client_key: str) -> StopCompletion | None:
+    existing = db.execute(select(StopCompletion).where(StopCompletion.client_key == client_key)).scalar()
+    if existing and existing.stop_id != stop.id:
+        raise HTTPException(status_code=409, detail="다른 스탑에 이미 사용된 키입니다")
+    return existing
+
+
 @router.post("/stop/{stop_id}", response_model=CompletionResponse, status_code=status.HTTP_201_CREATED)
 async def complete_stop(
     stop_id: int,
+    response: Response,
     memo: str | None = Form(None),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
 ):
-    """스탑 완료 처리 - 기사는 배정된 루트의 스탑만 완료 가능"""
+    """스탑 완료 처리 - 기사는 배정된 루트의 스탑만 완료 가능. 같은 Idempotency-Key 재요청은 200 + 처음 결과."""
+    client_key = _client_key(idempotency_key)
     stop = _get_stop_with_route(db, stop_id)
     if not stop:
         raise HTTPException(status_code=404, detail="스탑을 찾을 수 없습니다")
     require_route_access(current_user, stop.route)
-    if stop.completions:
-        raise HTTPException(status_code=400, detail="이미 완료된 스탑입니다")
-    completion = StopCompletion(
-        stop_id=stop_id,
-        completed_by_user_id=current_user.id,
-        memo=memo,
-    )
-    db.add(completion)
-    add_arrears_for_completed_stop(db, stop)
+    completion, created = _complete(db, stop, current_user, memo, client_key)
     db.commit()
     db.refresh(completion)
+    if not created:
+        response.status_code = status.HTTP_200_OK
     return completion
 
 
+@router.post("/replay", response_model=list[CompletionReplayResult])
+def replay_completions(
+    data: CompletionReplayRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """
+    오프라인 중 쌓인 완료 처리를 한 번에 반영 - 항목별 결과(created/duplicate/error) 반환.
+    실패한 항목만 되돌리고 나머지는 함께 커밋. 사진은 완료 반영 후 Idempotency-Key로 따로 업로드.
+    """
+    results = []
+    for item in data.items:
+        try:
+            stop = _get_stop_with_route(db, item.stop_id)
+            if not stop:
+                raise HTTPException(status_code=404, detail="스탑을 찾을 수 없습니다")
+            require_route_access(current_user, stop.route)
+            completion, created = _complete(db, stop, current_user, item.memo, item.client_key, item.completed_at)
+        except HTTPException as e:
+            results.append(CompletionReplayResult(
+                client_key=item.client_key, stop_id=item.stop_id, status="error",
+                status_code=e.status_code, detail=str(e.detail),
+            ))
+            continue
+        results.append(CompletionReplayResult(
+            client_key=item.client_key, stop_id=item.stop_id,
+            status="created" if created else "duplicate",
+            status_code=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            completion=CompletionResponse.model_validate(completion),
+        ))
+    db.commit()
+    return results
+
+
 @router.post("/stop/{stop_id}/photos", response_model=list[PhotoResponse])
 async def upload_photos(
     stop_id: int,
     files: list[UploadFile] = File(...),
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
 ):
-    """완료 사진 업로드 - 먼저 complete_stop 호출 필요"""
+    """완료 사진 업로드 - 먼저 complete_stop 호출 필요. Idempotency-Key가 같으면 이미 저장된 파일은 다시 저장하지 않음."""
+    client_key = _client_key(idempotency_key)
     stop = _get_stop_with_route(db, stop_id)
     if not stop:
         raise HTTPException(status_code=404, detail="스탑을 찾을 수 없습니다")
@@ -70,12 +178,18 @@ async def upload_photos(
     completion = stop.completions[0] if stop.completions else None
     if not completion:
         raise HTTPException(status_code=400, detail="먼저 스탑을 완료해 주세요")
+    keys = [f"{client_key}:{i}" if client_key else None for i in range(len(files))]
+    existing = _photos_by_key(db, keys)
     settings = get_settings()
     upload_path = Path(settings.upload_dir)
     upload_path.mkdir(parents=True, exist_ok=True)
     allowed = {"image/jpeg", "image/png", "image/webp"}
     photos = []
-    for f in files:
+    written = []
+    for f, key in zip(files, keys):
+        if key in existing:
+            photos.append(existing[key])
+            continue
         if f.content_type not in allowed:
             raise HTTPException(status_code=400, detail=f"{f.filename}: 이미지 파일만 업로드 가능합니다")
         ext = Path(f.filename or "img").suffix or ".jpg"
@@ -88,16 +202,32 @@ async def upload_photos(
         if len(content) > 10 * 1024 * 1024:
             raise HTTPException(status_code=400, detail=f"{f.filename}: 10MB 이하여야 합니다")
         filepath.write_bytes(content)
+        written.append(filepath)
         stored = str(Path(rel) / name)
-        photo = Photo(completion_id=completion.id, file_path=stored, filename=f.filename)
+        photo = Photo(completion_id=completion.id, file_path=stored, filename=f.filename, client_key=key)
         db.add(photo)
         photos.append(photo)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 같은 키의 업로드가 동시에 들어온 경우 - 먼저 저장된 쪽 결과
+        db.rollback()
+        for path in written:
+            path.unlink(missing_ok=True)
+        existing = _photos_by_key(db, keys)
+        return [existing[k] for k in keys if k in existing]
     for p in photos:
         db.refresh(p)
     return photos
 
 
+def _photos_by_key(db: Session, keys: list[str | None]) -> dict[str, Photo]:
+    keys = [k for k in keys if k]
+    if not keys:
+        return {}
+    return {p.client_key: p for p in db.execute(select(Photo).where(Photo.client_key.in_(keys))).scalars()}
+
+
 @router.get("/stop/{stop_id}", response_model=CompletionResponse | None)
 def get_completion(
     stop_id: int,
@@ -1,18 +1,28 @@
 """거래처 CRUD - ADMIN 전용"""
+import base64
+import hashlib
 import io
+import json
 import re
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import StreamingResponse
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, or_, select, tuple_
 from sqlalchemy.orm import Session
-from openpyxl import Workbook, load_workbook
+from openpyxl import load_workbook
 
 from app.core.auth import require_user, require_role
-from app.core.security import verify_password
+from app.core.responses import ORJSONResponse, row_dicts, schema_columns
+from app.core.security import verify_password_pooled
 from app.database import get_db
 from app.models import (
-    AppSetting,
+    ArrearsEntry,
+    ArrearsKind,
     Customer,
     Item,
     Photo,
@@ -26,12 +36,28 @@ from app.models import (
 )
 from app.config import get_settings
 from app.models.user import Role
-from app.schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
+from app.schemas.customer import (
+    ArrearsAdjustmentCreate,
+    ArrearsBalanceResponse,
+    ArrearsEntryResponse,
+    ArrearsLedgerResponse,
+    ArrearsPaymentCreate,
+    ContractType,
+    CustomerCreate,
+    CustomerResponse,
+    CustomerUpdate,
+)
 from app.services.contract_match import (
     contract_items_to_display_string,
     match_contract_content,
 )
+from app.services.app_settings import get_company_settings
+from app.services.arrears import balance_as_of, day_end, ledger_page, post_entry, set_balance
+from app.services.code_allocator import CUSTOMER_CODE, CodeAllocator
+from app.services.distance_matrix import refresh_customers
+from app.services.export import csv_response, iter_rows, xlsx_response
 from app.services.geocode import maybe_geocode_and_update
+from app.services.search import like_escape, table_version
 
 
 class DeleteAllRequest(BaseModel):
@@ -43,19 +69,6 @@ RequireAdmin = Depends(require_role(Role.ADMIN))
 EXCEL_HEADERS = ["코드", "루트", "이름", "사업자번호", "대표", "계약", "업태", "종목", "미수금액", "계약내용", "주소"]
 
 
-def _get_delivery_route_count(db: Session) -> int:
-    """설정의 배달 루트 개수"""
-    row = db.execute(
-        select(AppSetting).where(AppSetting.key == "delivery_route_count")
-    ).scalars().first()
-    if not row:
-        return 5
-    try:
-        return int(row.value)
-    except (ValueError, TypeError):
-        return 5
-
-
 def _normalize_route(route_raw: str | None, max_routes: int) -> str | None:
     """루트 텍스트를 N호차 형식으로 정규화. "1", "1호" -> "1호차" """
     if not route_raw or not str(route_raw).strip():
@@ -80,26 +93,115 @@ def _parse_float(val: object) -> float | None:
         return None
 
 
-def _generate_customer_code(db: Session, exclude: set[str] | None = None) -> str:
-    """다음 사용 가능한 거래처 코드 생성 (C0001, C0002, ...)"""
-    exclude = exclude or set()
-    stmt = select(Customer.code).where(Customer.code.isnot(None))
-    existing = {r for r in db.execute(stmt).scalars().all() if r[0]}
-    used = existing | exclude
-    n = 1
-    while f"C{n:04d}" in used:
-        n += 1
-    return f"C{n:04d}"
-
-
 @router.get("", response_model=list[CustomerResponse])
 def list_customers(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    stmt = select(Customer).order_by(Customer.name)
-    return list(db.execute(stmt).scalars().all())
+    stmt = select(*schema_columns(Customer, CustomerResponse)).order_by(Customer.name)
+    return ORJSONResponse(row_dicts(db.execute(stmt)))
+
+
+PAGE_SORT_COLUMNS = {
+    "name": Customer.name,
+    "code": func.coalesce(Customer.code, ""),
+    "route": func.coalesce(Customer.route, ""),
+    "arrears": func.coalesce(Customer.arrears, 0),
+}
+PAGE_FIELDS = frozenset(CustomerResponse.model_fields)
+PAGE_DEFAULT_FIELDS = ("id", "code", "route", "name", "contract", "arrears", "address", "latitude", "longitude")
+
+
+def _encode_cursor(sort_value: object, customer_id: int) -> str:
+    raw = json.dumps([str(sort_value) if isinstance(sort_value, Decimal) else sort_value, customer_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple[object, int]:
+    try:
+        value, customer_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (Decimal(value) if sort == "arrears" else str(value)), int(customer_id)
+    except (ValueError, TypeError, InvalidOperation):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다")
+
+
+@router.get("/page")
+def list_customers_page(
+    request: Request,
+    route: str | None = Query(None, description="루트 (예: 1호차)"),
+    contract: ContractType | None = Query(None),
+    arrears_min: Decimal | None = Query(None),
+    arrears_max: Decimal | None = Query(None),
+    q: str | None = Query(None, description="코드/상호/루트/주소/대표/사업자번호/계약내용/업태/종목 검색"),
+    sort: Literal["name", "code", "route", "arrears"] = Query("name"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None, description="이전 응답의 next_cursor"),
+    fields: str | None = Query(None, description="쉼표 구분 필드 목록 (id는 항상 포함)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """거래처 목록 (keyset 페이지네이션, 서버 필터/정렬, 필드 선택, ETag)"""
+    selected = ["id"]
+    for f in (fields.split(",") if fields else PAGE_DEFAULT_FIELDS):
+        f = f.strip()
+        if f and f != "id":
+            if f not in PAGE_FIELDS:
+                raise HTTPException(status_code=400, detail=f"알 수 없는 필드: {f}")
+            selected.append(f)
+
+    etag = 'W/"' + hashlib.sha1(
+        f"{table_version(db, Customer)}|{request.url.query}".encode()
+    ).hexdigest() + '"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+
+    sort_expr = PAGE_SORT_COLUMNS[sort]
+    stmt = select(*[getattr(Customer, f) for f in selected], sort_expr.label("_sort"))
+    if route:
+        stmt = stmt.where(Customer.route == route)
+    if contract:
+        stmt = stmt.where(Customer.contract == contract)
+    if arrears_min is not None:
+        stmt = stmt.where(func.coalesce(Customer.arrears, 0) >= arrears_min)
+    if arrears_max is not None:
+        stmt = stmt.where(func.coalesce(Customer.arrears, 0) <= arrears_max)
+    if q and q.strip():
+        pattern = f"%{like_escape(q.strip())}%"
+        cols = [
+            Customer.code,
+            Customer.name,
+            Customer.route,
+            Customer.address,
+            Customer.representative_name,
+            Customer.business_registration_number,
+            Customer.contract_content,
+            Customer.business_type,
+            Customer.business_category,
+        ]
+        stmt = stmt.where(or_(*[c.ilike(pattern, escape="\\") for c in cols]))
+    if cursor:
+        value, last_id = _decode_cursor(cursor, sort)
+        key = tuple_(sort_expr, Customer.id)
+        stmt = stmt.where(key > tuple_(value, last_id) if order == "asc" else key < tuple_(value, last_id))
+    if order == "asc":
+        stmt = stmt.order_by(sort_expr.asc(), Customer.id.asc())
+    else:
+        stmt = stmt.order_by(sort_expr.desc(), Customer.id.desc())
+    rows = db.execute(stmt.limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]._sort, rows[-1].id)
+    items = [{f: getattr(r, f) for f in selected} for r in rows]
+    return JSONResponse(
+        jsonable_encoder({"items": items, "next_cursor": next_cursor}),
+        headers=cache_headers,
+    )
 
 
 @router.post("", response_model=CustomerResponse, status_code=status.HTTP_201_CREATED)
@@ -111,7 +213,7 @@ def create_customer(
 ):
     dump = data.model_dump()
     if not dump.get("code") or not str(dump["code"]).strip():
-        dump["code"] = _generate_customer_code(db)
+        dump["code"] = CodeAllocator(db, CUSTOMER_CODE, reuse_gaps=True).next()
     else:
         existing = db.execute(select(Customer).where(Customer.code == data.code)).scalar_one_or_none()
         if existing:
@@ -126,10 +228,15 @@ def create_customer(
     if lat is not None and lon is not None:
         dump["latitude"] = lat
         dump["longitude"] = lon
+    arrears = dump.pop("arrears", None)
     customer = Customer(**dump)
     db.add(customer)
+    db.flush()
+    if arrears:
+        set_balance(db, customer.id, arrears, ArrearsKind.ADJUSTMENT, user_id=current_user.id, memo="거래처 등록")
     db.commit()
     db.refresh(customer)
+    refresh_customers(db, [customer.id])
     return customer
 
 
@@ -151,41 +258,54 @@ def match_contract_content_api(
     return {"matches": matches, "display_string": display_str}
 
 
+def _customer_export_rows():
+    stmt = select(
+        Customer.code,
+        Customer.route,
+        Customer.name,
+        Customer.business_registration_number,
+        Customer.representative_name,
+        Customer.contract,
+        Customer.business_type,
+        Customer.business_category,
+        Customer.arrears,
+        Customer.contract_content,
+        Customer.address,
+    ).order_by(Customer.name)
+    return iter_rows(
+        stmt,
+        lambda r: [
+            r.code or "",
+            r.route or "",
+            r.name or "",
+            r.business_registration_number or "",
+            r.representative_name or "",
+            r.contract or "",
+            r.business_type or "",
+            r.business_category or "",
+            int(r.arrears) if r.arrears is not None else "",
+            r.contract_content or "",
+            r.address or "",
+        ],
+    )
+
+
 @router.get("/export/excel")
 def export_customers_excel(
-    db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    """거래처 목록을 Excel 파일로 다운로드"""
-    stmt = select(Customer).order_by(Customer.name)
-    customers = list(db.execute(stmt).scalars().all())
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "거래처"
-    ws.append(EXCEL_HEADERS)
-    for c in customers:
-        ws.append([
-            c.code or "",
-            c.route or "",
-            c.name or "",
-            c.business_registration_number or "",
-            c.representative_name or "",
-            c.contract or "",
-            c.business_type or "",
-            c.business_category or "",
-            int(c.arrears) if c.arrears is not None else "",
-            c.contract_content or "",
-            c.address or "",
-        ])
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=customers.xlsx"},
-    )
+    """거래처 목록을 Excel 파일로 다운로드 (write-only 스트리밍)"""
+    return xlsx_response("customers.xlsx", "거래처", EXCEL_HEADERS, _customer_export_rows())
+
+
+@router.get("/export/csv")
+def export_customers_csv(
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """거래처 목록을 CSV 파일로 다운로드 (대용량용)"""
+    return csv_response("customers.csv", EXCEL_HEADERS, _customer_export_rows())
 
 
 @router.post("/import/excel")
@@ -208,8 +328,9 @@ def import_customers_excel(
         created = 0
         updated = 0
         errors = []
-        used_codes: set[str] = set()
-        max_routes = _get_delivery_route_count(db)
+        # 신규 거래처 코드는 빈 번호부터 블록 단위로 확보 (행마다 전체 코드 조회하지 않음)
+        code_allocator = CodeAllocator(db, CUSTOMER_CODE, reuse_gaps=True, block_size=50)
+        max_routes = get_company_settings(db).delivery_route_count
         for i, row in enumerate(rows):
             if not row or all(cell is None or str(cell).strip() == "" for cell in row):
                 continue
@@ -310,7 +431,7 @@ def import_customers_excel(
                 if business_category is not None:
                     existing.business_category = business_category or None
                 if arrears_val is not None:
-                    existing.arrears = arrears_val
+                    set_balance(db, existing.id, arrears_val, ArrearsKind.IMPORT, user_id=current_user.id, memo="엑셀 가져오기")
                 if contract_content is not None:
                     existing.contract_content = contract_content or None
                 existing.address = address or existing.address
@@ -333,9 +454,7 @@ def import_customers_excel(
                         existing.longitude = lon
                 updated += 1
                 continue
-            code = code_val if code_val else _generate_customer_code(db, exclude=used_codes)
-            if not code_val:
-                used_codes.add(code)
+            code = code_val if code_val else code_allocator.next()
             if address and latitude is None and longitude is None:
                 _settings = get_settings()
                 lat, lon = maybe_geocode_and_update(
@@ -358,11 +477,14 @@ def import_customers_excel(
                 representative_name=representative_name or None,
                 business_type=business_type or None,
                 business_category=business_category or None,
-                arrears=arrears_val,
             )
             db.add(customer)
+            if arrears_val:
+                db.flush()
+                post_entry(db, customer.id, ArrearsKind.IMPORT, arrears_val, user_id=current_user.id, memo="엑셀 가져오기")
             created += 1
         db.commit()
+        refresh_customers(db)
         msg_parts = []
         if created:
             msg_parts.append(f"{created}건 등록")
@@ -387,7 +509,7 @@ def delete_all_customers(
 ):
     """거래처 전체 삭제 - admin 비밀번호 확인 후 모든 DB 데이터 삭제"""
     admin = db.execute(select(User).where(User.username == "admin")).scalars().first()
-    if not admin or not verify_password(data.password, admin.password_hash):
+    if not admin or not verify_password_pooled(data.password, admin.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="관리자 비밀번호가 올바르지 않습니다")
     try:
         db.execute(delete(Photo))
@@ -397,6 +519,7 @@ def delete_all_customers(
         db.execute(delete(RouteAssignment))
         db.execute(delete(Route))
         db.execute(delete(Plan))
+        db.execute(delete(ArrearsEntry))
         db.execute(delete(Customer))
         db.execute(delete(Item))
         db.commit()
@@ -430,7 +553,10 @@ def update_customer(
     customer = db.get(Customer, customer_id)
     if not customer:
         raise HTTPException(status_code=404, detail="거래처를 찾을 수 없습니다")
-    for k, v in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(exclude_unset=True)
+    if "arrears" in changes:
+        set_balance(db, customer.id, changes.pop("arrears") or 0, ArrearsKind.ADJUSTMENT, user_id=current_user.id)
+    for k, v in changes.items():
         if k not in ("name", "code"):
             setattr(customer, k, v)
     if customer.address and (customer.latitude is None or customer.longitude is None):
@@ -446,9 +572,77 @@ def update_customer(
             customer.longitude = lon
     db.commit()
     db.refresh(customer)
+    refresh_customers(db, [customer.id])
     return customer
 
 
+def _get_customer_or_404(db: Session, customer_id: int) -> Customer:
+    customer = db.get(Customer, customer_id)
+    if not customer:
+        raise HTTPException(status_code=404, detail="거래처를 찾을 수 없습니다")
+    return customer
+
+
+@router.get("/{customer_id}/arrears", response_model=ArrearsLedgerResponse)
+def get_arrears_ledger(
+    customer_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    before_id: int | None = Query(None, description="이전 페이지 next_before_id"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """미수금 원장 (최근 순) + 현재 잔액"""
+    customer = _get_customer_or_404(db, customer_id)
+    entries = ledger_page(db, customer_id, limit + 1, before_id)
+    next_before_id = entries[limit - 1].id if len(entries) > limit else None
+    return {"balance": customer.arrears or 0, "entries": entries[:limit], "next_before_id": next_before_id}
+
+
+@router.get("/{customer_id}/arrears/balance", response_model=ArrearsBalanceResponse)
+def get_arrears_balance(
+    customer_id: int,
+    as_of: date = Query(..., description="이 날짜 마감 기준"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    _get_customer_or_404(db, customer_id)
+    return {"as_of": as_of, "balance": balance_as_of(db, customer_id, day_end(as_of))}
+
+
+@router.post("/{customer_id}/arrears/payments", response_model=ArrearsEntryResponse, status_code=status.HTTP_201_CREATED)
+def post_arrears_payment(
+    customer_id: int,
+    data: ArrearsPaymentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """미수금 변제 (잔액 차감)"""
+    _get_customer_or_404(db, customer_id)
+    entry = post_entry(db, customer_id, ArrearsKind.PAYMENT, -data.amount, user_id=current_user.id, memo=data.memo)
+    db.commit()
+    return entry
+
+
+@router.post("/{customer_id}/arrears/adjustments", response_model=ArrearsEntryResponse, status_code=status.HTTP_201_CREATED)
+def post_arrears_adjustment(
+    customer_id: int,
+    data: ArrearsAdjustmentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """미수금 수동 증감"""
+    _get_customer_or_404(db, customer_id)
+    if data.amount == 0:
+        raise HTTPException(status_code=400, detail="증감액이 0입니다")
+    entry = post_entry(db, customer_id, ArrearsKind.ADJUSTMENT, data.amount, user_id=current_user.id, memo=data.memo)
+    db.commit()
+    return entry
+
+
 @router.delete("/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_customer(
     customer_id: int,
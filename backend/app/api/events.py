@@ -0,0 +1,58 @@
+"""실시간 배송 현황 (Server-Sent Events) - ADMIN 전용. 루트 시작/스탑 완료/기사 배정 변경을 바로 전달."""
+import asyncio
+import json
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core.auth import require_user, require_role
+from app.database import get_db
+from app.models import Plan, User
+from app.models.user import Role
+from app.services.live_events import Subscription, hub
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+RequireAdmin = Depends(require_role(Role.ADMIN))
+
+HEARTBEAT_SECONDS = 15.0  # 프록시 유휴 타임아웃 방지용 주석 줄
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+async def _stream(sub: Subscription):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    finally:
+        hub.unsubscribe(sub)
+
+
+@router.get("/plan/{plan_id}")
+async def plan_events(
+    plan_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """플랜 한 개의 이벤트 스트림 (route_started / stop_completed / assignment_changed / position / resync)"""
+    if not db.get(Plan, plan_id):
+        raise HTTPException(status_code=404, detail="플랜을 찾을 수 없습니다")
+    sub = hub.subscribe(lambda e: e.get("plan_id") == plan_id)
+    return StreamingResponse(_stream(sub), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/today")
+async def today_events(
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """오늘 날짜 플랜 전체의 이벤트 스트림"""
+    sub = hub.subscribe(lambda e: e.get("plan_date") == date.today().isoformat())
+    return StreamingResponse(_stream(sub), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -3,16 +3,18 @@ import io
 from decimal import Decimal, InvalidOperation
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import StreamingResponse
-from sqlalchemy import select, text
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from openpyxl import Workbook, load_workbook
+from openpyxl import load_workbook
 
 from app.core.auth import require_user, require_role
+from app.core.responses import ORJSONResponse, row_dicts, schema_columns
 from app.database import get_db
 from app.models import User, Item
 from app.models.user import Role
-from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
+from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse, normalize_item_row
+from app.services.code_allocator import ITEM_CODE, CodeAllocator
+from app.services.export import csv_response, iter_rows, xlsx_response
 
 router = APIRouter(prefix="/api/items", tags=["items"])
 RequireAdmin = Depends(require_role(Role.ADMIN))
@@ -20,26 +22,14 @@ RequireAdmin = Depends(require_role(Role.ADMIN))
 EXCEL_HEADERS = ["코드", "상품", "단위", "단가", "설명"]
 
 
-def _generate_item_code(db: Session) -> str:
-    """P00001, P00002 형식의 다음 품목 코드 생성"""
-    row = db.execute(
-        text(
-            "SELECT COALESCE(MAX(CAST(SUBSTRING(code FROM 2) AS INTEGER)), 0) + 1 AS n "
-            "FROM items WHERE code ~ '^P[0-9]+$'"
-        )
-    ).fetchone()
-    n = row[0] if row else 1
-    return f"P{n:05d}"
-
-
 @router.get("", response_model=list[ItemResponse])
 def list_items(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    stmt = select(Item).order_by(Item.product)
-    return list(db.execute(stmt).scalars().all())
+    stmt = select(*schema_columns(Item, ItemResponse)).order_by(Item.product)
+    return ORJSONResponse([normalize_item_row(r) for r in row_dicts(db.execute(stmt))])
 
 
 @router.post("", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
@@ -49,7 +39,7 @@ def create_item(
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    code = _generate_item_code(db)
+    code = CodeAllocator(db, ITEM_CODE).next()
     item = Item(code=code, **data.model_dump())
     db.add(item)
     db.commit()
@@ -57,35 +47,36 @@ def create_item(
     return item
 
 
+def _item_export_rows():
+    stmt = select(Item.code, Item.product, Item.unit, Item.unit_price, Item.description).order_by(Item.product)
+    return iter_rows(
+        stmt,
+        lambda r: [
+            r.code or "",
+            r.product or "",
+            r.unit or "박스",
+            int(r.unit_price) if r.unit_price is not None else "",
+            r.description or "",
+        ],
+    )
+
+
 @router.get("/export/excel")
 def export_items_excel(
-    db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    """품목 목록을 Excel 파일로 다운로드"""
-    stmt = select(Item).order_by(Item.product)
-    items = list(db.execute(stmt).scalars().all())
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "품목"
-    ws.append(EXCEL_HEADERS)
-    for i in items:
-        ws.append([
-            i.code or "",
-            i.product or "",
-            i.unit or "박스",
-            int(i.unit_price) if i.unit_price is not None else "",
-            i.description or "",
-        ])
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=items.xlsx"},
-    )
+    """품목 목록을 Excel 파일로 다운로드 (write-only 스트리밍)"""
+    return xlsx_response("items.xlsx", "품목", EXCEL_HEADERS, _item_export_rows())
+
+
+@router.get("/export/csv")
+def export_items_csv(
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """품목 목록을 CSV 파일로 다운로드 (대용량용)"""
+    return csv_response("items.csv", EXCEL_HEADERS, _item_export_rows())
 
 
 @router.post("/import/excel")
@@ -108,6 +99,8 @@ def import_items_excel(
         created = 0
         updated = 0
         errors = []
+        # 신규 품목 코드는 카운터에서 블록 단위로 확보, 남은 번호는 커밋 전 반환
+        code_allocator = CodeAllocator(db, ITEM_CODE, block_size=50)
         for i, row in enumerate(rows):
             if not row or all(cell is None or str(cell).strip() == "" for cell in row):
                 continue
@@ -151,7 +144,7 @@ def import_items_excel(
                     existing.description = desc_val or None
                 updated += 1
             else:
-                code = _generate_item_code(db)
+                code = code_allocator.next()
                 item = Item(
                     code=code,
                     product=product_val,
@@ -161,6 +154,7 @@ def import_items_excel(
                 )
                 db.add(item)
                 created += 1
+        code_allocator.release()
         db.commit()
         msg_parts = []
         if created:
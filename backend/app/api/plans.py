@@ -1,6 +1,6 @@
 """플랜 CRUD - ADMIN 생성/수정, DRIVER는 배정된 플랜만 조회"""
 from collections import defaultdict
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
@@ -9,35 +9,24 @@ from sqlalchemy import distinct, func, select
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.auth import require_user, require_role
+from app.core.responses import ORJSONResponse, row_dicts, schema_columns
 from app.database import get_db
 from app.models import User, Plan, Route, RouteAssignment, Stop, StopOrderItem, Item, Customer, StopCompletion
 from app.models.user import Role
 from app.schemas.plan import PlanCreate, PlanListResponse, PlanUpdate, PlanResponse
 from app.services.contract_match import contract_items_to_display_string, match_contract_content
+from app.services.eta import Prediction, route_etas
+from app.services.live_events import publish
 
 router = APIRouter(prefix="/api/plans", tags=["plans"])
 RequireAdmin = Depends(require_role(Role.ADMIN))
 
 
-def _get_plan_delivery_status(db: Session, plan_id: int) -> str:
-    """플랜의 배송 상태: 배송전 / 배송중(k/n) / 배송완료"""
-    total = db.execute(
-        select(func.count(Stop.id))
-        .select_from(Stop)
-        .join(Route, Stop.route_id == Route.id)
-        .where(Route.plan_id == plan_id)
-    ).scalar() or 0
+def _route_status(total: int, completed: int, started: bool) -> str:
     if total == 0:
         return "배송전"
-    completed = db.execute(
-        select(func.count(distinct(Stop.id)))
-        .select_from(Stop)
-        .join(Route, Stop.route_id == Route.id)
-        .join(StopCompletion, Stop.id == StopCompletion.stop_id)
-        .where(Route.plan_id == plan_id)
-    ).scalar() or 0
     if completed == 0:
-        return "배송전"
+        return "배송시작" if started else "배송전"
     if completed >= total:
         return "배송완료"
     return f"배송중({completed}/{total})"
@@ -56,31 +45,58 @@ def _get_route_delivery_status(db: Session, route_id: int, route: Route | None =
         .join(StopCompletion, Stop.id == StopCompletion.stop_id)
         .where(Stop.route_id == route_id)
     ).scalar() or 0
+    started = False
     if completed == 0:
         r = route or db.get(Route, route_id)
-        if r and r.started_at:
-            return "배송시작"
-        return "배송전"
-    if completed >= total:
-        return "배송완료"
-    return f"배송중({completed}/{total})"
-
-
-def _get_plan_route_delivery_statuses(db: Session, plan_id: int) -> str:
-    """플랜의 루트별 배송상태 문자열: 1호차: 배송전, 2호차: 배송중(1/N), 3호차: 배송완료"""
-    routes = list(
-        db.scalars(
-            select(Route).where(Route.plan_id == plan_id).order_by(Route.sequence.asc(), Route.id.asc())
-        ).all()
-    )
-    if not routes:
-        return _get_plan_delivery_status(db, plan_id)
-    parts = []
-    for route in routes:
-        label = (route.name or str(route.id)).strip() or f"루트{route.id}"
-        status = _get_route_delivery_status(db, route.id, route)
-        parts.append(f"{label}: {status}")
-    return ", ".join(parts)
+        started = bool(r and r.started_at)
+    return _route_status(total, completed, started)
+
+
+def _eta_summary(predictions: list[Prediction]) -> dict:
+    """다음 스탑 도착 / 마지막 스탑 완료 예상 시각 (남은 스탑이 없거나 출발 전이면 None)"""
+    if not predictions:
+        return {"next_eta": None, "finish_eta": None}
+    return {"next_eta": predictions[0].arrival, "finish_eta": predictions[-1].done}
+
+
+def publish_route_event(db: Session, route: Route, event_type: str, **extra) -> None:
+    """관리자 실시간 현황용 루트 이벤트 발행 (커밋 시 전달) - 바뀐 배송 상태와 다시 계산한 ETA 포함"""
+    plan = db.get(Plan, route.plan_id)
+    etas = route_etas(db, [route])[route.id]
+    publish(db, {
+        "type": event_type,
+        "plan_id": route.plan_id,
+        "plan_date": plan.plan_date.isoformat() if plan else None,
+        "route_id": route.id,
+        "route_label": (route.name or str(route.id)).strip() or f"루트{route.id}",
+        "delivery_status": _get_route_delivery_status(db, route.id, route),
+        **{k: v.isoformat() if v else None for k, v in _eta_summary(etas).items()},
+        **extra,
+    })
+
+
+def _plan_route_statuses(db: Session, plan_ids: list[int]) -> dict[int, str]:
+    """플랜별 루트 배송상태 문자열 (1호차: 배송전, 2호차: 배송중(1/N), 3호차: 배송완료) - 루트/스탑 집계 한 번"""
+    completed = select(StopCompletion.id).where(StopCompletion.stop_id == Stop.id).exists()
+    rows = db.execute(
+        select(
+            Route.id,
+            Route.plan_id,
+            Route.name,
+            Route.started_at,
+            func.count(Stop.id).label("total"),
+            func.count(Stop.id).filter(completed).label("completed"),
+        )
+        .outerjoin(Stop, Stop.route_id == Route.id)
+        .where(Route.plan_id.in_(plan_ids))
+        .group_by(Route.id)
+        .order_by(Route.plan_id, Route.sequence.asc(), Route.id.asc())
+    ).all()
+    parts: dict[int, list[str]] = defaultdict(list)
+    for r in rows:
+        label = (r.name or str(r.id)).strip() or f"루트{r.id}"
+        parts[r.plan_id].append(f"{label}: {_route_status(r.total, r.completed, r.started_at is not None)}")
+    return {plan_id: ", ".join(p) for plan_id, p in parts.items()}
 
 
 def _auto_assign_drivers_by_department(db: Session, plan_id: int) -> None:
@@ -108,26 +124,27 @@ def _auto_assign_drivers_by_department(db: Session, plan_id: int) -> None:
     db.flush()
 
 
-def _get_plan_delivery_summary(db: Session, plan_id: int) -> tuple[str, int]:
-    """플랜의 배달 수량(곱슬이 10박스, ...), 일일매출(원) 반환"""
+def _plan_delivery_summaries(db: Session, plan_ids: list[int]) -> dict[int, tuple[str, int]]:
+    """플랜별 배달 수량(곱슬이 10박스, ...), 일일매출(원) - 주문 라인 조회 한 번"""
     stmt = (
-        select(Item.product, Item.unit, StopOrderItem.quantity, Item.unit_price)
+        select(Route.plan_id, Item.product, Item.unit, StopOrderItem.quantity, Item.unit_price)
         .select_from(StopOrderItem)
         .join(Item, StopOrderItem.item_id == Item.id)
         .join(Stop, StopOrderItem.stop_id == Stop.id)
         .join(Route, Stop.route_id == Route.id)
-        .where(Route.plan_id == plan_id)
+        .where(Route.plan_id.in_(plan_ids))
     )
-    rows = db.execute(stmt).all()
-    agg: dict[tuple[str, str], float] = defaultdict(float)
-    daily_sales = 0
-    for product, unit, qty, price in rows:
-        key = (product or "", unit or "박스")
-        agg[key] += float(qty)
+    agg: dict[int, dict[tuple[str, str], float]] = defaultdict(lambda: defaultdict(float))
+    daily_sales: dict[int, int] = defaultdict(int)
+    for plan_id, product, unit, qty, price in db.execute(stmt):
+        agg[plan_id][(product or "", unit or "박스")] += float(qty)
         if price is not None:
-            daily_sales += int(float(qty) * float(price))
-    parts = [f"{p} {int(q) if q == int(q) else q}{u}" for (p, u), q in sorted(agg.items())]
-    return ", ".join(parts), daily_sales
+            daily_sales[plan_id] += int(float(qty) * float(price))
+    summaries = {}
+    for plan_id, items in agg.items():
+        parts = [f"{p} {int(q) if q == int(q) else q}{u}" for (p, u), q in sorted(items.items())]
+        summaries[plan_id] = (", ".join(parts), daily_sales[plan_id])
+    return summaries
 
 
 @router.get("", response_model=list[PlanListResponse])
@@ -137,7 +154,8 @@ def list_plans(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
 ):
-    stmt = select(Plan).order_by(Plan.plan_date.desc(), Plan.id.desc())
+    """플랜 목록 - 배달 수량/매출/배송상태는 플랜 전체를 한 번에 집계 (플랜별 조회 없음)"""
+    stmt = select(*schema_columns(Plan, PlanResponse)).order_by(Plan.plan_date.desc(), Plan.id.desc())
     if from_date:
         stmt = stmt.where(Plan.plan_date >= from_date)
     if to_date:
@@ -146,24 +164,14 @@ def list_plans(
         stmt = stmt.join(Plan.routes).join(Route.assignments).where(
             RouteAssignment.driver_id == current_user.id
         )
-    plans = list(db.execute(stmt).scalars().unique().all())
-    result = []
+    plans = row_dicts(db.execute(stmt.distinct()))
+    plan_ids = [p["id"] for p in plans]
+    summaries = _plan_delivery_summaries(db, plan_ids)
+    statuses = _plan_route_statuses(db, plan_ids)
     for p in plans:
-        delivery_qty, daily_sales = _get_plan_delivery_summary(db, p.id)
-        delivery_status = _get_plan_route_delivery_statuses(db, p.id)
-        result.append(
-            PlanListResponse(
-                id=p.id,
-                plan_date=p.plan_date,
-                route=p.route,
-                name=p.name,
-                memo=p.memo,
-                delivery_quantity=delivery_qty,
-                daily_sales=daily_sales,
-                delivery_status=delivery_status,
-            )
-        )
-    return result
+        p["delivery_quantity"], p["daily_sales"] = summaries.get(p["id"], ("", 0))
+        p["delivery_status"] = statuses.get(p["id"], "배송전")
+    return ORJSONResponse(plans)
 
 
 @router.post("", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
@@ -403,6 +411,8 @@ class RouteWithAssignment(BaseModel):
     sequence: int
     assignments: list[dict] = []
     delivery_status: str = ""
+    next_eta: datetime | None = None  # 다음 스탑 도착 예상
+    finish_eta: datetime | None = None  # 마지막 스탑 완료 예상
     model_config = {"from_attributes": True}
 
 
@@ -467,6 +477,7 @@ def get_plan_detail(
                         "driver_name": (d.display_name or d.username) if d else "",
                     }
 
+    etas = route_etas(db, plan.routes)
     routes_data = []
     for r in sorted(plan.routes, key=lambda x: (x.sequence, x.id)):
         assignments = [
@@ -482,6 +493,7 @@ def get_plan_detail(
                 sequence=r.sequence,
                 assignments=assignments,
                 delivery_status=route_status,
+                **_eta_summary(etas[r.id]),
             )
         )
 
@@ -1,71 +1,143 @@
-"""월말 정산 리포트 PDF - ADMIN 전용"""
-from datetime import date
-from typing import Annotated
+"""월말 정산 리포트 / 거래처별 명세 (PDF, Excel, CSV) - ADMIN 전용"""
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy import select
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
 
 from app.core.auth import require_user, require_role
 from app.database import get_db
-from app.models import User, StopCompletion, Stop, Route, Plan, Customer
+from app.models import User
 from app.models.user import Role
-from app.services.report import generate_monthly_report_pdf
+from app.services import report_jobs
+from app.services.export import csv_response, session_rows, xlsx_response
+from app.services.report_data import (
+    ITEM_TOTAL_HEADERS,
+    STATEMENT_HEADERS,
+    finish_item_totals,
+    item_total_export_rows,
+    item_totals,
+    iter_customer_statements,
+    month_range,
+    statement_export_rows,
+)
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 RequireAdmin = Depends(require_role(Role.ADMIN))
 
+Year = Annotated[int, Query(ge=2020, le=2100)]
+Month = Annotated[int, Query(ge=1, le=12)]
+
+
+_DOWNLOAD_PATHS = {
+    report_jobs.REPORT_MONTHLY: "/api/reports/monthly/pdf",
+    report_jobs.REPORT_STATEMENTS: "/api/reports/monthly/statements",
+}
+
+
+def _job_response(key: report_jobs.ReportKey, state: dict) -> dict:
+    year, month = key.period.split("-")
+    query = f"year={int(year)}&month={int(month)}"
+    if key.report_type == report_jobs.REPORT_STATEMENTS:
+        query += "&format=pdf"
+    state["download_url"] = f"{_DOWNLOAD_PATHS[key.report_type]}?{query}"
+    return state
+
+
+def _cached_pdf(key: report_jobs.ReportKey, filename: str) -> FileResponse:
+    try:
+        path = report_jobs.wait(key)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"리포트 생성 실패: {e}") from e
+    return FileResponse(path, media_type="application/pdf", filename=filename)
+
+
+@router.post("/monthly", status_code=202)
+def start_monthly_report(
+    year: Year,
+    month: Month,
+    report_type: Annotated[
+        Literal["monthly", "statements"], Query(alias="type", description="monthly: 정산, statements: 거래처 명세")
+    ] = "monthly",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """리포트 PDF 생성 시작 (캐시에 있으면 바로 done). 진행 상황은 /jobs/{job_id}로 조회."""
+    key = report_jobs.monthly_key(db, year, month, report_type)
+    report_jobs.submit(key)
+    return _job_response(key, report_jobs.status(key))
+
+
+@router.get("/jobs/{job_id}")
+def report_job_status(
+    job_id: str,
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """리포트 생성 작업 상태 (status: queued/running/done/failed, progress: phase/done/total)"""
+    key = report_jobs.parse_job_id(job_id)
+    state = report_jobs.status(key) if key else None
+    if state is None:
+        raise HTTPException(status_code=404, detail="리포트 작업을 찾을 수 없습니다")
+    return _job_response(key, state)
+
 
 @router.get("/monthly/pdf")
 def monthly_report_pdf(
-    year: Annotated[int, Query(ge=2020, le=2100)],
-    month: Annotated[int, Query(ge=1, le=12)],
+    year: Year,
+    month: Month,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """월말 정산 리포트 PDF 다운로드 (캐시 적중 시 바로, 아니면 렌더링 완료까지 대기)"""
+    key = report_jobs.monthly_key(db, year, month)
+    db.close()  # 렌더링 대기 중 커넥션을 붙잡지 않음
+    return _cached_pdf(key, f"monthly_report_{year}{month:02d}.pdf")
+
+
+@router.get("/monthly/statements")
+def monthly_statements(
+    year: Year,
+    month: Month,
+    format: Literal["json", "xlsx", "csv", "pdf"] = "json",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """거래처별 월 명세 (품목별 수량/공급가액/세액, 당월 합계, 현재 미수금). 집계 쿼리 1회."""
+    start, end = month_range(year, month)
+    name = f"statements_{year}{month:02d}"
+    if format == "json":
+        acc: dict = {}
+        statements = list(iter_customer_statements(db, start, end, acc))
+        return {"statements": statements, "items": finish_item_totals(acc)}
+    if format == "pdf":
+        key = report_jobs.monthly_key(db, year, month, report_jobs.REPORT_STATEMENTS)
+        db.close()
+        return _cached_pdf(key, f"{name}.pdf")
+    rows = session_rows(lambda s: statement_export_rows(s, start, end))
+    if format == "xlsx":
+        return xlsx_response(f"{name}.xlsx", "거래처명세", STATEMENT_HEADERS, rows)
+    return csv_response(f"{name}.csv", STATEMENT_HEADERS, rows)
+
+
+@router.get("/monthly/items")
+def monthly_item_totals(
+    year: Year,
+    month: Month,
+    format: Literal["json", "xlsx", "csv"] = "json",
     db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    """월말 정산 리포트 PDF 다운로드"""
-    from datetime import date as date_type
-    from calendar import monthrange
-
-    start = date_type(year, month, 1)
-    _, last = monthrange(year, month)
-    end = date_type(year, month, last)
-
-    stmt = (
-        select(StopCompletion, Stop, Route, Plan, Customer)
-        .join(Stop, StopCompletion.stop_id == Stop.id)
-        .join(Route, Stop.route_id == Route.id)
-        .join(Plan, Route.plan_id == Plan.id)
-        .join(Customer, Stop.customer_id == Customer.id)
-        .where(Plan.plan_date >= start, Plan.plan_date <= end)
-        .order_by(Plan.plan_date, Route.sequence, Stop.sequence)
-    )
-    rows = db.execute(stmt).all()
-
-    completions = []
-    driver_counts: dict[str, dict] = {}
-    for comp, stop, route, plan, customer in rows:
-        driver_name = "미확인"
-        if comp.completed_by_user_id:
-            u = db.get(User, comp.completed_by_user_id)
-            driver_name = u.display_name or u.username if u else "미확인"
-        completions.append({
-            "plan_date": plan.plan_date,
-            "route_name": route.name,
-            "customer_name": customer.name,
-            "driver_name": driver_name,
-            "completed_at": comp.completed_at,
-        })
-        if driver_name not in driver_counts:
-            driver_counts[driver_name] = {"count": 0, "memo": ""}
-        driver_counts[driver_name]["count"] += 1
-
-    buf = generate_monthly_report_pdf(start, end, completions, driver_counts)
-    filename = f"monthly_report_{year}{month:02d}.pdf"
-    return StreamingResponse(
-        buf,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    """품목별 월 합계 (수량, 거래처 수, 공급가액, 세액)"""
+    start, end = month_range(year, month)
+    name = f"item_totals_{year}{month:02d}"
+    if format == "json":
+        return {"items": item_totals(db, start, end)}
+    rows = session_rows(lambda s: item_total_export_rows(s, start, end))
+    if format == "xlsx":
+        return xlsx_response(f"{name}.xlsx", "품목별합계", ITEM_TOTAL_HEADERS, rows)
+    return csv_response(f"{name}.csv", ITEM_TOTAL_HEADERS, rows)
@@ -2,14 +2,29 @@
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
+from app.api.plans import publish_route_event
 from app.core.auth import require_user, require_role
+from app.core.depot import require_depot
 from app.core.route_access import require_route_access
 from app.database import get_db
-from app.models import User, Route, Plan, RouteAssignment
+from app.models import User, Route, Plan, RouteAssignment, Stop
 from app.models.user import Role
-from app.schemas.route import RouteCreate, RouteUpdate, RouteResponse, RouteAssignmentCreate, RouteAssignmentSet
+from app.schemas.route import (
+    PartitionApply,
+    PartitionRequest,
+    PartitionResponse,
+    RouteAssignmentCreate,
+    RouteAssignmentSet,
+    RouteCreate,
+    RouteResponse,
+    RouteUpdate,
+)
+from app.services.distance_matrix import get_distance_matrix
+from app.services.route_partition import load_plan_stops, propose_partition
+from app.services.stop_order import set_stop_order
 
 router = APIRouter(prefix="/api/routes", tags=["routes"])
 RequireAdmin = Depends(require_role(Role.ADMIN))
@@ -19,6 +34,13 @@ def _get_route_with_assignments(db: Session, route_id: int) -> Route | None:
     return db.get(Route, route_id, options=[joinedload(Route.assignments)])
 
 
+def _publish_assignment(db: Session, route: Route) -> None:
+    driver_ids = db.execute(
+        select(RouteAssignment.driver_id).where(RouteAssignment.route_id == route.id).order_by(RouteAssignment.id)
+    ).scalars().all()
+    publish_route_event(db, route, "assignment_changed", driver_ids=list(driver_ids))
+
+
 @router.get("/plan/{plan_id}", response_model=list[RouteResponse])
 def list_routes_by_plan(
     plan_id: int,
@@ -54,6 +76,72 @@ def create_route(
     return route
 
 
+@router.post("/plan/{plan_id}/partition", response_model=PartitionResponse)
+def propose_plan_partition(
+    plan_id: int,
+    data: PartitionRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """
+    플랜 스탑을 호차(루트)별로 다시 나누고 순서까지 제안 (저장하지 않음).
+    좌표 + 적재량(수량 x 품목 무게) + 용량/균형 기준. 출발한 루트와 배송완료 스탑은 그대로.
+    """
+    if not db.get(Plan, plan_id):
+        raise HTTPException(status_code=404, detail="플랜을 찾을 수 없습니다")
+    depot = require_depot(db, data.depot_latitude, data.depot_longitude)
+    routes, stops = load_plan_stops(db, plan_id)
+    if not routes:
+        raise HTTPException(status_code=400, detail="플랜에 루트가 없습니다")
+    return propose_partition(
+        depot, routes, stops, data.capacity, data.balance, data.time_budget_ms / 1000,
+        distances=get_distance_matrix().submatrix,
+    )
+
+
+@router.put("/plan/{plan_id}/partition", status_code=status.HTTP_204_NO_CONTENT)
+def apply_plan_partition(
+    plan_id: int,
+    data: PartitionApply,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """
+    분배 제안 수락 - 루트별 stop_ids 순서대로 스탑의 루트/순서 저장.
+    출발하지 않은 루트(와 요청에 포함된 루트)의 스탑은 빠짐없이 지정해야 한다 (남은 스탑과 순서가 겹치지 않도록).
+    """
+    routes = {r.id: r for r in db.execute(select(Route).where(Route.plan_id == plan_id)).scalars()}
+    if not routes:
+        raise HTTPException(status_code=404, detail="플랜을 찾을 수 없습니다")
+    stops = dict(db.execute(
+        select(Stop.id, Stop.route_id).join(Route).where(Route.plan_id == plan_id).with_for_update(of=Stop)
+    ).tuples().all())
+    seen: set[int] = set()
+    assignments = []
+    for assignment in data.routes:
+        route = routes.get(assignment.route_id)
+        if route is None:
+            raise HTTPException(status_code=400, detail=f"루트 ID {assignment.route_id}가 이 플랜에 없습니다")
+        for seq, stop_id in enumerate(assignment.stop_ids):
+            current_route_id = stops.get(stop_id)
+            if current_route_id is None or stop_id in seen:
+                raise HTTPException(status_code=400, detail=f"스탑 ID {stop_id}를 찾을 수 없거나 중복되었습니다")
+            if current_route_id != route.id and (route.started_at or routes[current_route_id].started_at):
+                raise HTTPException(status_code=400, detail="이미 출발한 루트의 스탑은 옮길 수 없습니다")
+            seen.add(stop_id)
+            assignments.append((stop_id, route.id, seq))
+    mentioned = {a.route_id for a in data.routes}
+    if any(
+        stop_id not in seen and (routes[route_id].started_at is None or route_id in mentioned)
+        for stop_id, route_id in stops.items()
+    ):
+        raise HTTPException(status_code=400, detail="출발하지 않은 루트의 모든 스탑을 포함해야 합니다")
+    set_stop_order(db, assignments)
+    db.commit()
+
+
 @router.get("/{route_id}", response_model=RouteResponse)
 def get_route(
     route_id: int,
@@ -101,6 +189,8 @@ def assign_driver(
         return
     assignment = RouteAssignment(route_id=route_id, driver_id=data.driver_id)
     db.add(assignment)
+    db.flush()
+    _publish_assignment(db, route)
     db.commit()
 
 
@@ -120,6 +210,8 @@ def set_route_driver(
     db.execute(delete(RouteAssignment).where(RouteAssignment.route_id == route_id))
     if data and data.driver_id:
         db.add(RouteAssignment(route_id=route_id, driver_id=data.driver_id))
+    db.flush()
+    _publish_assignment(db, route)
     db.commit()
 
 
@@ -135,6 +227,8 @@ def start_route(
         raise HTTPException(status_code=404, detail="루트를 찾을 수 없습니다")
     require_route_access(current_user, route)
     route.started_at = datetime.now(timezone.utc)
+    db.flush()
+    publish_route_event(db, route, "route_started")
     db.commit()
 
 
@@ -151,6 +245,9 @@ def unassign_driver(
         RouteAssignment.route_id == route_id,
         RouteAssignment.driver_id == driver_id,
     ))
+    route = db.get(Route, route_id)
+    if route:
+        _publish_assignment(db, route)
     db.commit()
 
 
@@ -0,0 +1,35 @@
+"""거래처/품목 검색 API (플랜 편집 자동완성용) - ADMIN 전용"""
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.auth import require_user, require_role
+from app.database import get_db
+from app.models import User
+from app.models.user import Role
+from app.services.search import CUSTOMER_TARGET, ITEM_TARGET, search
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+RequireAdmin = Depends(require_role(Role.ADMIN))
+
+
+@router.get("")
+def search_api(
+    q: str = Query(..., min_length=1, max_length=64),
+    target: Literal["all", "customer", "item"] = Query("all", alias="type"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """
+    상위 limit건을 유사도 순으로 반환. highlights는 필드별 일치 구간 [start, end) 목록.
+    engine: pg_trgm (인덱스 검색) 또는 rapidfuzz (확장 미설치 시 인메모리 폴백)
+    """
+    result: dict = {"customers": [], "items": [], "engine": "none"}
+    if target in ("all", "customer"):
+        result["customers"], result["engine"] = search(db, CUSTOMER_TARGET, q, limit)
+    if target in ("all", "item"):
+        result["items"], result["engine"] = search(db, ITEM_TARGET, q, limit)
+    return result
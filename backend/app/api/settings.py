@@ -1,31 +1,19 @@
 """앱 설정 API - ADMIN 전용"""
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, Field
-from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.core.auth import require_user, require_role
 from app.database import get_db
-from app.models import User, AppSetting
+from app.models import User
 from app.models.user import Role
+from app.services.app_settings import get_company_settings, invalidate_company_settings, save_company_settings
 from app.services.geocode import geocode_address
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 RequireAdmin = Depends(require_role(Role.ADMIN))
 
-COMPANY_NAME_KEY = "company_name"
-COMPANY_ADDRESS_KEY = "company_address"
-COMPANY_PHONE_KEY = "company_phone"
-DELIVERY_ROUTE_COUNT_KEY = "delivery_route_count"
-BUSINESS_REGISTRATION_NUMBER_KEY = "business_registration_number"
-REPRESENTATIVE_NAME_KEY = "representative_name"
-BUSINESS_TYPE_KEY = "business_type"
-BUSINESS_CATEGORY_KEY = "business_category"
-BANK_NAME_KEY = "bank_name"
-BANK_ACCOUNT_KEY = "bank_account"
-BANK_HOLDER_KEY = "bank_holder"
-
 
 class SettingsResponse(BaseModel):
     company_name: str = ""
@@ -55,27 +43,16 @@ class SettingsUpdate(BaseModel):
     bank_holder: str | None = Field(None, max_length=64)
 
 
-def _get_str_setting(db: Session, key: str, default: str = "") -> str:
-    row = db.execute(select(AppSetting).where(AppSetting.key == key)).scalars().first()
-    return row.value if row else default
-
+def _geocode_company(address: str) -> tuple[float | None, float | None]:
+    lat, lon = geocode_address(address.strip(), get_settings().kakao_rest_api_key or "")
+    if lat is None or lon is None:
+        return None, None
+    return float(lat), float(lon)
 
-def _get_int_setting(db: Session, key: str, default: int) -> int:
-    row = db.execute(select(AppSetting).where(AppSetting.key == key)).scalars().first()
-    if not row:
-        return default
-    try:
-        return int(row.value)
-    except (ValueError, TypeError):
-        return default
 
-
-def _set_setting(db: Session, key: str, value: str) -> None:
-    row = db.execute(select(AppSetting).where(AppSetting.key == key)).scalars().first()
-    if row:
-        row.value = value
-    else:
-        db.add(AppSetting(key=key, value=value))
+def _settings_response(db: Session) -> SettingsResponse:
+    company = get_company_settings(db)
+    return SettingsResponse(**{k: getattr(company, k) for k in SettingsResponse.model_fields})
 
 
 @router.get("/geocode")
@@ -104,12 +81,19 @@ def get_company_location(
     _: User = RequireAdmin,
 ):
     """회사 주소를 지오코딩하여 위도/경도 반환 (맵 출발지용)"""
-    addr = _get_str_setting(db, COMPANY_ADDRESS_KEY)
+    company = get_company_settings(db)
+    if company.company_latitude is not None and company.company_longitude is not None:
+        return {"latitude": company.company_latitude, "longitude": company.company_longitude}
+    addr = company.company_address
     if not addr or not addr.strip():
         return {"latitude": None, "longitude": None}
-    settings = get_settings()
-    lat, lon = geocode_address(addr.strip(), settings.kakao_rest_api_key or "")
-    return {"latitude": float(lat) if lat is not None else None, "longitude": float(lon) if lon is not None else None}
+    lat, lon = _geocode_company(addr)
+    if lat is not None:
+        # 저장해 두고 이후에는 외부 API 없이 사용
+        save_company_settings(db, {"company_latitude": lat, "company_longitude": lon})
+        db.commit()
+        invalidate_company_settings()
+    return {"latitude": lat, "longitude": lon}
 
 
 @router.get("", response_model=SettingsResponse)
@@ -119,19 +103,7 @@ def get_settings_api(
     _: User = RequireAdmin,
 ):
     """설정 조회 (GET /api/settings - get_settings와 이름 충돌 방지를 위해 get_settings_api 사용)"""
-    return SettingsResponse(
-        company_name=_get_str_setting(db, COMPANY_NAME_KEY),
-        company_address=_get_str_setting(db, COMPANY_ADDRESS_KEY),
-        company_phone=_get_str_setting(db, COMPANY_PHONE_KEY),
-        delivery_route_count=_get_int_setting(db, DELIVERY_ROUTE_COUNT_KEY, 5),
-        business_registration_number=_get_str_setting(db, BUSINESS_REGISTRATION_NUMBER_KEY),
-        representative_name=_get_str_setting(db, REPRESENTATIVE_NAME_KEY),
-        business_type=_get_str_setting(db, BUSINESS_TYPE_KEY),
-        business_category=_get_str_setting(db, BUSINESS_CATEGORY_KEY),
-        bank_name=_get_str_setting(db, BANK_NAME_KEY),
-        bank_account=_get_str_setting(db, BANK_ACCOUNT_KEY),
-        bank_holder=_get_str_setting(db, BANK_HOLDER_KEY),
-    )
+    return _settings_response(db)
 
 
 @router.patch("", response_model=SettingsResponse)
@@ -141,41 +113,17 @@ def update_settings(
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    """설정 수정"""
+    """설정 수정 - 버전을 올려 다른 워커의 설정 스냅샷도 갱신되게 함"""
+    values = {}
     for k, v in data.model_dump(exclude_unset=True).items():
-        if k == "delivery_route_count":
-            _set_setting(db, DELIVERY_ROUTE_COUNT_KEY, str(v))
-        elif k == "company_name":
-            _set_setting(db, COMPANY_NAME_KEY, v or "")
-        elif k == "company_address":
-            _set_setting(db, COMPANY_ADDRESS_KEY, v or "")
-        elif k == "company_phone":
-            _set_setting(db, COMPANY_PHONE_KEY, v or "")
-        elif k == "business_registration_number":
-            _set_setting(db, BUSINESS_REGISTRATION_NUMBER_KEY, v or "")
-        elif k == "representative_name":
-            _set_setting(db, REPRESENTATIVE_NAME_KEY, v or "")
-        elif k == "business_type":
-            _set_setting(db, BUSINESS_TYPE_KEY, v or "")
-        elif k == "business_category":
-            _set_setting(db, BUSINESS_CATEGORY_KEY, v or "")
-        elif k == "bank_name":
-            _set_setting(db, BANK_NAME_KEY, v or "")
-        elif k == "bank_account":
-            _set_setting(db, BANK_ACCOUNT_KEY, v or "")
-        elif k == "bank_holder":
-            _set_setting(db, BANK_HOLDER_KEY, v or "")
-    db.commit()
-    return SettingsResponse(
-        company_name=_get_str_setting(db, COMPANY_NAME_KEY),
-        company_address=_get_str_setting(db, COMPANY_ADDRESS_KEY),
-        company_phone=_get_str_setting(db, COMPANY_PHONE_KEY),
-        delivery_route_count=_get_int_setting(db, DELIVERY_ROUTE_COUNT_KEY, 5),
-        business_registration_number=_get_str_setting(db, BUSINESS_REGISTRATION_NUMBER_KEY),
-        representative_name=_get_str_setting(db, REPRESENTATIVE_NAME_KEY),
-        business_type=_get_str_setting(db, BUSINESS_TYPE_KEY),
-        business_category=_get_str_setting(db, BUSINESS_CATEGORY_KEY),
-        bank_name=_get_str_setting(db, BANK_NAME_KEY),
-        bank_account=_get_str_setting(db, BANK_ACCOUNT_KEY),
-        bank_holder=_get_str_setting(db, BANK_HOLDER_KEY),
-    )
+        values[k] = str(v) if k == "delivery_route_count" else (v or "")
+    if "company_address" in values and values["company_address"] != get_company_settings(db).company_address:
+        # 주소가 바뀌면 좌표도 갱신 (찾지 못하면 비움 → company-location 조회 시 재시도)
+        lat, lon = _geocode_company(values["company_address"]) if values["company_address"].strip() else (None, None)
+        values["company_latitude"] = "" if lat is None else lat
+        values["company_longitude"] = "" if lon is None else lon
+    if values:
+        save_company_settings(db, values)
+        db.commit()
+        invalidate_company_settings()
+    return _settings_response(db)
@@ -1,35 +1,30 @@
 """스탑 CRUD - ADMIN 관리, DRIVER는 배정된 루트의 스탑만"""
-from decimal import Decimal
-from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from app.core.auth import require_user, require_role
+from app.core.depot import require_depot
 from app.core.route_access import require_route_access
 from app.database import get_db
-from app.models import User, Route, Stop, StopOrderItem, Customer, Item, StopCompletion, AppSetting, Plan
+from app.models import User, Route, Stop, StopOrderItem, Customer, Item, StopCompletion, Plan
 from app.models.user import Role
-from app.schemas.stop import StopCreate, StopUpdate, StopResponse, StopOrderItemResponse
+from app.schemas.stop import StopCreate, StopUpdate, StopResponse, StopOrderItemResponse, StopSyncResponse
+from app.services.app_settings import get_company_settings
+from app.services.arrears import charges_for_stops
+from app.services.distance_matrix import get_distance_matrix
+from app.services.eta import route_etas
+from app.services.route_optimizer import optimize_order
+from app.services.route_payload import FIELDS, compact_route, parse_fields
+from app.services.route_sync import route_changes_since
+from app.services.stop_order import move_stop, route_stop_ids, set_stop_order
+from app.services.receipt import build_receipt, load_receipt_stops
 
 router = APIRouter(prefix="/api/stops", tags=["stops"])
 RequireAdmin = Depends(require_role(Role.ADMIN))
 
-_SETTING_KEYS = [
-    "company_name", "company_address", "company_phone",
-    "business_registration_number", "representative_name",
-    "business_type", "business_category",
-    "bank_name", "bank_account", "bank_holder",
-]
-
-
-def _get_settings_dict(db: Session) -> dict:
-    rows = db.execute(select(AppSetting).where(AppSetting.key.in_(_SETTING_KEYS))).scalars().all()
-    return {r.key: (r.value or "") for r in rows}
-
-
 def _get_route_with_assignments(db: Session, route_id: int) -> Route | None:
     return db.get(Route, route_id, options=[joinedload(Route.assignments)])
 
@@ -66,7 +61,47 @@ def list_stops_by_route(
             joinedload(Stop.completions).joinedload(StopCompletion.photos),
         )
     )
-    return list(db.execute(stmt).scalars().unique().all())
+    stops = db.execute(stmt).scalars().unique().all()
+    etas = {p.stop_id: p.arrival for p in route_etas(db, [route])[route_id]}
+    return [StopResponse.model_validate(s).model_copy(update={"eta": etas.get(s.id)}) for s in stops]
+
+
+@router.get("/route/{route_id}/compact")
+def compact_stops_by_route(
+    route_id: int,
+    fields: str | None = Query(None, description="쉼표 구분 필드 (비우면 전체)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """기사 앱 전체 로드 - 열 형식(거래처/품목은 조회표). token은 이후 /sync의 since로 사용."""
+    selected = parse_fields(fields)
+    if selected is None:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 필드입니다 (가능: {', '.join(sorted(FIELDS))})")
+    route = _get_route_with_assignments(db, route_id)
+    if not route:
+        raise HTTPException(status_code=404, detail="루트를 찾을 수 없습니다")
+    require_route_access(current_user, route)
+    etas = {p.stop_id: p.arrival for p in route_etas(db, [route])[route_id]} if "eta" in selected else {}
+    return compact_route(db, route_id, selected, etas)
+
+
+@router.get("/route/{route_id}/sync", response_model=StopSyncResponse)
+def sync_stops_by_route(
+    route_id: int,
+    since: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """기사 앱 증분 동기화 - since(이전 응답의 token) 이후 바뀐 스탑/주문 품목/완료와 삭제된 id만 반환"""
+    route = _get_route_with_assignments(db, route_id)
+    if not route:
+        raise HTTPException(status_code=404, detail="루트를 찾을 수 없습니다")
+    require_route_access(current_user, route)
+    token = int(since) if since and since.isdigit() else None  # 잘못된 토큰은 전체 동기화
+    result = route_changes_since(db, route_id, token)
+    result["token"] = str(result["token"])
+    result["etas"] = {p.stop_id: p.arrival for p in route_etas(db, [route])[route_id]}
+    return result
 
 
 class ReorderStopsRequest(BaseModel):
@@ -81,16 +116,103 @@ def reorder_stops(
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    """스탑 순서 변경 (stop_ids 순서대로 sequence 부여)"""
-    route = _get_route_with_assignments(db, route_id)
-    if not route:
+    """스탑 순서 변경 - stop_ids는 루트의 스탑 전체(중복 없이), 그 순서대로 sequence 부여"""
+    if not db.get(Route, route_id):
         raise HTTPException(status_code=404, detail="루트를 찾을 수 없습니다")
-    for seq, stop_id in enumerate(data.stop_ids):
-        stop = db.get(Stop, stop_id)
-        if not stop or stop.route_id != route_id:
-            raise HTTPException(status_code=400, detail=f"스탑 ID {stop_id}를 찾을 수 없거나 해당 루트가 아닙니다")
-        stop.sequence = seq
+    if len(set(data.stop_ids)) != len(data.stop_ids):
+        raise HTTPException(status_code=400, detail="스탑 ID가 중복되었습니다")
+    current = {sid for sid, _ in route_stop_ids(db, route_id, lock=True)}
+    foreign = [sid for sid in data.stop_ids if sid not in current]
+    if foreign:
+        raise HTTPException(status_code=400, detail=f"스탑 ID {foreign[0]}를 찾을 수 없거나 해당 루트가 아닙니다")
+    if len(current) != len(data.stop_ids):
+        raise HTTPException(status_code=400, detail="루트의 모든 스탑을 포함해야 합니다")
+    set_stop_order(db, [(sid, route_id, seq) for seq, sid in enumerate(data.stop_ids)])
+    db.commit()
+
+
+class MoveStopRequest(BaseModel):
+    position: int = Field(..., ge=0)  # 0부터, 루트 스탑 수 이상이면 맨 뒤
+
+
+@router.post("/{stop_id}/move")
+def move_stop_position(
+    stop_id: int,
+    data: MoveStopRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """스탑 하나를 position으로 이동 - 사이 구간 스탑의 sequence만 변경"""
+    stop = db.get(Stop, stop_id)
+    if not stop:
+        raise HTTPException(status_code=404, detail="스탑을 찾을 수 없습니다")
+    position = move_stop(db, stop.route_id, stop_id, data.position)
+    if position is None:
+        raise HTTPException(status_code=409, detail="스탑이 다른 루트로 옮겨졌습니다. 새로고침 후 다시 시도하세요")
     db.commit()
+    return {"stop_id": stop_id, "position": position}
+
+
+class OptimizeStopsRequest(BaseModel):
+    apply: bool = False  # True면 결과 순서를 바로 저장
+    time_budget_ms: int = Field(500, ge=10, le=5000)
+    depot_latitude: float | None = Field(None, ge=-90, le=90)  # 미지정 시 회사 좌표(설정)
+    depot_longitude: float | None = Field(None, ge=-180, le=180)
+
+
+class OptimizeStopsResponse(BaseModel):
+    stop_ids: list[int]  # 제안 순서 (배송완료 스탑은 앞에 그대로, 좌표 없는 스탑은 맨 뒤)
+    unlocated_stop_ids: list[int]
+    distance_before_m: int
+    distance_after_m: int
+    applied: bool
+
+
+@router.post("/route/{route_id}/optimize", response_model=OptimizeStopsResponse)
+def optimize_stops(
+    route_id: int,
+    data: OptimizeStopsRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """
+    배송 순서 최적화 - 회사에서 출발해 회사로 돌아오는 경로, 거래처 거리 행렬(기본 직선 거리) 기준.
+    이미 배송완료된 스탑은 순서를 유지하고, 남은 스탑은 마지막 완료 지점에서 출발하는 경로로 계산.
+    """
+    if not db.get(Route, route_id):
+        raise HTTPException(status_code=404, detail="루트를 찾을 수 없습니다")
+    depot = require_depot(db, data.depot_latitude, data.depot_longitude)
+    completed = select(StopCompletion.id).where(StopCompletion.stop_id == Stop.id).exists()
+    rows = db.execute(
+        select(Stop.id, Stop.customer_id, Customer.latitude, Customer.longitude, completed.label("completed"))
+        .join(Customer, Stop.customer_id == Customer.id)
+        .where(Stop.route_id == route_id)
+        .order_by(Stop.sequence, Stop.id)
+    ).all()
+    located = [r for r in rows if r.latitude is not None and r.longitude is not None]
+    done = [r.id for r in rows if r.completed]
+    pending = [r for r in located if not r.completed]
+    unlocated = [r.id for r in rows if not r.completed and (r.latitude is None or r.longitude is None)]
+    last = next((r for r in reversed(located) if r.completed), None)
+    nodes = pending + ([last] if last else [])
+    dist = get_distance_matrix().submatrix(
+        depot, [(r.customer_id, float(r.latitude), float(r.longitude)) for r in nodes]
+    )
+    path, before, after = optimize_order(dist, len(nodes) if last else 0, data.time_budget_ms / 1000)
+    order = [nodes[k - 1].id for k in path]
+    stop_ids = done + order + unlocated
+    if data.apply:
+        set_stop_order(db, [(sid, route_id, seq) for seq, sid in enumerate(stop_ids)])
+        db.commit()
+    return OptimizeStopsResponse(
+        stop_ids=stop_ids,
+        unlocated_stop_ids=unlocated,
+        distance_before_m=round(before),
+        distance_after_m=round(after),
+        applied=data.apply,
+    )
 
 
 @router.post("/route/{route_id}", response_model=StopResponse, status_code=status.HTTP_201_CREATED)
@@ -118,35 +240,6 @@ def create_stop(
     return stop
 
 
-def _calc_receipt_line(quantity: float, unit_price: float | None) -> tuple[int, int]:
-    """금액(공급가액), 세액 계산. 단가는 세금 포함 가정 (VAT 10%)"""
-    if unit_price is None or quantity <= 0:
-        return 0, 0
-    total = int(Decimal(str(quantity)) * Decimal(str(unit_price)))
-    supply = round(total / Decimal("1.1"))  # 공급가액 (반올림)
-    tax = total - supply  # 세액
-    return supply, tax
-
-
-def calc_stop_total(stop: Stop) -> int:
-    """스탑 주문 총액 (공급가+세액) - 배송 완료 시 미수금 반영용"""
-    total = 0
-    for oi in stop.order_items:
-        item = oi.item if oi else None
-        if item:
-            supply, tax = _calc_receipt_line(float(oi.quantity), item.unit_price)
-            total += supply + tax
-    return total
-
-
-def add_arrears_for_completed_stop(db: Session, stop: Stop) -> None:
-    """배송 완료 시 거래처 미수금에 스탑 금액 반영"""
-    total = calc_stop_total(stop)
-    if total > 0 and stop.customer_id and stop.customer:
-        prev = int(stop.customer.arrears or 0)
-        stop.customer.arrears = prev + total
-
-
 class ReceiptItemRow(BaseModel):
     product_spec: str  # 품목(규격) - 코드 상품명 등
     unit: str = ""
@@ -157,6 +250,7 @@ class ReceiptItemRow(BaseModel):
 
 
 class ReceiptResponse(BaseModel):
+    stop_id: int
     doc_no: str
     date_str: str
     supplier: dict
@@ -170,6 +264,29 @@ class ReceiptResponse(BaseModel):
     arrears: int
 
 
+@router.get("/receipts", response_model=list[ReceiptResponse])
+def get_batch_receipts(
+    route_id: int | None = None,
+    plan_id: int | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """루트 또는 플랜 전체 거래명세표 (스탑 수와 무관하게 고정 쿼리 수)"""
+    if (route_id is None) == (plan_id is None):
+        raise HTTPException(status_code=400, detail="route_id 또는 plan_id 중 하나를 지정하세요")
+    stops = load_receipt_stops(db, route_id=route_id, plan_id=plan_id)
+    if current_user.role != Role.ADMIN:
+        # DRIVER는 배정된 루트의 스탑만 (플랜 단위 요청 시 다른 기사 루트는 제외)
+        stops = [s for s in stops if any(a.driver_id == current_user.id for a in s.route.assignments)]
+        if route_id is not None and not stops:
+            route = _get_route_with_assignments(db, route_id)
+            if route:
+                require_route_access(current_user, route)
+    company = get_company_settings(db)
+    charges = charges_for_stops(db, [s.id for s in stops])
+    return [build_receipt(stop, company, charges.get(stop.id)) for stop in stops if stop.customer]
+
+
 @router.get("/{stop_id}/receipt", response_model=ReceiptResponse)
 def get_stop_receipt(
     stop_id: int,
@@ -189,94 +306,7 @@ def get_stop_receipt(
     if not stop or not stop.customer:
         raise HTTPException(status_code=404, detail="스탑을 찾을 수 없습니다")
     require_route_access(current_user, stop.route)
-
-    settings_dict = _get_settings_dict(db)
-    plan = stop.route.plan if stop.route else None
-    plan_date: date = plan.plan_date if plan else date.today()
-
-    supplier = {
-        "business_registration_number": settings_dict.get("business_registration_number", ""),
-        "name": settings_dict.get("company_name", ""),
-        "representative_name": settings_dict.get("representative_name", ""),
-        "address": settings_dict.get("company_address", ""),
-        "business_type": settings_dict.get("business_type", ""),
-        "business_category": settings_dict.get("business_category", ""),
-    }
-
-    buyer = {
-        "business_registration_number": stop.customer.business_registration_number or "",
-        "name": stop.customer.name or "",
-        "representative_name": stop.customer.representative_name or "",
-        "address": stop.customer.address or "",
-        "business_type": stop.customer.business_type or "",
-        "business_category": stop.customer.business_category or "",
-    }
-
-    bank_parts = []
-    if settings_dict.get("bank_name"):
-        bank_parts.append(settings_dict["bank_name"])
-    if settings_dict.get("bank_account"):
-        bank_parts.append(settings_dict["bank_account"])
-    holder = settings_dict.get("bank_holder") or settings_dict.get("representative_name", "")
-    comp = settings_dict.get("company_name", "")
-    if holder and comp:
-        bank_parts.append(f"{holder}({comp})")
-    elif holder:
-        bank_parts.append(holder)
-    bank_info = " ".join(bank_parts) if bank_parts else ""
-
-    items: list[ReceiptItemRow] = []
-    supply_total = 0
-    tax_total = 0
-    for oi in stop.order_items:
-        item = oi.item
-        if not item:
-            continue
-        up = int(oi.quantity * (item.unit_price or 0)) if item.unit_price else 0
-        unit_price_display = int(item.unit_price or 0)
-        supply, tax = _calc_receipt_line(float(oi.quantity), item.unit_price)
-        parts = [item.code or "", item.product or ""]
-        if item.description:
-            parts.append(str(item.description))
-        if item.weight:
-            parts.append(f"({item.weight}kg{item.unit or ''})")
-        product_spec = " ".join(str(p) for p in parts if p).strip()
-
-        supply_total += supply
-        tax_total += tax
-        items.append(ReceiptItemRow(
-            product_spec=product_spec,
-            unit=item.unit or "",
-            quantity=float(oi.quantity),
-            unit_price=unit_price_display,
-            supply_amount=supply,
-            tax_amount=tax,
-        ))
-
-    total = supply_total + tax_total
-    customer_arrears = int(stop.customer.arrears or 0)
-    # 거래명세표는 항상 배송전 관점: 배송완료 시 customer.arrears에 이미 합계가 반영된 상태이므로 역산
-    if stop.is_completed and customer_arrears >= total:
-        prev_arrears = customer_arrears - total  # 배송 전 전미수
-    else:
-        prev_arrears = customer_arrears
-    arrears = prev_arrears + total
-
-    doc_no = f"{plan_date.strftime('%m%d')}-{stop_id:04d}"
-
-    return ReceiptResponse(
-        doc_no=doc_no,
-        date_str=plan_date.strftime("%Y년 %m월 %d일"),
-        supplier=supplier,
-        buyer=buyer,
-        bank_info=bank_info,
-        items=items,
-        supply_total=supply_total,
-        tax_total=tax_total,
-        total=total,
-        prev_arrears=prev_arrears,
-        arrears=arrears,
-    )
+    return build_receipt(stop, get_company_settings(db), charges_for_stops(db, [stop.id]).get(stop.id))
 
 
 @router.get("/{stop_id}", response_model=StopResponse)
@@ -0,0 +1,62 @@
+"""기사 GPS 이동 경로 - 기사 앱이 위치 묶음 전송, ADMIN이 루트별 경로/최신 위치 조회"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.auth import require_user, require_role
+from app.core.route_access import require_route_access
+from app.database import get_db
+from app.models import Plan, Route, User
+from app.models.user import Role
+from app.schemas.track import PositionResponse, TrackBatch, TrackIngestResponse, TrackPointIn, TrackResponse
+from app.services.tracks import TrackPoint, ingest, latest_positions, load_track
+
+router = APIRouter(prefix="/api/tracks", tags=["tracks"])
+RequireAdmin = Depends(require_role(Role.ADMIN))
+
+
+@router.post("/route/{route_id}", response_model=TrackIngestResponse)
+def post_track(
+    route_id: int,
+    data: TrackBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+):
+    """위치 묶음 저장 (재전송된 점은 무시하므로 실패 시 같은 묶음을 다시 보내도 됨)"""
+    route = db.get(Route, route_id, options=[joinedload(Route.assignments)])
+    if not route:
+        raise HTTPException(status_code=404, detail="루트를 찾을 수 없습니다")
+    require_route_access(current_user, route)
+    points = [TrackPoint(p.recorded_at, p.latitude, p.longitude, p.accuracy) for p in data.points]
+    result = ingest(db, route, current_user.id, points)
+    db.commit()
+    if result["stored"]:
+        latest_positions.update(result["latest"])  # 롤백된 위치가 캐시에 남지 않도록 커밋 후에
+    return result
+
+
+@router.get("/route/{route_id}", response_model=TrackResponse)
+def get_track(
+    route_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    if not db.get(Route, route_id):
+        raise HTTPException(status_code=404, detail="루트를 찾을 수 없습니다")
+    points = [TrackPointIn(**p._asdict()) for p in load_track(db, route_id)]
+    return TrackResponse(route_id=route_id, points=points)
+
+
+@router.get("/latest", response_model=list[PositionResponse])
+def latest(
+    plan_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    """플랜의 루트별 최신 위치 (워커 메모리에서, 위치가 없는 루트는 제외)"""
+    if not db.get(Plan, plan_id):
+        raise HTTPException(status_code=404, detail="플랜을 찾을 수 없습니다")
+    route_ids = list(db.execute(select(Route.id).where(Route.plan_id == plan_id)).scalars())
+    return list(latest_positions.get(db, route_ids).values())
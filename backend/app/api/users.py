@@ -1,24 +1,26 @@
 """사용자 관리 - ADMIN 전용 (기사 생성 등)"""
 import io
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import select
 from sqlalchemy.orm import Session
-from openpyxl import Workbook, load_workbook
+from openpyxl import load_workbook
 
 from app.core.auth import require_user, require_role
-from app.core.security import hash_password
+from app.core.responses import ORJSONResponse, row_dicts, schema_columns
+from app.core.security import hash_password, hash_password_pooled
 from app.database import get_db
 from app.models import User
 from app.models.user import Role
 from app.schemas.auth import UserResponse
+from app.services.export import csv_response, iter_rows, xlsx_response
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 RequireAdmin = Depends(require_role(Role.ADMIN))
 
 EXCEL_HEADERS = ["아이디", "권한", "이름", "주민번호", "전화번호", "이력서", "상태"]
 STATUS_VALUES = frozenset({"승인요청중", "재직", "퇴사"})
+DEFAULT_PASSWORD = "changeme123"  # 엑셀 가져오기로 생성된 사용자의 초기 비밀번호
 
 
 class UserCreateSchema(BaseModel):
@@ -84,8 +86,8 @@ def list_users(
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    stmt = select(User).order_by(User.id)
-    return list(db.execute(stmt).scalars().all())
+    stmt = select(*schema_columns(User, UserResponse)).order_by(User.id)
+    return ORJSONResponse(row_dicts(db.execute(stmt)))
 
 
 @router.post("", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -100,7 +102,7 @@ def create_user(
         raise HTTPException(status_code=400, detail="사용자명이 이미 존재합니다")
     user = User(
         username=data.username,
-        password_hash=hash_password(data.password),
+        password_hash=hash_password_pooled(data.password),
         role=data.role,
         display_name=data.display_name,
         ssn=data.ssn,
@@ -116,37 +118,38 @@ def create_user(
     return user
 
 
+def _user_export_rows():
+    stmt = select(
+        User.username, User.role, User.display_name, User.ssn, User.phone, User.resume, User.status
+    ).order_by(User.username)
+    return iter_rows(
+        stmt,
+        lambda r: [
+            r.username or "",
+            "관리자" if r.role == Role.ADMIN else "기사",
+            r.display_name or "",
+            r.ssn or "",
+            r.phone or "",
+            r.resume or "",
+            r.status or "",
+        ],
+    )
+
+
 @router.get("/export/excel")
 def export_users_excel(
-    db: Session = Depends(get_db),
     current_user: User = Depends(require_user),
     _: User = RequireAdmin,
 ):
-    stmt = select(User).order_by(User.username)
-    users = list(db.execute(stmt).scalars().all())
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "사용자"
-    ws.append(EXCEL_HEADERS)
-    for u in users:
-        role_display = "관리자" if u.role == Role.ADMIN else "기사"
-        ws.append([
-            u.username or "",
-            role_display,
-            u.display_name or "",
-            u.ssn or "",
-            u.phone or "",
-            u.resume or "",
-            u.status or "",
-        ])
-    buf = io.BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=users.xlsx"},
-    )
+    return xlsx_response("users.xlsx", "사용자", EXCEL_HEADERS, _user_export_rows())
+
+
+@router.get("/export/csv")
+def export_users_csv(
+    current_user: User = Depends(require_user),
+    _: User = RequireAdmin,
+):
+    return csv_response("users.csv", EXCEL_HEADERS, _user_export_rows())
 
 
 @router.post("/import/excel")
@@ -168,6 +171,7 @@ def import_users_excel(
         created = 0
         updated = 0
         errors = []
+        default_hash = None  # 신규 사용자 공통 초기 비밀번호 - 해시는 한 번만
         for i, row in enumerate(rows):
             if not row or all(cell is None or str(cell).strip() == "" for cell in row):
                 continue
@@ -201,9 +205,11 @@ def import_users_excel(
                     existing.status = status
                 updated += 1
             else:
+                if default_hash is None:
+                    default_hash = hash_password(DEFAULT_PASSWORD)
                 user = User(
                     username=username,
-                    password_hash=hash_password("changeme123"),
+                    password_hash=default_hash,
                     role=role,
                     display_name=display_name,
                     ssn=ssn,
@@ -221,7 +227,7 @@ def import_users_excel(
             msg_parts.append(f"{updated}건 수정")
         msg = ", ".join(msg_parts) + " 완료" if msg_parts else "처리할 데이터가 없습니다"
         if created:
-            msg += " (신규 사용자 비밀번호: changeme123)"
+            msg += f" (신규 사용자 비밀번호: {DEFAULT_PASSWORD})"
         if errors:
             msg += f" (오류 {len(errors)}건)"
         return {"ok": True, "created": created, "updated": updated, "message": msg, "errors": errors}
@@ -247,7 +253,7 @@ def set_user_password(
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
-    user.password_hash = hash_password(data.password)
+    user.password_hash = hash_password_pooled(data.password)
     user.must_change_password = False
     db.commit()
 
@@ -264,7 +270,7 @@ def set_temporary_password(
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
-    user.password_hash = hash_password(data.password)
+    user.password_hash = hash_password_pooled(data.password)
     user.must_change_password = True
     db.commit()
 
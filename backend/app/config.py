@@ -13,6 +13,19 @@ class Settings(BaseSettings):
     secret_key: str = "change-me-in-production-use-32-chars"
     cookie_domain: str = "localhost"
     upload_dir: str = "./uploads"
+    report_cache_dir: str = "./report_cache"  # 생성된 리포트 PDF 캐시
+    report_workers: int = 2  # 리포트 렌더링 프로세스 수
+    report_font_path: str = ""  # 리포트 한글 TTF 경로 (비우면 시스템 나눔고딕/맑은고딕 탐색)
+    distance_cache_dir: str = "./distance_cache"  # 거래처 거리 행렬 캐시
+    distance_table_path: str = ""  # 도로 거리표 npz (keys, meters). 비우면 하버사인
+    route_change_retention_days: int = 7  # 기사 앱 증분 동기화 변경 기록 보존 기간 (지나면 전체 동기화)
+    eta_history_days: int = 90  # ETA 학습에 쓰는 지난 완료 기록 기간
+    eta_refit_hours: float = 6.0  # ETA 모델 재학습 주기
+    track_retention_days: int = 30  # 기사 GPS 이동 경로 보존 기간
+    compression_min_size: int = 1024  # 이보다 큰 JSON/텍스트 응답만 br/gzip 압축 (바이트)
+    password_workers: int = 2  # bcrypt 해시/검증 프로세스 수
+    login_concurrency_per_ip: int = 4  # IP별 동시 로그인 처리 수 (초과분은 대기)
+    login_wait_seconds: float = 10.0  # 대기 한도 (넘으면 429)
     session_cookie_name: str = "yummy_session"
     session_max_age_seconds: int = 86400 * 7  # 7일
     cookie_secure: bool = False  # Cloudflare Tunnel HTTPS 시 True로 설정
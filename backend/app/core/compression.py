@@ -0,0 +1,142 @@
+"""
+응답 압축 - Accept-Encoding에 따라 brotli(br) 우선, 아니면 gzip.
+JSON/텍스트/CSV만, minimum_size 이상일 때만 압축. SSE(text/event-stream)와 이미 압축된 형식(사진, PDF, xlsx)은 그대로.
+스트리밍 응답(CSV 내보내기 등)은 청크 단위로 이어서 압축한다.
+"""
+import zlib
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+BROTLI_QUALITY = 5  # 동적 응답용 (11은 gzip보다 훨씬 느림)
+GZIP_LEVEL = 6
+
+
+class _Gzip:
+    encoding = "gzip"
+
+    def __init__(self):
+        self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.compress(data)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+class _Brotli:
+    encoding = "br"
+
+    def __init__(self):
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._c.process(data)
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+def choose_encoding(accept_encoding: str) -> type[_Gzip] | type[_Brotli] | None:
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        q = params.strip().replace(" ", "")
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    if "br" in accepted:
+        return _Brotli
+    if "gzip" in accepted:
+        return _Gzip
+    return None
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return (
+        "content-encoding" not in headers
+        and content_type.startswith(COMPRESSIBLE_TYPES)
+        and not content_type.startswith("text/event-stream")
+    )
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codec = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+        await _Responder(self.app, codec, self.minimum_size)(scope, receive, send)
+
+
+class _Responder:
+    def __init__(self, app: ASGIApp, codec, minimum_size: int):
+        self.app = app
+        self.codec = codec
+        self.minimum_size = minimum_size
+        self.send: Send | None = None
+        self.start: Message | None = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.passthrough = not _compressible(Headers(raw=message["headers"]))
+            if self.passthrough:
+                await self.send(message)  # SSE 등은 헤더를 바로 보냄
+                return
+            MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body, more = message.get("body", b""), message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.codec.encoding
+            self.compressor = self.codec()
+            if more:
+                del headers["Content-Length"]
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": self.compressor.compress(body), "more_body": True})
+            else:
+                body = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        data = self.compressor.compress(body)
+        if not more:
+            data += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more})
@@ -0,0 +1,17 @@
+"""경로 계산 출발지(회사) 좌표 - 요청 값 우선, 없으면 설정에 저장된 회사 좌표"""
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.services.app_settings import get_company_settings
+
+
+def require_depot(db: Session, latitude: float | None, longitude: float | None) -> tuple[float, float]:
+    if latitude is not None and longitude is not None:
+        return latitude, longitude
+    company = get_company_settings(db)
+    if company.company_latitude is None or company.company_longitude is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="회사 위치 좌표가 없습니다. 설정에서 회사 주소를 저장하세요",
+        )
+    return company.company_latitude, company.company_longitude
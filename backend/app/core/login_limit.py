@@ -0,0 +1,42 @@
+"""로그인 동시 처리 제한 - IP별 진행 중인 로그인 수 제한 (초과분은 대기, 오래 기다리면 429)"""
+import threading
+from contextlib import contextmanager
+
+from fastapi import HTTPException, Request, status
+
+from app.config import get_settings
+
+_lock = threading.Lock()
+_slots: dict[str, tuple[threading.Semaphore, int]] = {}  # ip → (세마포어, 사용 중인 요청 수)
+
+
+def client_ip(request: Request) -> str:
+    # 프록시 뒤에서는 uvicorn이 X-Forwarded-For로 client를 채움 (FORWARDED_ALLOW_IPS)
+    return request.client.host if request.client else "unknown"
+
+
+@contextmanager
+def login_slot(request: Request):
+    """동기 핸들러(스레드풀)용 - 대기 중에는 해당 스레드만 블록"""
+    settings = get_settings()
+    ip = client_ip(request)
+    with _lock:
+        sem, users = _slots.get(ip) or (threading.Semaphore(max(1, settings.login_concurrency_per_ip)), 0)
+        _slots[ip] = (sem, users + 1)
+    try:
+        if not sem.acquire(timeout=settings.login_wait_seconds):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="로그인 요청이 많습니다. 잠시 후 다시 시도하세요",
+            )
+        try:
+            yield
+        finally:
+            sem.release()
+    finally:
+        with _lock:
+            sem, users = _slots[ip]
+            if users <= 1:
+                del _slots[ip]
+            else:
+                _slots[ip] = (sem, users - 1)
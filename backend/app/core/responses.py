@@ -0,0 +1,33 @@
+"""
+orjson 응답 - 앱 기본 응답 클래스. response_model 검증 없이 바로 돌려주는 목록(열만 select한 행)도 이것으로.
+Decimal은 pydantic 응답과 같게 문자열, UTC 시각은 Z로 끝나는 ISO 형식.
+"""
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(_ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_default, option=OPTIONS)
+
+
+def schema_columns(model, schema: type[BaseModel]) -> list[InstrumentedAttribute]:
+    """응답 스키마 필드와 같은 이름의 모델 열 (select(*...)용)"""
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+def row_dicts(rows) -> list[dict]:
+    """select 결과 행 → dict 목록 (ORM 객체/스키마 검증 없이 응답에 바로 사용)"""
+    return [row._asdict() for row in rows]
@@ -1,7 +1,14 @@
 """비밀번호 해시 (plain 저장 금지)"""
+import multiprocessing
 import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 from passlib.context import CryptContext
 
+from app.config import get_settings
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
 
 
@@ -18,3 +25,50 @@ def verify_password(plain: str, hashed: str) -> bool:
 def generate_session_id() -> str:
     """세션 ID 생성 (암호학적으로 안전)"""
     return secrets.token_urlsafe(32)
+
+
+# --- 요청 처리용: bcrypt(호출당 수백 ms CPU)를 크기 제한된 프로세스 풀에서 실행 ---
+
+_pool_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, get_settings().password_workers),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _run(fn, *args):
+    # 동기 핸들러(스레드풀)에서 호출 - 결과가 나올 때까지 해당 스레드만 대기
+    try:
+        return _get_pool().submit(fn, *args).result()
+    except BrokenProcessPool:
+        # 작업 프로세스가 죽으면 풀을 새로 만들어 한 번 더
+        _reset_pool()
+        return _get_pool().submit(fn, *args).result()
+
+
+def hash_password_pooled(plain: str) -> str:
+    return _run(hash_password, plain)
+
+
+def verify_password_pooled(plain: str, hashed: str) -> bool:
+    return _run(verify_password, plain, hashed)
+
+
+def shutdown_password_pool() -> None:
+    _reset_pool()
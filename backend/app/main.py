@@ -9,8 +9,14 @@ from app.logging_config import configure_logging
 configure_logging(os.getenv("LOG_LEVEL", "INFO"))
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import auth, config as config_api, customers, items, plans, routes, stops, completions, users, uploads, reports, settings as settings_api
+from app.api import auth, config as config_api, customers, items, plans, routes, stops, completions, users, uploads, reports, search, events, tracks, settings as settings_api
 from app.config import get_settings
+from app.core.compression import CompressionMiddleware
+from app.core.responses import ORJSONResponse
+from app.core.security import shutdown_password_pool
+from app.services import report_jobs
+from app.services.live_events import hub as live_events_hub
+from app.services.tracks import latest_positions
 
 settings = get_settings()
 os.makedirs(settings.upload_dir, exist_ok=True)
@@ -18,7 +24,11 @@ os.makedirs(settings.upload_dir, exist_ok=True)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    live_events_hub.add_listener(latest_positions.on_event)  # 다른 워커가 받은 위치도 메모리에 반영
     yield
+    await live_events_hub.stop()
+    report_jobs.shutdown()
+    shutdown_password_pool()
 
 
 app = FastAPI(
@@ -26,8 +36,10 @@ app = FastAPI(
     description="배송/물류 관리 시스템 - 24/7 로컬 공장용",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -48,6 +60,9 @@ app.include_router(users.router)
 app.include_router(uploads.router)
 app.include_router(reports.router)
 app.include_router(settings_api.router)
+app.include_router(search.router)
+app.include_router(events.router)
+app.include_router(tracks.router)
 
 # 업로드 파일은 /api/uploads/photo/{id} 통해 인증 후 다운로드
 
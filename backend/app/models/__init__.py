@@ -7,6 +7,10 @@ from app.models.route import Route, RouteAssignment
 from app.models.stop import Stop, StopOrderItem
 from app.models.completion import StopCompletion, Photo
 from app.models.app_setting import AppSetting
+from app.models.code_counter import CodeCounter
+from app.models.route_change import RouteChange
+from app.models.route_track import RouteTrack
+from app.models.arrears import ArrearsEntry, ArrearsKind
 
 __all__ = [
     "User",
@@ -21,4 +25,9 @@ __all__ = [
     "StopCompletion",
     "Photo",
     "AppSetting",
+    "CodeCounter",
+    "RouteChange",
+    "RouteTrack",
+    "ArrearsEntry",
+    "ArrearsKind",
 ]
@@ -0,0 +1,40 @@
+"""거래처 미수금 원장 모델"""
+from datetime import datetime
+from enum import Enum as PyEnum
+
+from sqlalchemy import BigInteger, DateTime, Enum, ForeignKey, Index, Numeric, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ArrearsKind(str, PyEnum):
+    CHARGE = "CHARGE"  # 배송 완료 (스탑 금액)
+    PAYMENT = "PAYMENT"  # 변제
+    ADJUSTMENT = "ADJUSTMENT"  # 관리자 수정
+    IMPORT = "IMPORT"  # Excel 가져오기 / 원장 도입 전 이월
+
+
+class ArrearsEntry(Base):
+    """
+    미수금 원장 1건 (추가만, 수정 불가 - DB 트리거). amount는 부호 포함(변제는 음수),
+    balance는 이 건까지의 거래처 잔액. 거래처별 순서 = id 순 = posted_at 순 (customers 행 잠금으로 직렬화).
+    """
+
+    __tablename__ = "arrears_ledger"
+    __table_args__ = (
+        Index("ix_arrears_ledger_customer_id_posted_at", "customer_id", "posted_at"),
+        Index("uq_arrears_ledger_charge_stop_id", "stop_id", unique=True, postgresql_where=text("kind = 'CHARGE'")),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id", ondelete="CASCADE"), nullable=False)
+    kind: Mapped[ArrearsKind] = mapped_column(Enum(ArrearsKind, name="arrears_kind"), nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False)
+    balance: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False)
+    stop_id: Mapped[int | None] = mapped_column(ForeignKey("stops.id", ondelete="SET NULL"), nullable=True)
+    user_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    memo: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    posted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.clock_timestamp()
+    )
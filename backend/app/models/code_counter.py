@@ -0,0 +1,14 @@
+"""코드 채번 카운터 모델"""
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CodeCounter(Base):
+    """접두어별 마지막 발급 번호 (C: 거래처, P: 품목)"""
+
+    __tablename__ = "code_counters"
+
+    prefix: Mapped[str] = mapped_column(String(8), primary_key=True)
+    last_value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
@@ -1,7 +1,7 @@
 """기사 완료/사진 모델"""
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -11,14 +11,19 @@ class StopCompletion(Base):
     """스탑 완료 처리 (기사가 배송 완료 시)"""
 
     __tablename__ = "stop_completions"
+    __table_args__ = (
+        Index("uq_stop_completions_stop_id", "stop_id", unique=True),  # 스탑당 완료 1건
+        Index("uq_stop_completions_client_key", "client_key", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     stop_id: Mapped[int] = mapped_column(ForeignKey("stops.id", ondelete="CASCADE"), nullable=False)
     completed_by_user_id: Mapped[int] = mapped_column(
-        ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+        ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True
     )
     completed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     memo: Mapped[str | None] = mapped_column(Text, nullable=True)
+    client_key: Mapped[str | None] = mapped_column(String(64), nullable=True)  # 기사 앱 멱등 키
 
     stop: Mapped["Stop"] = relationship("Stop", back_populates="completions")
     photos: Mapped[list["Photo"]] = relationship(
@@ -30,13 +35,15 @@ class Photo(Base):
     """완료 시 업로드된 사진"""
 
     __tablename__ = "photos"
+    __table_args__ = (Index("uq_photos_client_key", "client_key", unique=True),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     completion_id: Mapped[int] = mapped_column(
-        ForeignKey("stop_completions.id", ondelete="CASCADE"), nullable=False
+        ForeignKey("stop_completions.id", ondelete="CASCADE"), nullable=False, index=True
     )
     file_path: Mapped[str] = mapped_column(String(512), nullable=False)
     filename: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    client_key: Mapped[str | None] = mapped_column(String(80), nullable=True)  # 업로드 키:파일 순번
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     completion: Mapped["StopCompletion"] = relationship("StopCompletion", back_populates="photos")
@@ -1,7 +1,7 @@
 """루트 모델"""
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -11,6 +11,7 @@ class Route(Base):
     """루트 - 플랜 내 배송 경로"""
 
     __tablename__ = "routes"
+    __table_args__ = (Index("ix_routes_plan_id_sequence", "plan_id", "sequence", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     plan_id: Mapped[int] = mapped_column(ForeignKey("plans.id", ondelete="CASCADE"), nullable=False)
@@ -35,10 +36,15 @@ class RouteAssignment(Base):
     """루트-기사 배정 (Driver는 assigned route만 접근)"""
 
     __tablename__ = "route_assignments"
+    __table_args__ = (
+        Index("uq_route_assignments_route_id_driver_id", "route_id", "driver_id", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     route_id: Mapped[int] = mapped_column(ForeignKey("routes.id", ondelete="CASCADE"), nullable=False)
-    driver_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    driver_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     route: Mapped["Route"] = relationship("Route", back_populates="assignments")
@@ -0,0 +1,27 @@
+"""루트 변경 기록 모델 (기사 앱 증분 동기화)"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Index, Integer, String, func, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RouteChange(Base):
+    """스탑/주문 품목/완료 변경 1건 - DB 트리거가 기록 (migration 021)"""
+
+    __tablename__ = "route_changes"
+    __table_args__ = (
+        Index("ix_route_changes_route_id_txid", "route_id", "txid"),
+        Index("ix_route_changes_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    route_id: Mapped[int] = mapped_column(Integer, nullable=False)  # 루트 삭제 후에도 기록 유지 (FK 없음)
+    entity: Mapped[str] = mapped_column(String(16), nullable=False)  # stop / order_item / completion
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    txid: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default=text("(pg_current_xact_id()::text)::bigint")
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,27 @@
+"""루트 GPS 이동 경로 모델"""
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, LargeBinary, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RouteTrack(Base):
+    """기사 앱이 보낸 위치 묶음 1건 - 단순화한 점들을 압축 저장 (services/tracks.py 인코딩)"""
+
+    __tablename__ = "route_tracks"
+    __table_args__ = (
+        Index("ix_route_tracks_route_id_ended_at", "route_id", "ended_at"),
+        Index("ix_route_tracks_created_at", "created_at"),
+    )
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    route_id: Mapped[int] = mapped_column(ForeignKey("routes.id", ondelete="CASCADE"), nullable=False)
+    driver_id: Mapped[int | None] = mapped_column(ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ended_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    point_count: Mapped[int] = mapped_column(Integer, nullable=False)  # 저장한 점 수 (단순화 후)
+    raw_count: Mapped[int] = mapped_column(Integer, nullable=False)  # 받은 점 수
+    points: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -1,7 +1,7 @@
 """스탑(배송지) 모델"""
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -13,8 +13,8 @@ class StopOrderItem(Base):
     __tablename__ = "stop_order_items"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    stop_id: Mapped[int] = mapped_column(ForeignKey("stops.id", ondelete="CASCADE"), nullable=False)
-    item_id: Mapped[int] = mapped_column(ForeignKey("items.id", ondelete="RESTRICT"), nullable=False)
+    stop_id: Mapped[int] = mapped_column(ForeignKey("stops.id", ondelete="CASCADE"), nullable=False, index=True)
+    item_id: Mapped[int] = mapped_column(ForeignKey("items.id", ondelete="RESTRICT"), nullable=False, index=True)
     quantity: Mapped[float] = mapped_column(Numeric(14, 2), nullable=False, default=1)
     memo: Mapped[str | None] = mapped_column(String(256), nullable=True)
 
@@ -26,11 +26,12 @@ class Stop(Base):
     """스탑 - 루트 내 배송지"""
 
     __tablename__ = "stops"
+    __table_args__ = (Index("ix_stops_route_id_sequence", "route_id", "sequence", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     route_id: Mapped[int] = mapped_column(ForeignKey("routes.id", ondelete="CASCADE"), nullable=False)
     customer_id: Mapped[int] = mapped_column(
-        ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False
+        ForeignKey("customers.id", ondelete="RESTRICT"), nullable=False, index=True
     )
     sequence: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
     memo: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -1,6 +1,10 @@
 """기사 완료 스키마"""
 from datetime import datetime
-from pydantic import BaseModel
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+CLIENT_KEY_MAX = 64
 
 
 class CompletionCreate(BaseModel):
@@ -13,6 +17,7 @@ class CompletionResponse(BaseModel):
     completed_by_user_id: int | None
     completed_at: datetime
     memo: str | None
+    client_key: str | None = None
 
     model_config = {"from_attributes": True}
 
@@ -25,3 +30,25 @@ class PhotoResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class CompletionReplayItem(BaseModel):
+    """오프라인 중 완료 처리 1건 (client_key = 기사 앱이 만든 멱등 키)"""
+    client_key: str = Field(..., min_length=8, max_length=CLIENT_KEY_MAX)
+    stop_id: int
+    memo: str | None = None
+    completed_at: datetime | None = None  # 기사 앱에서 완료한 시각 (없으면 서버 수신 시각)
+
+
+class CompletionReplayRequest(BaseModel):
+    items: list[CompletionReplayItem] = Field(..., min_length=1, max_length=200)
+
+
+class CompletionReplayResult(BaseModel):
+    """created: 새로 완료, duplicate: 이미 같은 키로 처리됨, error: status_code/detail 참고"""
+    client_key: str
+    stop_id: int
+    status: Literal["created", "duplicate", "error"]
+    status_code: int
+    detail: str | None = None
+    completion: CompletionResponse | None = None
@@ -1,4 +1,5 @@
 """거래처 스키마"""
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Literal
 
@@ -51,3 +52,37 @@ class CustomerResponse(CustomerBase):
     id: int
 
     model_config = {"from_attributes": True}
+
+
+class ArrearsPaymentCreate(BaseModel):
+    amount: Decimal = Field(..., gt=0, description="변제 금액")
+    memo: str | None = Field(None, max_length=256)
+
+
+class ArrearsAdjustmentCreate(BaseModel):
+    amount: Decimal = Field(..., description="증감액 (음수 = 차감)")
+    memo: str | None = Field(None, max_length=256)
+
+
+class ArrearsEntryResponse(BaseModel):
+    id: int
+    kind: str
+    amount: Decimal
+    balance: Decimal
+    stop_id: int | None
+    user_id: int | None
+    memo: str | None
+    posted_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class ArrearsLedgerResponse(BaseModel):
+    balance: Decimal
+    entries: list[ArrearsEntryResponse]
+    next_before_id: int | None = None
+
+
+class ArrearsBalanceResponse(BaseModel):
+    as_of: date
+    balance: Decimal | None = Field(None, description="그날 마감 잔액 (원장 시작 전이면 null)")
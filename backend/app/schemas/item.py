@@ -66,3 +66,10 @@ class ItemResponse(ItemBase):
     code: str
 
     model_config = {"from_attributes": True}
+
+
+def normalize_item_row(row: dict) -> dict:
+    """열만 select한 품목 행에 ItemResponse 검증기와 같은 정규화 적용"""
+    row["unit_price"] = _round_unit_price(row["unit_price"])
+    row["unit"] = _normalize_unit(row["unit"])
+    return row
@@ -33,3 +33,40 @@ class RouteResponse(RouteBase):
     started_at: datetime | None = None
 
     model_config = {"from_attributes": True}
+
+
+class PartitionRequest(BaseModel):
+    """플랜 배송 분배 제안 조건"""
+    capacity: float | None = Field(None, gt=0)  # 호차당 적재 용량 (수량 x 품목 무게), 없으면 균형만
+    balance: float = Field(1.0, ge=0, le=10)  # 적재량 균형 가중치 (0이면 거리만)
+    time_budget_ms: int = Field(2000, ge=100, le=10000)
+    depot_latitude: float | None = Field(None, ge=-90, le=90)
+    depot_longitude: float | None = Field(None, ge=-180, le=180)
+
+
+class PartitionRoute(BaseModel):
+    route_id: int
+    route_name: str
+    stop_ids: list[int]
+    load_before: float
+    load: float
+    distance_before_m: int
+    distance_m: int
+    over_capacity: bool
+
+
+class PartitionResponse(BaseModel):
+    routes: list[PartitionRoute]
+    excluded_route_ids: list[int]  # 이미 출발한 루트 (변경 없음)
+    distance_before_m: int
+    distance_after_m: int
+
+
+class PartitionAssignment(BaseModel):
+    route_id: int
+    stop_ids: list[int]
+
+
+class PartitionApply(BaseModel):
+    """제안 수락 - 루트별 스탑 순서대로 루트/순서 저장"""
+    routes: list[PartitionAssignment] = Field(..., min_length=1)
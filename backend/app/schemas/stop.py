@@ -1,4 +1,5 @@
 """스탑 스키마"""
+from datetime import datetime
 from decimal import Decimal
 from pydantic import BaseModel, Field
 
@@ -80,5 +81,36 @@ class StopResponse(StopBase):
     is_completed: bool = False
     customer: CustomerSummary | None = None
     completions: list[CompletionSummary] = Field(default_factory=list)
+    eta: datetime | None = None  # 도착 예상 (출발한 루트의 남은 스탑만)
 
     model_config = {"from_attributes": True}
+
+
+class StopSyncEntry(StopBase):
+    """증분 동기화의 스탑 (주문 품목/완료는 별도 목록)"""
+    id: int
+    route_id: int
+    customer: CustomerSummary | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class CompletionSyncEntry(CompletionSummary):
+    stop_id: int
+
+
+class SyncDeleted(BaseModel):
+    stops: list[int] = Field(default_factory=list)
+    order_items: list[int] = Field(default_factory=list)
+    completions: list[int] = Field(default_factory=list)
+
+
+class StopSyncResponse(BaseModel):
+    """token 이후 바뀐 항목 (full이면 루트 전체 - 기존 캐시를 버리고 교체)"""
+    token: str
+    full: bool
+    stops: list[StopSyncEntry] = Field(default_factory=list)
+    order_items: list[StopOrderItemResponse] = Field(default_factory=list)
+    completions: list[CompletionSyncEntry] = Field(default_factory=list)
+    deleted: SyncDeleted = Field(default_factory=SyncDeleted)
+    etas: dict[int, datetime] = Field(default_factory=dict)  # 남은 스탑 도착 예상 (증분과 무관하게 매번 전체)
@@ -0,0 +1,37 @@
+"""기사 GPS 이동 경로 스키마"""
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class TrackPointIn(BaseModel):
+    recorded_at: datetime  # 기기에서 측정한 시각
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    accuracy: float | None = Field(None, ge=0)  # m
+
+
+class TrackBatch(BaseModel):
+    points: list[TrackPointIn] = Field(..., min_length=1, max_length=1000)
+
+
+class PositionResponse(BaseModel):
+    route_id: int
+    plan_id: int
+    driver_id: int | None
+    recorded_at: datetime
+    latitude: float
+    longitude: float
+    accuracy: float | None
+
+
+class TrackIngestResponse(BaseModel):
+    """received: 받은 점, stored: 단순화 후 저장한 점 (부정확/중복 점은 버림)"""
+    received: int
+    stored: int
+    latest: PositionResponse | None = None
+
+
+class TrackResponse(BaseModel):
+    route_id: int
+    points: list[TrackPointIn]
@@ -0,0 +1,114 @@
+"""
+회사 설정(app_settings) 스냅샷 - 프로세스 메모리에 한 번 적재해 조회마다 DB를 읽지 않는다.
+설정 변경 시 settings_version 행을 올리고, 각 워커는 CHECK_INTERVAL마다 버전 행(PK 조회)만 확인해 다시 적재.
+"""
+import threading
+import time
+from typing import NamedTuple
+
+from sqlalchemy import Integer, String, cast, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import AppSetting
+
+VERSION_KEY = "settings_version"
+CHECK_INTERVAL = 1.0  # 다른 워커의 변경 확인 간격 (초)
+
+
+class CompanySettings(NamedTuple):
+    """설정 스냅샷 (불변). 필드 이름 = app_settings 키."""
+    company_name: str = ""
+    company_address: str = ""
+    company_phone: str = ""
+    delivery_route_count: int = 5
+    business_registration_number: str = ""
+    representative_name: str = ""
+    business_type: str = ""
+    business_category: str = ""
+    bank_name: str = ""
+    bank_account: str = ""
+    bank_holder: str = ""
+    company_latitude: float | None = None  # 회사 주소 저장 시 지오코딩 (경로 최적화 출발지)
+    company_longitude: float | None = None
+    version: int = 0
+
+
+SETTING_KEYS = [f for f in CompanySettings._fields if f != "version"]
+_DEFAULTS = CompanySettings()
+
+_lock = threading.Lock()
+_snapshot: CompanySettings | None = None
+_checked_at = 0.0
+
+
+def _to_int(value: str | None, default: int) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_float(value: str | None) -> float | None:
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _load(db: Session) -> CompanySettings:
+    rows = dict(db.execute(select(AppSetting.key, AppSetting.value)).tuples().all())
+    values = {}
+    for key in SETTING_KEYS:
+        default = getattr(_DEFAULTS, key)
+        raw = rows.get(key)
+        if default is None:
+            values[key] = _to_float(raw)
+        elif isinstance(default, int):
+            values[key] = _to_int(raw, default)
+        else:
+            values[key] = raw if raw is not None else default
+    return CompanySettings(**values, version=_to_int(rows.get(VERSION_KEY), 0))
+
+
+def _current_version(db: Session) -> int:
+    return _to_int(db.execute(select(AppSetting.value).where(AppSetting.key == VERSION_KEY)).scalar(), 0)
+
+
+def get_company_settings(db: Session) -> CompanySettings:
+    """설정 스냅샷. CHECK_INTERVAL 이내면 메모리 값 그대로, 이후엔 버전이 바뀐 경우에만 다시 적재."""
+    global _snapshot, _checked_at
+    snapshot = _snapshot
+    now = time.monotonic()
+    if snapshot is not None and now - _checked_at < CHECK_INTERVAL:
+        return snapshot
+    with _lock:
+        if _snapshot is None or _current_version(db) != _snapshot.version:
+            _snapshot = _load(db)
+        _checked_at = now
+        return _snapshot
+
+
+def save_company_settings(db: Session, values: dict) -> None:
+    """설정 값 저장 + 버전 증가 (커밋은 호출자가, 커밋 후 invalidate_company_settings 호출)"""
+    for key, value in values.items():
+        db.execute(
+            pg_insert(AppSetting)
+            .values(key=key, value=str(value))
+            .on_conflict_do_update(index_elements=["key"], set_={"value": str(value)})
+        )
+    db.execute(
+        pg_insert(AppSetting)
+        .values(key=VERSION_KEY, value="1")
+        .on_conflict_do_update(
+            index_elements=["key"],
+            set_={"value": cast(cast(AppSetting.value, Integer) + 1, String)},
+        )
+    )
+
+
+def invalidate_company_settings() -> None:
+    """현재 워커의 스냅샷 폐기 (다음 조회에서 다시 적재)"""
+    global _snapshot
+    with _lock:
+        _snapshot = None
@@ -0,0 +1,113 @@
+"""
+거래처 미수금 원장 - 모든 증감(배송 완료/변제/수정/가져오기)을 arrears_ledger에 추가만 한다.
+customers.arrears는 현재 잔액 캐시: UPDATE ... SET arrears = arrears + :amount RETURNING으로 행을 잠그고 새 잔액을 받아
+같은 트랜잭션에서 원장 행(balance)을 기록하므로 동시 완료/변제도 잔액을 잃지 않는다.
+기준 시각 잔액은 (customer_id, posted_at) 색인의 역순 첫 행.
+"""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import ArrearsEntry, ArrearsKind, Customer, Stop
+from app.services.receipt import calc_receipt_line
+
+
+def post_entry(
+    db: Session,
+    customer_id: int,
+    kind: ArrearsKind,
+    amount: Decimal | int | float,
+    *,
+    stop_id: int | None = None,
+    user_id: int | None = None,
+    memo: str | None = None,
+) -> ArrearsEntry:
+    """원장 1건 추가 + 거래처 잔액 반영 (커밋은 호출자가). 거래처 행은 트랜잭션이 끝날 때까지 잠긴다."""
+    amount = Decimal(str(amount))
+    balance = db.execute(
+        update(Customer)
+        .where(Customer.id == customer_id)
+        .values(arrears=func.coalesce(Customer.arrears, 0) + amount)
+        .returning(Customer.arrears)
+    ).scalar_one()
+    entry = ArrearsEntry(
+        customer_id=customer_id, kind=kind, amount=amount, balance=balance,
+        stop_id=stop_id, user_id=user_id, memo=memo,
+    )
+    db.add(entry)
+    db.flush()
+    return entry
+
+
+def set_balance(
+    db: Session, customer_id: int, target: Decimal | int | float, kind: ArrearsKind, *,
+    user_id: int | None = None, memo: str | None = None,
+) -> ArrearsEntry | None:
+    """잔액을 target으로 맞추는 차액 1건 (수정/가져오기). 같으면 기록하지 않음."""
+    current = db.execute(
+        select(func.coalesce(Customer.arrears, 0)).where(Customer.id == customer_id).with_for_update()
+    ).scalar_one()
+    delta = Decimal(str(target)) - current
+    if delta == 0:
+        return None
+    return post_entry(db, customer_id, kind, delta, user_id=user_id, memo=memo)
+
+
+def stop_total(stop: Stop) -> int:
+    """스탑 주문 총액 (공급가+세액, 거래명세표와 같은 라인별 반올림)"""
+    total = 0
+    for oi in stop.order_items:
+        if oi.item:
+            supply, tax = calc_receipt_line(float(oi.quantity), oi.item.unit_price)
+            total += supply + tax
+    return total
+
+
+def charge_completed_stop(db: Session, stop: Stop, user_id: int | None = None) -> ArrearsEntry | None:
+    """배송 완료 시 스탑 금액을 원장에 청구 (스탑당 1건 - 부분 unique 색인)"""
+    total = stop_total(stop)
+    if total <= 0 or not stop.customer_id:
+        return None
+    return post_entry(db, stop.customer_id, ArrearsKind.CHARGE, total, stop_id=stop.id, user_id=user_id)
+
+
+def charges_for_stops(db: Session, stop_ids: list[int]) -> dict[int, ArrearsEntry]:
+    """스탑별 청구 원장 행 (거래명세표의 전미수/미수 계산용)"""
+    if not stop_ids:
+        return {}
+    rows = db.execute(
+        select(ArrearsEntry).where(ArrearsEntry.kind == ArrearsKind.CHARGE, ArrearsEntry.stop_id.in_(stop_ids))
+    ).scalars()
+    return {e.stop_id: e for e in rows}
+
+
+def day_end(d: date) -> datetime:
+    """d일이 끝나는 시각 (서버 시간대) - 이 시각 전까지의 원장이 d일 잔액"""
+    return datetime.combine(d + timedelta(days=1), time.min).astimezone()
+
+
+def balance_as_of_expr(customer_id, cutoff: datetime):
+    """cutoff 직전 잔액 스칼라 서브쿼리 (원장 시작 전이면 NULL) - 목록 쿼리에 상관 서브쿼리로 붙인다"""
+    return (
+        select(ArrearsEntry.balance)
+        .where(ArrearsEntry.customer_id == customer_id, ArrearsEntry.posted_at < cutoff)
+        .order_by(ArrearsEntry.posted_at.desc(), ArrearsEntry.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def balance_as_of(db: Session, customer_id: int, cutoff: datetime) -> Decimal | None:
+    return db.execute(select(balance_as_of_expr(customer_id, cutoff))).scalar()
+
+
+def ledger_page(db: Session, customer_id: int, limit: int, before_id: int | None = None) -> list[ArrearsEntry]:
+    """최근 원장부터 (keyset: before_id보다 오래된 것)"""
+    stmt = select(ArrearsEntry).where(ArrearsEntry.customer_id == customer_id)
+    if before_id is not None:
+        stmt = stmt.where(ArrearsEntry.id < before_id)
+    return list(db.execute(
+        stmt.order_by(ArrearsEntry.posted_at.desc(), ArrearsEntry.id.desc()).limit(limit)
+    ).scalars())
@@ -0,0 +1,137 @@
+"""거래처/품목 코드 채번 - 카운터 테이블 기반, 빈 번호 재사용 모드 지원"""
+from collections import deque
+from typing import NamedTuple
+
+from sqlalchemy import BigInteger, cast, func, literal, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from app.models import CodeCounter, Customer, Item
+
+
+class CodeSpec(NamedTuple):
+    """코드 형식: 접두어 + 0 채움 번호 (C0001, P00001)"""
+    prefix: str
+    width: int
+    column: InstrumentedAttribute
+
+    def format(self, n: int) -> str:
+        return f"{self.prefix}{n:0{self.width}d}"
+
+
+CUSTOMER_CODE = CodeSpec("C", 4, Customer.code)
+ITEM_CODE = CodeSpec("P", 5, Item.code)
+
+# 시작 번호 이후 가장 작은 미사용 번호 n개. 코드 유니크 인덱스로 번호별 존재 여부 확인.
+# 상한(start + n + 기존 코드 수)까지 보면 최소 n개의 빈 번호가 반드시 있다.
+_FREE_NUMBERS_SQL = """
+SELECT s.n FROM generate_series(
+    CAST(:start AS BIGINT),
+    :start + :n - 1 + (SELECT count(code) FROM {table})
+) AS s(n)
+WHERE NOT EXISTS (
+    SELECT 1 FROM {table} t
+    WHERE t.code = :prefix || lpad(s.n::text, greatest(:width, length(s.n::text)), '0')
+)
+ORDER BY s.n
+LIMIT :n
+"""
+
+
+class CodeAllocator:
+    """
+    트랜잭션 단위 코드 발급기 (요청/가져오기마다 새로 생성, 커밋 후 재사용 금지).
+    - 카운터 모드(기본): code_counters 행을 UPDATE ... RETURNING 으로 증가. 행 잠금이 커밋까지
+      유지되므로 동시 관리자 세션끼리 같은 번호를 받지 않는다. 수동 입력된 코드와 겹치면 건너뜀.
+    - 빈 번호 재사용 모드(reuse_gaps): 트랜잭션 advisory lock 후 가장 작은 미사용 번호를 쿼리 한 번으로 조회.
+    block_size 단위로 미리 확보해 대량 가져오기 시 행마다 쿼리하지 않는다.
+    """
+
+    def __init__(self, db: Session, spec: CodeSpec, reuse_gaps: bool = False, block_size: int = 1):
+        self.db = db
+        self.spec = spec
+        self.reuse_gaps = reuse_gaps
+        self.block_size = max(1, block_size)
+        self._pending: deque[int] = deque()
+        self._last = 0  # 빈 번호 모드: 이미 확보한 마지막 번호 (아직 flush 전이므로 이후부터 탐색)
+        self._top: int | None = None  # 카운터 모드: 마지막으로 증가시킨 카운터 값
+        self._locked = False
+
+    def next(self) -> str:
+        """다음 코드 1개"""
+        if not self._pending:
+            self._fill(self.block_size)
+        return self.spec.format(self._pending.popleft())
+
+    def reserve(self, n: int) -> list[str]:
+        """코드 n개를 한 번에 확보"""
+        if len(self._pending) < n:
+            self._fill(n - len(self._pending))
+        return [self.spec.format(self._pending.popleft()) for _ in range(n)]
+
+    def release(self) -> None:
+        """쓰지 않은 예약 번호 반환 (카운터 모드, 커밋 전 호출). 행 잠금 보유 중이라 안전."""
+        if not self.reuse_gaps and self._pending and self._top is not None:
+            first = self._pending[0]
+            self.db.execute(
+                update(CodeCounter)
+                .where(CodeCounter.prefix == self.spec.prefix, CodeCounter.last_value == self._top)
+                .values(last_value=first - 1)
+                .execution_options(synchronize_session=False)
+            )
+            self._top = first - 1
+        self._pending.clear()
+
+    def _fill(self, n: int) -> None:
+        nums = self._free_numbers(n) if self.reuse_gaps else self._counter_numbers(n)
+        self._pending.extend(nums)
+        self._last = nums[-1]
+
+    def _free_numbers(self, n: int) -> list[int]:
+        if not self._locked:
+            self.db.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                {"key": f"code_allocator:{self.spec.prefix}"},
+            )
+            self._locked = True
+        sql = _FREE_NUMBERS_SQL.format(table=self.spec.column.class_.__tablename__)
+        params = {"start": self._last + 1, "n": n, "prefix": self.spec.prefix, "width": self.spec.width}
+        return list(self.db.execute(text(sql), params).scalars().all())
+
+    def _counter_numbers(self, n: int) -> list[int]:
+        col = self.spec.column
+        result: list[int] = []
+        while len(result) < n:
+            need = n - len(result)
+            top = self._bump(need)
+            candidates = {self.spec.format(v): v for v in range(top - need + 1, top + 1)}
+            taken = set(self.db.execute(select(col).where(col.in_(list(candidates)))).scalars().all())
+            result.extend(v for code, v in candidates.items() if code not in taken)
+        return result
+
+    def _bump(self, n: int) -> int:
+        stmt = (
+            update(CodeCounter)
+            .where(CodeCounter.prefix == self.spec.prefix)
+            .values(last_value=CodeCounter.last_value + n)
+            .returning(CodeCounter.last_value)
+            .execution_options(synchronize_session=False)
+        )
+        top = self.db.execute(stmt).scalar_one_or_none()
+        if top is None:
+            self._seed()
+            top = self.db.execute(stmt).scalar_one()
+        self._top = top
+        return top
+
+    def _seed(self) -> None:
+        """카운터 행이 없으면 기존 최대 번호로 생성"""
+        col = self.spec.column
+        max_n = select(
+            func.coalesce(func.max(cast(func.substring(col, len(self.spec.prefix) + 1), BigInteger)), 0)
+        ).where(col.op("~")(f"^{self.spec.prefix}[0-9]+$"))
+        self.db.execute(
+            pg_insert(CodeCounter)
+            .from_select(["prefix", "last_value"], select(literal(self.spec.prefix), max_n.scalar_subquery()))
+            .on_conflict_do_nothing(index_elements=["prefix"])
+        )
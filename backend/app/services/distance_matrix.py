@@ -0,0 +1,247 @@
+"""
+거래처 간 거리 행렬 캐시 - 디스크의 float32 행렬을 메모리 맵으로 열고 거래처 id → 행 번호 색인을 함께 저장.
+색인에는 계산에 쓴 좌표도 있어, 좌표가 바뀐 거래처는 그 행/열만 다시 계산한다 (거래처 수정/가져오기 시 즉시,
+놓친 변경은 조회 시 좌표 비교로). 회사(출발지)는 설정/요청마다 달라질 수 있어 조회 때 한 행만 계산.
+거리 기준(metric)은 기본 하버사인, DISTANCE_TABLE_PATH에 도로 거리표(npz)를 두면 표 우선.
+여러 워커가 같은 디렉터리를 공유 - 쓰기는 배타 잠금, 색인은 원자적 교체 후 mtime으로 다시 읽는다.
+"""
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import structlog
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Customer
+from app.services.route_optimizer import haversine
+
+log = structlog.get_logger(__name__)
+
+DEPOT_KEY = 0  # 거리표에서 회사를 가리키는 키 (거래처 id는 1부터)
+INITIAL_CAPACITY = 256
+CHUNK = 512  # 전체 재계산 시 한 번에 계산하는 행 수
+
+
+class HaversineMetric:
+    """대원 거리 (m)"""
+    name = "haversine"
+    symmetric = True
+
+    def rows(self, src_keys, src, dst_keys, dst) -> np.ndarray:
+        src = np.asarray(src, dtype=np.float64).reshape(-1, 2)
+        dst = np.asarray(dst, dtype=np.float64).reshape(-1, 2)
+        return haversine(src[:, 0], src[:, 1], dst[:, 0], dst[:, 1])
+
+
+class TableMetric(HaversineMetric):
+    """
+    로컬 도로 거리표 (np.savez: keys=(k,) 거래처 id 및 DEPOT_KEY, meters=(k,k)).
+    표에 없는 쌍은 하버사인으로 채운다. 표 파일이 바뀌면 이름(수정시각 포함)이 달라져 전체 재계산.
+    """
+    symmetric = False  # 일방통행 등으로 왕복 거리가 다를 수 있음
+
+    def __init__(self, path: str):
+        data = np.load(path)
+        self.keys = {int(k): i for i, k in enumerate(data["keys"])}
+        self.meters = np.asarray(data["meters"], dtype=np.float64)
+        self.name = f"table:{Path(path).name}:{int(os.path.getmtime(path))}"
+
+    def rows(self, src_keys, src, dst_keys, dst) -> np.ndarray:
+        result = super().rows(src_keys, src, dst_keys, dst)
+        si = np.array([self.keys.get(int(k), -1) for k in src_keys], dtype=np.int64)
+        di = np.array([self.keys.get(int(k), -1) for k in dst_keys], dtype=np.int64)
+        rs, cs = np.nonzero((si[:, None] >= 0) & (di[None, :] >= 0))
+        result[rs, cs] = self.meters[si[rs], di[cs]]
+        return result
+
+
+def load_metric() -> HaversineMetric:
+    path = get_settings().distance_table_path
+    return TableMetric(path) if path else HaversineMetric()
+
+
+class DistanceMatrix:
+    """matrix.f32 (capacity x capacity 메모리 맵) + index.json (metric, capacity, ids, coords)"""
+
+    def __init__(self, directory: Path, metric: HaversineMetric):
+        self.directory = directory
+        self.metric = metric
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._capacity = 0
+        self._ids: list[int] = []
+        self._coords = np.zeros((0, 2))
+        self._pos: dict[int, int] = {}
+        self._mm: np.memmap | None = None
+
+    @property
+    def _matrix_path(self) -> Path:
+        return self.directory / "matrix.f32"
+
+    @property
+    def _index_path(self) -> Path:
+        return self.directory / "index.json"
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _refresh(self) -> None:
+        """디스크 색인이 바뀌었으면 다시 읽음 (다른 워커가 갱신한 경우). 거리 기준이 다르면 비움."""
+        try:
+            mtime = self._index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        self._mtime = mtime
+        index = json.loads(self._index_path.read_text()) if mtime is not None else {}
+        if index.get("metric") != self.metric.name or not self._matrix_path.exists():
+            index = {}
+        capacity = index.get("capacity", 0)
+        if capacity != self._capacity or self._mm is None:
+            self._mm = (
+                np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, capacity))
+                if capacity else None
+            )
+            self._capacity = capacity
+        self._ids = index.get("ids", [])
+        self._coords = np.array(index.get("coords", []), dtype=np.float64).reshape(-1, 2)
+        self._pos = {cid: i for i, cid in enumerate(self._ids)}
+
+    def _grow(self, size: int) -> None:
+        capacity = max(INITIAL_CAPACITY, self._capacity)
+        while capacity < size:
+            capacity *= 2
+        if capacity == self._capacity:
+            return
+        tmp = self.directory / "matrix.f32.tmp"
+        grown = np.memmap(tmp, dtype=np.float32, mode="w+", shape=(capacity, capacity))
+        n = len(self._ids)
+        if n and self._mm is not None:
+            grown[:n, :n] = self._mm[:n, :n]
+        grown.flush()
+        del grown
+        os.replace(tmp, self._matrix_path)
+        self._mm = np.memmap(self._matrix_path, dtype=np.float32, mode="r+", shape=(capacity, capacity))
+        self._capacity = capacity
+
+    def _write_index(self) -> None:
+        tmp = self.directory / "index.json.tmp"
+        tmp.write_text(json.dumps({
+            "metric": self.metric.name,
+            "capacity": self._capacity,
+            "ids": self._ids,
+            "coords": self._coords.tolist(),
+        }))
+        os.replace(tmp, self._index_path)
+        self._mtime = self._index_path.stat().st_mtime_ns
+
+    def _stale(self, points: dict[int, tuple[float, float]]) -> dict[int, tuple[float, float]]:
+        if not points:
+            return {}
+        ids = list(points)
+        pos = np.array([self._pos.get(cid, -1) for cid in ids], dtype=np.int64)
+        coords = np.array([points[cid] for cid in ids], dtype=np.float64)
+        known = pos >= 0
+        stale = ~known
+        stale[known] = np.abs(self._coords[pos[known]] - coords[known]).max(axis=1) > 1e-7
+        return {ids[i]: points[ids[i]] for i in np.nonzero(stale)[0]}
+
+    def update(self, points: dict[int, tuple[float, float]]) -> int:
+        """거래처 좌표 반영 - 새로 추가/좌표가 바뀐 거래처의 행과 열만 계산. 갱신한 거래처 수 반환."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            changed = self._stale(points)
+            if not changed:
+                return 0
+            new = [cid for cid in changed if cid not in self._pos]
+            self._grow(len(self._ids) + len(new))
+            for cid in new:
+                self._pos[cid] = len(self._ids)
+                self._ids.append(cid)
+            self._coords = np.vstack([self._coords, np.zeros((len(new), 2))])
+            for cid, coord in changed.items():
+                self._coords[self._pos[cid]] = coord
+            n = len(self._ids)
+            rows = np.array([self._pos[cid] for cid in changed], dtype=np.int64)
+            keys = np.array(self._ids)
+            for start in range(0, len(rows), CHUNK):
+                part = rows[start:start + CHUNK]
+                block = self.metric.rows(keys[part], self._coords[part], keys, self._coords)
+                self._mm[part, :n] = block
+                self._mm[:n, part] = (
+                    block.T if self.metric.symmetric
+                    else self.metric.rows(keys, self._coords, keys[part], self._coords[part])
+                )
+            self._mm.flush()
+            self._write_index()
+            return len(changed)
+
+    def submatrix(
+        self, depot: tuple[float, float], points: list[tuple[int, float, float]]
+    ) -> np.ndarray:
+        """
+        노드 0 = 회사, 1..k = points(거래처 id, 위도, 경도) 순서의 거리 행렬 (m, float64).
+        캐시에 없거나 좌표가 다른 거래처는 먼저 반영.
+        """
+        coords = {cid: (lat, lon) for cid, lat, lon in points}
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            stale = bool(self._stale(coords))
+        if stale:
+            self.update(coords)
+        keys = [cid for cid, _, _ in points]
+        xy = np.array([(lat, lon) for _, lat, lon in points], dtype=np.float64).reshape(-1, 2)
+        k = len(points)
+        dist = np.zeros((k + 1, k + 1))
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            pos = np.array([self._pos[cid] for cid in keys], dtype=np.int64)
+            if k:
+                dist[1:, 1:] = self._mm[np.ix_(pos, pos)]
+        if k:
+            dist[0, 1:] = self.metric.rows([DEPOT_KEY], [depot], keys, xy)[0]
+            dist[1:, 0] = self.metric.rows(keys, xy, [DEPOT_KEY], [depot])[:, 0]
+        return dist
+
+
+_matrix: DistanceMatrix | None = None
+_matrix_lock = threading.Lock()
+
+
+def get_distance_matrix() -> DistanceMatrix:
+    global _matrix
+    with _matrix_lock:
+        if _matrix is None:
+            _matrix = DistanceMatrix(Path(get_settings().distance_cache_dir), load_metric())
+        return _matrix
+
+
+def refresh_customers(db: Session, customer_ids: list[int] | None = None) -> None:
+    """
+    거래처 좌표 저장 후 호출 - 좌표가 바뀐 거래처의 행/열만 갱신 (customer_ids 없으면 전체 비교).
+    실패해도 조회 시 다시 맞춰지므로 기록만 남긴다.
+    """
+    stmt = select(Customer.id, Customer.latitude, Customer.longitude).where(
+        Customer.latitude.is_not(None), Customer.longitude.is_not(None)
+    )
+    if customer_ids is not None:
+        stmt = stmt.where(Customer.id.in_(customer_ids))
+    rows = db.execute(stmt).all()
+    try:
+        get_distance_matrix().update({r.id: (float(r.latitude), float(r.longitude)) for r in rows})
+    except OSError as e:
+        log.warning("distance_matrix_update_failed", error=str(e))
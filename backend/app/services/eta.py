@@ -0,0 +1,278 @@
+"""
+남은 스탑 도착 예정 시각(ETA) - 지난 완료 기록으로 학습.
+구간 시간(출발 또는 직전 완료 → 완료) = 이동(거리 × 시간대별 m당 초) + 거래처별 작업 시간으로 보고 최소제곱으로 맞춘다.
+거래처/시간대 값은 표본이 적으면 전체 평균 쪽으로 당긴다. 학습 결과는 워커 메모리에 두고 ETA_REFIT_HOURS마다 다시 학습.
+예측은 루트의 마지막 완료(없으면 출발 시각)를 기준으로 남은 스탑을 순서대로 누적 - 완료가 생기면 기준만 옮겨 그 뒤를 다시 계산.
+"""
+import math
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Customer, Plan, Route, Stop, StopCompletion
+from app.services.app_settings import get_company_settings
+from app.services.distance_matrix import get_distance_matrix
+
+DEFAULT_PACE = 1 / 8.0  # 초/m (약 29km/h)
+DEFAULT_SERVICE = 300.0  # 거래처 작업 시간 (초)
+MAX_SEGMENT_SECONDS = 2 * 3600  # 이보다 긴 구간은 휴식 등으로 보고 학습에서 제외
+MIN_SAMPLES = 30  # 이보다 적으면 기본값
+CUSTOMER_PRIOR = 3.0  # 거래처 작업 시간: 전체 평균을 이만큼의 표본으로 취급
+HOUR_PRIOR_M = 20_000.0  # 시간대 속도: 전체 평균을 이만큼의 거리(m)로 취급
+
+
+class EtaStop(NamedTuple):
+    stop_id: int
+    customer_id: int
+    latitude: float | None
+    longitude: float | None
+    completed_at: datetime | None  # 첫 완료 시각
+
+
+class HistoryRoute(NamedTuple):
+    route_id: int
+    started_at: datetime | None  # 출발 기록이 없으면 첫 완료부터 학습
+    stops: list[EtaStop]  # sequence 순
+
+
+class EtaModel(NamedTuple):
+    pace: float = DEFAULT_PACE  # 전체 평균 초/m
+    service: float = DEFAULT_SERVICE  # 전체 평균 작업 시간 (초)
+    pace_by_hour: tuple[float, ...] = (DEFAULT_PACE,) * 24  # 출발 시각(서버 시간대)별 초/m
+    service_by_customer: dict[int, float] = {}
+    typical_travel: float = 600.0  # 좌표가 없는 구간의 이동 시간 (초)
+    samples: int = 0
+
+    def travel_seconds(self, meters: float, depart: datetime) -> float:
+        if math.isnan(meters):
+            return self.typical_travel
+        return meters * self.pace_by_hour[depart.astimezone().hour]
+
+    def service_seconds(self, customer_id: int) -> float:
+        return self.service_by_customer.get(customer_id, self.service)
+
+
+def load_history(db: Session, start: date, end: date) -> list[HistoryRoute]:
+    """플랜 날짜가 [start, end)인 루트의 스탑(sequence 순)과 첫 완료 시각"""
+    first_done = (
+        select(StopCompletion.stop_id, func.min(StopCompletion.completed_at).label("completed_at"))
+        .group_by(StopCompletion.stop_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Route.id.label("route_id"), Route.started_at, Stop.id, Stop.customer_id,
+            Customer.latitude, Customer.longitude, first_done.c.completed_at,
+        )
+        .join(Stop, Stop.route_id == Route.id)
+        .join(Plan, Route.plan_id == Plan.id)
+        .join(Customer, Stop.customer_id == Customer.id)
+        .outerjoin(first_done, first_done.c.stop_id == Stop.id)
+        .where(Plan.plan_date >= start, Plan.plan_date < end)
+        .order_by(Plan.plan_date, Route.id, Stop.sequence, Stop.id)
+    )
+    routes: list[HistoryRoute] = []
+    for r in db.execute(stmt):
+        if not routes or routes[-1].route_id != r.route_id:
+            routes.append(HistoryRoute(r.route_id, r.started_at, []))
+        routes[-1].stops.append(_eta_stop(r))
+    return routes
+
+
+def load_route_stops(db: Session, route_ids: list[int]) -> dict[int, list[EtaStop]]:
+    """루트별 스탑(sequence 순)과 첫 완료 시각 - 예측 입력"""
+    first_done = (
+        select(StopCompletion.stop_id, func.min(StopCompletion.completed_at).label("completed_at"))
+        .join(Stop, StopCompletion.stop_id == Stop.id)
+        .where(Stop.route_id.in_(route_ids))
+        .group_by(StopCompletion.stop_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(Stop.route_id, Stop.id, Stop.customer_id, Customer.latitude, Customer.longitude, first_done.c.completed_at)
+        .join(Customer, Stop.customer_id == Customer.id)
+        .outerjoin(first_done, first_done.c.stop_id == Stop.id)
+        .where(Stop.route_id.in_(route_ids))
+        .order_by(Stop.route_id, Stop.sequence, Stop.id)
+    )
+    result: dict[int, list[EtaStop]] = {rid: [] for rid in route_ids}
+    for r in rows:
+        result[r.route_id].append(_eta_stop(r))
+    return result
+
+
+def _eta_stop(r) -> EtaStop:
+    return EtaStop(
+        r.id, r.customer_id,
+        float(r.latitude) if r.latitude is not None else None,
+        float(r.longitude) if r.longitude is not None else None,
+        r.completed_at,
+    )
+
+
+def company_depot(db: Session) -> tuple[float, float] | None:
+    company = get_company_settings(db)
+    if company.company_latitude is None or company.company_longitude is None:
+        return None
+    return company.company_latitude, company.company_longitude
+
+
+def distances(depot: tuple[float, float] | None, stops: list[EtaStop]) -> np.ndarray:
+    """노드 0 = 회사, i+1 = stops[i] 거리 행렬 (m). 좌표가 없는 노드는 NaN."""
+    known = [i for i, s in enumerate(stops) if s.latitude is not None and s.longitude is not None]
+    dist = np.full((len(stops) + 1, len(stops) + 1), np.nan)
+    if not known:
+        return dist
+    first = stops[known[0]]
+    sub = get_distance_matrix().submatrix(
+        depot or (first.latitude, first.longitude),
+        [(stops[i].customer_id, stops[i].latitude, stops[i].longitude) for i in known],
+    )
+    nodes = np.array([0] + [i + 1 for i in known])
+    dist[np.ix_(nodes, nodes)] = sub
+    if depot is None:
+        dist[0, :] = dist[:, 0] = np.nan
+    return dist
+
+
+class Segments(NamedTuple):
+    meters: np.ndarray
+    seconds: np.ndarray
+    customer_id: np.ndarray
+    hour: np.ndarray
+
+
+def segments(routes: list[HistoryRoute], depot: tuple[float, float] | None) -> Segments:
+    """완료 순서대로 (직전 위치 → 거래처) 구간. 좌표가 없거나 너무 긴 구간은 제외."""
+    meters, seconds, customers, hours = [], [], [], []
+    for route in routes:
+        done = sorted((s for s in route.stops if s.completed_at), key=lambda s: s.completed_at)
+        if not done:
+            continue
+        dist = distances(depot, done)
+        prev_node, prev_at = 0, route.started_at
+        for i, s in enumerate(done, start=1):
+            dt = (s.completed_at - prev_at).total_seconds() if prev_at else 0
+            if 0 < dt <= MAX_SEGMENT_SECONDS and not math.isnan(dist[prev_node, i]):
+                meters.append(dist[prev_node, i])
+                seconds.append(dt)
+                customers.append(s.customer_id)
+                hours.append(prev_at.astimezone().hour)
+            prev_node, prev_at = i, s.completed_at
+    return Segments(
+        np.array(meters, dtype=np.float64), np.array(seconds, dtype=np.float64),
+        np.array(customers, dtype=np.int64), np.array(hours, dtype=np.int64),
+    )
+
+
+def fit(seg: Segments) -> EtaModel:
+    n = len(seg.seconds)
+    if n < MIN_SAMPLES:
+        return EtaModel(samples=n)
+    # 구간 시간 = 거리 × pace + service, 잔차가 큰 구간(MAD 기준) 빼고 한 번 더
+    a = np.stack([seg.meters, np.ones(n)], axis=1)
+    mask = np.ones(n, dtype=bool)
+    for _ in range(2):
+        (pace, service), *_ = np.linalg.lstsq(a[mask], seg.seconds[mask], rcond=None)
+        resid = seg.seconds - a @ (pace, service)
+        mad = np.median(np.abs(resid - np.median(resid))) or 1.0
+        mask = np.abs(resid) <= 3 * 1.4826 * mad
+    if not (1 / 30 <= pace <= 1.0) or not (0 <= service <= 3600):
+        pace, service = DEFAULT_PACE, DEFAULT_SERVICE
+    m, sec, cust, hours = seg.meters[mask], seg.seconds[mask], seg.customer_id[mask], seg.hour[mask]
+
+    ids, inv = np.unique(cust, return_inverse=True)
+    resid = sec - m * pace
+    per_customer = (np.bincount(inv, weights=resid) + CUSTOMER_PRIOR * service) / (np.bincount(inv) + CUSTOMER_PRIOR)
+    per_customer = np.clip(per_customer, 0, 3600)
+    service_by_customer = dict(zip(ids.tolist(), per_customer.tolist()))
+
+    travel = np.maximum(sec - per_customer[inv], 0)
+    by_hour = (np.bincount(hours, weights=travel, minlength=24) + HOUR_PRIOR_M * pace) / (
+        np.bincount(hours, weights=m, minlength=24) + HOUR_PRIOR_M
+    )
+    by_hour = np.clip(by_hour, pace / 3, pace * 3)
+    return EtaModel(
+        pace=float(pace),
+        service=float(service),
+        pace_by_hour=tuple(by_hour.tolist()),
+        service_by_customer=service_by_customer,
+        typical_travel=float(np.median(m) * pace),
+        samples=int(mask.sum()),
+    )
+
+
+def fit_range(db: Session, start: date, end: date) -> EtaModel:
+    return fit(segments(load_history(db, start, end), company_depot(db)))
+
+
+class Prediction(NamedTuple):
+    stop_id: int
+    arrival: datetime
+    done: datetime  # 작업까지 끝나는 예상 시각
+
+
+def predict(
+    model: EtaModel, started_at: datetime, stops: list[EtaStop], dist: np.ndarray, now: datetime
+) -> list[Prediction]:
+    """
+    남은 스탑(sequence 순)의 예상 도착/완료 시각. dist는 distances(depot, stops).
+    기준 = 마지막 완료(없으면 출발). 예상보다 늦어져 이미 지난 도착 시각은 now로 미룬다.
+    """
+    done = [(s.completed_at, i + 1) for i, s in enumerate(stops) if s.completed_at and s.completed_at <= now]
+    at, node = max(done) if done else (started_at, 0)
+    result = []
+    for i, s in enumerate(stops, start=1):
+        if s.completed_at and s.completed_at <= now:
+            continue
+        arrival = max(at + timedelta(seconds=model.travel_seconds(dist[node, i], at)), now)
+        at = arrival + timedelta(seconds=model.service_seconds(s.customer_id))
+        node = i
+        result.append(Prediction(s.stop_id, arrival, at))
+    return result
+
+
+_model: EtaModel | None = None
+_fitted_at = 0.0
+_fit_lock = threading.Lock()
+
+
+def get_model(db: Session) -> EtaModel:
+    """학습된 모델 (ETA_REFIT_HOURS 지나면 다시 학습 - 그동안 다른 요청은 이전 모델 사용)"""
+    global _model, _fitted_at
+    settings = get_settings()
+    if _model is not None and time.monotonic() - _fitted_at < settings.eta_refit_hours * 3600:
+        return _model
+    if not _fit_lock.acquire(blocking=_model is None):
+        return _model
+    try:
+        if _model is None or time.monotonic() - _fitted_at >= settings.eta_refit_hours * 3600:
+            end = date.today()
+            _model = fit_range(db, end - timedelta(days=settings.eta_history_days), end + timedelta(days=1))
+            _fitted_at = time.monotonic()
+        return _model
+    finally:
+        _fit_lock.release()
+
+
+def route_etas(db: Session, routes: list[Route]) -> dict[int, list[Prediction]]:
+    """출발한 루트별 남은 스탑 예측 (출발 전 루트는 빈 목록)"""
+    started = [r for r in routes if r.started_at]
+    result: dict[int, list[Prediction]] = {r.id: [] for r in routes}
+    if not started:
+        return result
+    model = get_model(db)
+    depot = company_depot(db)
+    now = datetime.now(timezone.utc)
+    stops_by_route = load_route_stops(db, [r.id for r in started])
+    for r in started:
+        stops = stops_by_route[r.id]
+        if any(not s.completed_at for s in stops):
+            result[r.id] = predict(model, r.started_at, stops, distances(depot, stops), now)
+    return result
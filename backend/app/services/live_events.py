@@ -0,0 +1,144 @@
+"""
+실시간 배송 현황 이벤트 - 루트 시작/스탑 완료/기사 배정 변경을 관리자 화면(SSE)으로 전달.
+발행: 요청 트랜잭션 안에서 pg_notify → 커밋될 때만 전달되고(롤백되면 없음) 모든 uvicorn 워커가 받는다.
+수신: 워커마다 LISTEN 연결 하나가 이벤트를 받아 구독자(관리자 탭)별 큐로 나눠 준다 (탭 수와 무관하게 DB 연결 1개).
+"""
+import asyncio
+import json
+from collections.abc import Callable
+
+import structlog
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.database import engine
+
+log = structlog.get_logger(__name__)
+
+CHANNEL = "delivery_events"
+QUEUE_SIZE = 100  # 구독자별 대기 이벤트 한도 (넘치면 비우고 resync)
+IDLE_CHECK_SECONDS = 60.0  # 이벤트가 없을 때 LISTEN 연결 확인 간격
+MAX_RECONNECT_DELAY = 30.0
+RESYNC = {"type": "resync"}  # 놓친 이벤트가 있을 수 있음 - 화면이 전체를 다시 조회
+
+
+def publish(db: Session, event: dict) -> None:
+    """이벤트 발행 (커밋 시 전달). payload는 8000바이트 이하의 작은 dict."""
+    db.execute(select(func.pg_notify(CHANNEL, json.dumps(event, ensure_ascii=False, default=str))))
+
+
+class Subscription:
+    def __init__(self, match: Callable[[dict], bool]):
+        self.match = match
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(QUEUE_SIZE)
+
+    def put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 느린 탭 - 쌓인 이벤트 대신 전체 재조회 요청
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class EventHub:
+    """워커당 하나 - 첫 구독 때 LISTEN 시작, 연결이 끊기면 재연결 후 구독자에게 resync"""
+
+    def __init__(self):
+        self._subscribers: set[Subscription] = set()
+        self._listeners: list[Callable[[dict], None]] = []
+        self._task: asyncio.Task | None = None
+        self._listening = False
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    def subscribe(self, match: Callable[[dict], bool]) -> Subscription:
+        self._start()
+        sub = Subscription(match)
+        self._subscribers.add(sub)
+        return sub
+
+    def add_listener(self, callback: Callable[[dict], None]) -> None:
+        """모든 이벤트를 받는 프로세스 내부 콜백 (예: 메모리 캐시 갱신). 이벤트 루프 안에서 호출."""
+        self._start()
+        self._listeners.append(callback)
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    def dispatch(self, event: dict) -> None:
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                log.warning("live_events_listener_failed", error=str(e))
+        for sub in list(self._subscribers):
+            if event.get("type") == RESYNC["type"] or sub.match(event):
+                sub.put(event)
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        listened = False
+        while True:
+            self._listening = False
+            try:
+                await self._listen_once(resync=listened)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("live_events_listen_failed", error=str(e), retry_in=delay)
+            if self._listening:
+                listened = True
+                delay = 1.0
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    async def _listen_once(self, resync: bool) -> None:
+        raw = await asyncio.to_thread(engine.raw_connection)
+        conn = raw.dbapi_connection
+        raw.detach()  # 풀에 돌려주지 않는 전용 연결
+        fd = conn.fileno()
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        try:
+            conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            loop.add_reader(fd, ready.set)
+            self._listening = True
+            if resync:
+                self.dispatch(RESYNC)
+            while True:
+                try:
+                    await asyncio.wait_for(ready.wait(), IDLE_CHECK_SECONDS)
+                except asyncio.TimeoutError:
+                    with conn.cursor() as cur:
+                        cur.execute("SELECT 1")
+                ready.clear()
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        self.dispatch(json.loads(notify.payload))
+                    except ValueError:
+                        log.warning("live_events_bad_payload", payload=notify.payload[:200])
+        finally:
+            loop.remove_reader(fd)
+            conn.close()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._listeners.clear()
+
+
+hub = EventHub()
@@ -0,0 +1,141 @@
+"""거래명세표 데이터 / 금액 계산"""
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, contains_eager, joinedload, selectinload
+
+from app.models import ArrearsEntry, Route, Stop, StopCompletion, StopOrderItem
+from app.services.app_settings import CompanySettings
+
+
+def calc_receipt_line(quantity: float, unit_price: float | None) -> tuple[int, int]:
+    """금액(공급가액), 세액 계산. 단가는 세금 포함 가정 (VAT 10%)"""
+    if unit_price is None or quantity <= 0:
+        return 0, 0
+    total = int(Decimal(str(quantity)) * Decimal(str(unit_price)))
+    supply = round(total / Decimal("1.1"))  # 공급가액 (반올림)
+    tax = total - supply  # 세액
+    return supply, tax
+
+
+def _supplier(company: CompanySettings) -> dict:
+    return {
+        "business_registration_number": company.business_registration_number,
+        "name": company.company_name,
+        "representative_name": company.representative_name,
+        "address": company.company_address,
+        "business_type": company.business_type,
+        "business_category": company.business_category,
+    }
+
+
+def _bank_info(company: CompanySettings) -> str:
+    bank_parts = []
+    if company.bank_name:
+        bank_parts.append(company.bank_name)
+    if company.bank_account:
+        bank_parts.append(company.bank_account)
+    holder = company.bank_holder or company.representative_name
+    comp = company.company_name
+    if holder and comp:
+        bank_parts.append(f"{holder}({comp})")
+    elif holder:
+        bank_parts.append(holder)
+    return " ".join(bank_parts) if bank_parts else ""
+
+
+def build_receipt(stop: Stop, company: CompanySettings, charge: ArrearsEntry | None = None) -> dict:
+    """
+    스탑 1건의 거래명세표 데이터. stop.route.plan, stop.customer, stop.order_items(.item),
+    stop.completions가 미리 로드되어 있어야 추가 쿼리가 없다. charge = 이 스탑의 미수금 원장 청구 행.
+    """
+    plan = stop.route.plan if stop.route else None
+    plan_date: date = plan.plan_date if plan else date.today()
+    customer = stop.customer
+
+    buyer = {
+        "business_registration_number": customer.business_registration_number or "",
+        "name": customer.name or "",
+        "representative_name": customer.representative_name or "",
+        "address": customer.address or "",
+        "business_type": customer.business_type or "",
+        "business_category": customer.business_category or "",
+    }
+
+    items: list[dict] = []
+    supply_total = 0
+    tax_total = 0
+    for oi in sorted(stop.order_items, key=lambda oi: oi.id):  # 로딩 방식과 무관하게 입력 순서
+        item = oi.item
+        if not item:
+            continue
+        unit_price_display = int(item.unit_price or 0)
+        supply, tax = calc_receipt_line(float(oi.quantity), item.unit_price)
+        parts = [item.code or "", item.product or ""]
+        if item.description:
+            parts.append(str(item.description))
+        if item.weight:
+            parts.append(f"({item.weight}kg{item.unit or ''})")
+        product_spec = " ".join(str(p) for p in parts if p).strip()
+
+        supply_total += supply
+        tax_total += tax
+        items.append({
+            "product_spec": product_spec,
+            "unit": item.unit or "",
+            "quantity": float(oi.quantity),
+            "unit_price": unit_price_display,
+            "supply_amount": supply,
+            "tax_amount": tax,
+        })
+
+    total = supply_total + tax_total
+    customer_arrears = int(customer.arrears or 0)
+    # 거래명세표는 항상 배송전 관점: 전미수 = 이 스탑 청구 직전 잔액
+    if charge is not None:
+        prev_arrears = int(charge.balance - charge.amount)
+    elif stop.is_completed and customer_arrears >= total:
+        prev_arrears = customer_arrears - total  # 원장 도입 전 완료 - 현재 잔액에서 역산
+    else:
+        prev_arrears = customer_arrears
+    arrears = prev_arrears + total
+
+    return {
+        "stop_id": stop.id,
+        "doc_no": f"{plan_date.strftime('%m%d')}-{stop.id:04d}",
+        "date_str": plan_date.strftime("%Y년 %m월 %d일"),
+        "supplier": _supplier(company),
+        "buyer": buyer,
+        "bank_info": _bank_info(company),
+        "items": items,
+        "supply_total": supply_total,
+        "tax_total": tax_total,
+        "total": total,
+        "prev_arrears": prev_arrears,
+        "arrears": arrears,
+    }
+
+
+def load_receipt_stops(db: Session, *, route_id: int | None = None, plan_id: int | None = None) -> list[Stop]:
+    """
+    루트/플랜 전체 스탑을 거래명세표용 관계와 함께 로드 (스탑 수와 무관하게 쿼리 4회:
+    스탑+루트+플랜+거래처, 배정, 주문 품목+품목, 완료).
+    """
+    stmt = (
+        select(Stop)
+        .join(Stop.route)
+        .options(
+            contains_eager(Stop.route).joinedload(Route.plan),
+            contains_eager(Stop.route).selectinload(Route.assignments),
+            joinedload(Stop.customer),
+            selectinload(Stop.order_items).joinedload(StopOrderItem.item),
+            selectinload(Stop.completions).load_only(StopCompletion.id),
+        )
+        .order_by(Route.sequence, Route.id, Stop.sequence, Stop.id)
+    )
+    if route_id is not None:
+        stmt = stmt.where(Stop.route_id == route_id)
+    if plan_id is not None:
+        stmt = stmt.where(Route.plan_id == plan_id)
+    return list(db.execute(stmt).scalars().unique().all())
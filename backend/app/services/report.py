@@ -1,18 +1,103 @@
-"""월말 정산 리포트 PDF 생성"""
+"""월말 정산 리포트 / 거래처별 명세 PDF 생성"""
+import os
+from collections.abc import Callable, Iterable, Iterator
 from datetime import date
 from decimal import Decimal
 from io import BytesIO
+from itertools import islice
 
+import structlog
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import KeepTogether, PageBreak, SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 from reportlab.pdfbase.ttfonts import TTFont
 
-# 한글 폰트 대체: 기본 Helvetica 사용 (한글 미지원 시 깨짐). 사용 시 system font 등록 필요
-# pdfmetrics.registerFont(TTFont('Malgun', 'malgun.ttf'))
+from app.config import get_settings
+
+log = structlog.get_logger(__name__)
+
+# 한글 TTF 후보 (REPORT_FONT_PATH 우선). Docker 이미지는 fonts-nanum 설치.
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/nanum/NanumGothic.ttf",
+    "C:/Windows/Fonts/malgun.ttf",
+    "/Library/Fonts/AppleGothic.ttf",
+]
+CID_FALLBACK_FONT = "HYSMyeongJo-Medium"  # TTF가 없을 때 ReportLab 내장 한글 CID 폰트
+
+
+def _register_korean_font() -> str:
+    """모듈 로드 시 1회 한글 폰트 등록 후 폰트 이름 반환"""
+    configured = get_settings().report_font_path
+    for path in ([configured] if configured else []) + FONT_CANDIDATES:
+        if os.path.isfile(path):
+            try:
+                pdfmetrics.registerFont(TTFont("Korean", path))
+                return "Korean"
+            except Exception as e:
+                log.warning("report_font_register_failed", path=path, error=str(e))
+    pdfmetrics.registerFont(UnicodeCIDFont(CID_FALLBACK_FONT))
+    return CID_FALLBACK_FONT
+
+
+FONT_NAME = _register_korean_font()
+
+PAGE_SIZE = A4
+MARGIN = 20 * mm
+FRAME_HEIGHT = PAGE_SIZE[1] - 2 * MARGIN - 12  # SimpleDocTemplate 프레임 기본 패딩(6pt x 2) 제외
+DETAIL_FONT_SIZE = 8
+DETAIL_ROW_HEIGHT = 12
+# 완료 내역 컬럼 폭 (합계 170mm = A4 폭 - 좌우 여백). 셀마다 폭을 재지 않도록 고정.
+DETAIL_COL_WIDTHS = [22 * mm, 25 * mm, 55 * mm, 30 * mm, 38 * mm]
+DETAIL_HEADER = ["일자", "루트", "거래처", "기사", "완료시각"]
+# 헤더 포함 한 페이지에 들어가는 행 수만큼 잘라 표를 여러 개로 만든다 (큰 표 하나의 레이아웃 비용 회피)
+ROWS_PER_TABLE = int(FRAME_HEIGHT // DETAIL_ROW_HEIGHT) - 1
+
+SUMMARY_COL_WIDTHS = [50 * mm, 28 * mm, 28 * mm, 28 * mm, 36 * mm]
+# 거래처 명세: 품목, 단위, 수량, 단가, 공급가액, 세액 (170mm)
+STATEMENT_COL_WIDTHS = [58 * mm, 14 * mm, 20 * mm, 22 * mm, 30 * mm, 26 * mm]
+STATEMENT_HEADER = ["품목", "단위", "수량", "단가", "공급가액", "세액"]
+# 품목별 합계: 품목, 단위, 수량, 거래처 수, 공급가액, 세액, 합계 (170mm)
+ITEM_TOTAL_COL_WIDTHS = [50 * mm, 14 * mm, 20 * mm, 18 * mm, 24 * mm, 20 * mm, 24 * mm]
+ITEM_TOTAL_HEADER = ["품목", "단위", "수량", "거래처 수", "공급가액", "세액", "합계"]
+
+_HEADER_STYLE = [
+    ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+]
+SUMMARY_STYLE = TableStyle(
+    _HEADER_STYLE
+    + [
+        ("FONTSIZE", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+        ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+    ]
+)
+AMOUNT_STYLE = TableStyle(
+    _HEADER_STYLE
+    + [
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("ALIGN", (2, 1), (-1, -1), "RIGHT"),
+        ("BACKGROUND", (0, -1), (-1, -1), colors.beige),
+    ]
+)
+DETAIL_STYLE = TableStyle(
+    _HEADER_STYLE
+    + [
+        ("FONTSIZE", (0, 0), (-1, -1), DETAIL_FONT_SIZE),
+        ("LEADING", (0, 0), (-1, -1), DETAIL_FONT_SIZE + 1),
+        ("TOPPADDING", (0, 0), (-1, -1), 1),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.white),
+    ]
+)
 
 
 def _money_fmt(d: Decimal | None) -> str:
@@ -21,78 +106,176 @@ def _money_fmt(d: Decimal | None) -> str:
     return f"{d:,.0f}"
 
 
+def _qty_fmt(q: float) -> str:
+    return f"{q:,.0f}" if float(q).is_integer() else f"{q:,.2f}"
+
+
+def _fit(text: str, width: float, size: int = DETAIL_FONT_SIZE) -> str:
+    """셀 폭을 넘는 문자열은 말줄임. 전각 기준으로도 들어가는 짧은 문자열은 측정 생략."""
+    limit = width - 4  # 좌우 셀 패딩
+    if len(text) * size <= limit:
+        return text
+    if pdfmetrics.stringWidth(text, FONT_NAME, size) <= limit:
+        return text
+    while text and pdfmetrics.stringWidth(text + "…", FONT_NAME, size) > limit:
+        text = text[:-1]
+    return text + "…"
+
+
+def _detail_row(c: dict) -> list[str]:
+    completed_at = c.get("completed_at")
+    values = [
+        str(c.get("plan_date", "")),
+        c.get("route_name") or "",
+        c.get("customer_name") or "",
+        c.get("driver_name") or "",
+        str(completed_at)[:19] if completed_at else "",
+    ]
+    return [_fit(v, w) for v, w in zip(values, DETAIL_COL_WIDTHS)]
+
+
+def _detail_tables(completions: Iterable[dict]) -> Iterator[Table]:
+    """완료 내역을 페이지 크기 표로 나눠 반환 (헤더 반복, 고정 폭/높이)"""
+    rows = map(_detail_row, completions)
+    while chunk := list(islice(rows, ROWS_PER_TABLE)):
+        t = Table(
+            [DETAIL_HEADER] + chunk,
+            colWidths=DETAIL_COL_WIDTHS,
+            rowHeights=[DETAIL_ROW_HEIGHT] * (len(chunk) + 1),
+            repeatRows=1,
+        )
+        t.setStyle(DETAIL_STYLE)
+        yield t
+
+
+def _doc(buf: BytesIO) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        buf, pagesize=PAGE_SIZE, rightMargin=MARGIN, leftMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN
+    )
+
+
 def generate_monthly_report_pdf(
     plan_date_from: date,
     plan_date_to: date,
-    completions: list,
-    summary_by_driver: dict,
+    completions: Iterable[dict],
+    summary_by_driver: list[dict],
 ) -> BytesIO:
-    """월말 정산 리포트 PDF 생성"""
+    """월말 정산 리포트 PDF 생성 (summary_by_driver: report_data.driver_summary 결과)"""
     buf = BytesIO()
-    doc = SimpleDocTemplate(buf, pagesize=A4, rightMargin=20 * mm, leftMargin=20 * mm)
+    doc = _doc(buf)
     styles = getSampleStyleSheet()
+    title_style = ParagraphStyle("KoTitle", parent=styles["Title"], fontName=FONT_NAME)
+    heading_style = ParagraphStyle("KoHeading2", parent=styles["Heading2"], fontName=FONT_NAME)
     story = []
 
     title = Paragraph(
         f"<b>월말 정산 리포트</b><br/>"
         f"{plan_date_from} ~ {plan_date_to}",
-        styles["Title"],
+        title_style,
     )
     story.append(title)
     story.append(Spacer(1, 12))
 
     # 기사별 요약
     if summary_by_driver:
-        driver_data = [["기사", "완료 스탑 수", "비고"]]
-        for name, data in summary_by_driver.items():
-            driver_data.append([name, str(data.get("count", 0)), data.get("memo", "")])
-        t = Table(driver_data)
-        t.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("FONTSIZE", (0, 0), (-1, -1), 10),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                ]
-            )
-        )
-        story.append(Paragraph("<b>기사별 완료 현황</b>", styles["Heading2"]))
+        driver_data = [["기사", "완료 건수", "스탑 수", "거래처 수", "매출"]]
+        for d in summary_by_driver:
+            driver_data.append([
+                _fit(d["driver_name"], SUMMARY_COL_WIDTHS[0], 10),
+                str(d["completions"]),
+                str(d["stops"]),
+                str(d["customers"]),
+                _money_fmt(d["sales"]),
+            ])
+        t = Table(driver_data, colWidths=SUMMARY_COL_WIDTHS, repeatRows=1)
+        t.setStyle(SUMMARY_STYLE)
+        story.append(Paragraph("<b>기사별 완료 현황</b>", heading_style))
         story.append(Spacer(1, 6))
         story.append(t)
         story.append(Spacer(1, 12))
 
     # 완료 목록
-    if completions:
-        comp_data = [["일자", "루트", "거래처", "기사", "완료시각"]]
-        for c in completions:
-            comp_data.append(
-                [
-                    str(c.get("plan_date", "")),
-                    c.get("route_name", ""),
-                    c.get("customer_name", ""),
-                    c.get("driver_name", ""),
-                    str(c.get("completed_at", ""))[:19] if c.get("completed_at") else "",
-                ]
-            )
-        t2 = Table(comp_data)
-        t2.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("FONTSIZE", (0, 0), (-1, -1), 9),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.white),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                ]
-            )
-        )
-        story.append(Paragraph("<b>완료 내역</b>", styles["Heading2"]))
+    tables = list(_detail_tables(completions))
+    if tables:
+        story.append(Paragraph("<b>완료 내역</b>", heading_style))
         story.append(Spacer(1, 6))
-        story.append(t2)
+        story.extend(tables)
+
+    doc.build(story)
+    buf.seek(0)
+    return buf
+
+
+def _statement_table(st: dict) -> Table:
+    data = [STATEMENT_HEADER]
+    for i in st["items"]:
+        data.append([
+            _fit(f"{i['item_code']} {i['product']}", STATEMENT_COL_WIDTHS[0], 9),
+            i["unit"],
+            _qty_fmt(i["quantity"]),
+            _money_fmt(i["unit_price"]),
+            _money_fmt(i["supply_amount"]),
+            _money_fmt(i["tax_amount"]),
+        ])
+    data.append(["합계", "", "", "", _money_fmt(st["supply_total"]), _money_fmt(st["tax_total"])])
+    t = Table(data, colWidths=STATEMENT_COL_WIDTHS, repeatRows=1)
+    t.setStyle(AMOUNT_STYLE)
+    return t
+
+
+def generate_statements_pdf(
+    plan_date_from: date,
+    plan_date_to: date,
+    statements: Iterable[dict],
+    item_totals: Callable[[], list[dict]],
+) -> BytesIO:
+    """
+    거래처별 월 명세 PDF (거래처당 1페이지부터, 마지막에 품목별 합계).
+    item_totals는 statements를 모두 소비한 뒤 호출된다 (같은 집계 패스에서 누적).
+    """
+    buf = BytesIO()
+    doc = _doc(buf)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle("KoTitle", parent=styles["Title"], fontName=FONT_NAME)
+    heading_style = ParagraphStyle("KoHeading2", parent=styles["Heading2"], fontName=FONT_NAME)
+    body_style = ParagraphStyle("KoBody", parent=styles["Normal"], fontName=FONT_NAME)
+    period = f"{plan_date_from} ~ {plan_date_to}"
+    story = []
+    for st in statements:
+        story.append(Paragraph(f"<b>거래처별 월 명세</b> ({period})", heading_style))
+        story.append(Paragraph(f"{st['customer_name']} ({st['customer_code'] or '-'})", title_style))
+        story.append(Spacer(1, 6))
+        story.append(_statement_table(st))
+        story.append(Spacer(1, 8))
+        story.append(KeepTogether([
+            Paragraph(f"당월 청구액: {_money_fmt(st['total'])}원", body_style),
+            Paragraph(f"현재 미수금: {_money_fmt(st['arrears'])}원", body_style),
+        ]))
+        story.append(PageBreak())
+
+    totals = item_totals()
+    story.append(Paragraph(f"<b>품목별 합계</b> ({period})", heading_style))
+    story.append(Spacer(1, 6))
+    data = [ITEM_TOTAL_HEADER]
+    for t in totals:
+        data.append([
+            _fit(f"{t['item_code']} {t['product']}", ITEM_TOTAL_COL_WIDTHS[0], 9),
+            t["unit"],
+            _qty_fmt(t["quantity"]),
+            str(t["customers"]),
+            _money_fmt(t["supply_amount"]),
+            _money_fmt(t["tax_amount"]),
+            _money_fmt(t["total"]),
+        ])
+    data.append([
+        "합계", "", "", "",
+        _money_fmt(sum(t["supply_amount"] for t in totals)),
+        _money_fmt(sum(t["tax_amount"] for t in totals)),
+        _money_fmt(sum(t["total"] for t in totals)),
+    ])
+    table = Table(data, colWidths=ITEM_TOTAL_COL_WIDTHS, repeatRows=1)
+    table.setStyle(AMOUNT_STYLE)
+    story.append(table)
 
     doc.build(story)
     buf.seek(0)
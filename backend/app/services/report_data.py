@@ -0,0 +1,289 @@
+"""월말 정산 리포트 데이터 - 기사별 집계/거래처별 명세는 SQL GROUP BY, 상세 내역은 서버 측 커서로 조회"""
+import hashlib
+from calendar import monthrange
+from collections.abc import Iterator
+from datetime import date
+
+from sqlalchemy import Integer, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from app.models import Customer, Item, Plan, Route, Stop, StopCompletion, StopOrderItem, User
+from app.services.arrears import balance_as_of_expr, day_end
+from app.services.receipt import calc_receipt_line
+from app.services.search import table_version
+
+UNKNOWN_DRIVER = "미확인"
+YIELD_PER = 1000
+
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    """해당 월의 첫날, 마지막 날"""
+    _, last = monthrange(year, month)
+    return date(year, month, 1), date(year, month, last)
+
+
+def _driver_name():
+    # 표시명이 비어 있으면 아이디, 완료자 미지정(삭제 포함)이면 '미확인'
+    return func.coalesce(func.nullif(User.display_name, ""), User.username, literal(UNKNOWN_DRIVER))
+
+
+def _stop_sales():
+    """스탑별 주문 금액 (라인별 수량 x 단가 절사 합계 - arrears.stop_total과 동일 기준)"""
+    line = func.trunc(StopOrderItem.quantity * func.coalesce(Item.unit_price, 0))
+    return (
+        select(StopOrderItem.stop_id, func.sum(line).label("amount"))
+        .join(Item, StopOrderItem.item_id == Item.id)
+        .group_by(StopOrderItem.stop_id)
+        .subquery("stop_sales")
+    )
+
+
+def _month_completions(stmt, start: date, end: date):
+    return (
+        stmt.select_from(StopCompletion)
+        .join(Stop, StopCompletion.stop_id == Stop.id)
+        .join(Route, Stop.route_id == Route.id)
+        .join(Plan, Route.plan_id == Plan.id)
+        .outerjoin(User, StopCompletion.completed_by_user_id == User.id)
+        .where(Plan.plan_date >= start, Plan.plan_date <= end)
+    )
+
+
+def completion_version(db: Session, start: date, end: date) -> str:
+    """기간 내 완료 데이터 버전 (건수 + id 합 + 최종 완료시각) - 완료 추가/삭제 시 바뀜"""
+    count, id_sum, last = db.execute(
+        select(
+            func.count(StopCompletion.id),
+            func.coalesce(func.sum(StopCompletion.id), 0),
+            func.max(StopCompletion.completed_at),
+        )
+        .join(Stop, StopCompletion.stop_id == Stop.id)
+        .join(Route, Stop.route_id == Route.id)
+        .join(Plan, Route.plan_id == Plan.id)
+        .where(Plan.plan_date >= start, Plan.plan_date <= end)
+    ).one()
+    raw = f"{count}:{id_sum}:{last.isoformat() if last else ''}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def _period_stops_version(db: Session, start: date, end: date) -> str:
+    """기간 내 스탑/루트(건수 + 최종 수정시각)와 주문 품목 버전. 주문 품목은 updated_at이 없어 id/품목/수량 합으로."""
+    stops = db.execute(
+        select(func.count(Stop.id), func.max(Stop.updated_at), func.max(Route.updated_at))
+        .join(Route, Stop.route_id == Route.id)
+        .join(Plan, Route.plan_id == Plan.id)
+        .where(Plan.plan_date >= start, Plan.plan_date <= end)
+    ).one()
+    lines = db.execute(
+        select(
+            func.count(StopOrderItem.id),
+            func.coalesce(func.sum(StopOrderItem.id), 0),
+            func.coalesce(func.sum(StopOrderItem.item_id), 0),
+            func.coalesce(func.sum(StopOrderItem.quantity), 0),
+        )
+        .join(Stop, StopOrderItem.stop_id == Stop.id)
+        .join(Route, Stop.route_id == Route.id)
+        .join(Plan, Route.plan_id == Plan.id)
+        .where(Plan.plan_date >= start, Plan.plan_date <= end)
+    ).one()
+    return ":".join(map(str, (*stops, *lines)))
+
+
+def monthly_version(db: Session, start: date, end: date) -> str:
+    """월말 정산 데이터 버전 - 완료 내역 + 스탑/주문 품목 + 거래처명/품목 단가/기사명 변경 반영"""
+    raw = ":".join([
+        completion_version(db, start, end),
+        _period_stops_version(db, start, end),
+        table_version(db, Customer),
+        table_version(db, Item),
+        table_version(db, User),
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def driver_summary(db: Session, start: date, end: date) -> list[dict]:
+    """기사별 완료 건수 / 스탑 수 / 매출 / 거래처 수 (쿼리 1회)"""
+    sales = _stop_sales()
+    name = _driver_name().label("driver_name")
+    stmt = _month_completions(
+        select(
+            name,
+            func.count(StopCompletion.id).label("completions"),
+            func.count(func.distinct(Stop.id)).label("stops"),
+            cast(func.coalesce(func.sum(sales.c.amount), 0), Integer).label("sales"),
+            func.count(func.distinct(Stop.customer_id)).label("customers"),
+        ),
+        start,
+        end,
+    ).outerjoin(sales, sales.c.stop_id == Stop.id)
+    stmt = stmt.group_by(User.id, name).order_by(name)
+    return [dict(r._mapping) for r in db.execute(stmt)]
+
+
+def iter_completion_rows(db: Session, start: date, end: date) -> Iterator[dict]:
+    """완료 상세 내역 (컬럼 전용 select를 yield_per로 나눠 읽음)"""
+    stmt = _month_completions(
+        select(
+            Plan.plan_date,
+            Route.name.label("route_name"),
+            Customer.name.label("customer_name"),
+            _driver_name().label("driver_name"),
+            StopCompletion.completed_at,
+        ),
+        start,
+        end,
+    ).join(Customer, Stop.customer_id == Customer.id)
+    stmt = stmt.order_by(Plan.plan_date, Route.sequence, Stop.sequence, StopCompletion.id)
+    for row in db.execute(stmt.execution_options(yield_per=YIELD_PER)):
+        yield dict(row._mapping)
+
+
+# --- 거래처별 월 명세 / 품목별 합계 ---
+
+STATEMENT_HEADERS = ["거래처코드", "거래처명", "품목코드", "품목", "단위", "수량", "단가", "공급가액", "세액", "합계", "미수금"]
+ITEM_TOTAL_HEADERS = ["품목코드", "품목", "단위", "수량", "거래처 수", "공급가액", "세액", "합계"]
+
+
+def statement_version(db: Session, start: date, end: date) -> str:
+    """명세 데이터 버전 - 완료 내역 + 주문 품목(수량) + 거래처(미수금)/품목(단가) 변경 반영"""
+    raw = ":".join([
+        completion_version(db, start, end),
+        _period_stops_version(db, start, end),
+        table_version(db, Customer),
+        table_version(db, Item),
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()[:12]
+
+
+def _statement_rows_stmt(start: date, end: date):
+    """
+    배송 완료된 스탑의 주문 라인을 (거래처, 품목, 수량)으로 묶은 집계.
+    같은 수량의 라인은 공급가/세액도 같으므로 calc_receipt_line 결과에 라인 수를 곱하면
+    라인별 반올림 기준(거래명세표)과 동일한 합계가 된다.
+    미수금은 기간 말일 기준 원장 잔액 (원장 도입 전 기간이면 현재 잔액).
+    """
+    delivered = select(StopCompletion.id).where(StopCompletion.stop_id == Stop.id).exists()
+    return (
+        select(
+            Customer.id.label("customer_id"),
+            Customer.code.label("customer_code"),
+            Customer.name.label("customer_name"),
+            func.coalesce(balance_as_of_expr(Customer.id, day_end(end)), Customer.arrears).label("arrears"),
+            Item.id.label("item_id"),
+            Item.code.label("item_code"),
+            Item.product,
+            Item.unit,
+            Item.unit_price,
+            StopOrderItem.quantity,
+            func.count(StopOrderItem.id).label("lines"),
+        )
+        .select_from(StopOrderItem)
+        .join(Stop, StopOrderItem.stop_id == Stop.id)
+        .join(Route, Stop.route_id == Route.id)
+        .join(Plan, Route.plan_id == Plan.id)
+        .join(Customer, Stop.customer_id == Customer.id)
+        .join(Item, StopOrderItem.item_id == Item.id)
+        .where(Plan.plan_date >= start, Plan.plan_date <= end, delivered)
+        .group_by(Customer.id, Item.id, StopOrderItem.quantity)
+        .order_by(Customer.name, Customer.id, Item.code, StopOrderItem.quantity)
+    )
+
+
+def _close_statement(st: dict) -> dict:
+    st["items"] = list(st["items"].values())
+    st["supply_total"] = sum(i["supply_amount"] for i in st["items"])
+    st["tax_total"] = sum(i["tax_amount"] for i in st["items"])
+    st["total"] = st["supply_total"] + st["tax_total"]
+    return st
+
+
+def iter_customer_statements(
+    db: Session, start: date, end: date, item_totals: dict | None = None
+) -> Iterator[dict]:
+    """
+    거래처별 월 명세 (품목별 수량/공급가액/세액, 당월 합계, 현재 미수금). 집계 쿼리 1회.
+    item_totals(dict)를 넘기면 같은 패스에서 품목별 합계를 누적한다.
+    """
+    current: dict | None = None
+    for row in db.execute(_statement_rows_stmt(start, end).execution_options(yield_per=YIELD_PER)):
+        if current is None or current["customer_id"] != row.customer_id:
+            if current is not None:
+                yield _close_statement(current)
+            current = {
+                "customer_id": row.customer_id,
+                "customer_code": row.customer_code,
+                "customer_name": row.customer_name,
+                "arrears": int(row.arrears or 0),
+                "items": {},
+            }
+        quantity = float(row.quantity) * row.lines
+        supply, tax = calc_receipt_line(float(row.quantity), row.unit_price)
+        supply, tax = supply * row.lines, tax * row.lines
+        line = current["items"].setdefault(row.item_id, {
+            "item_code": row.item_code,
+            "product": row.product,
+            "unit": row.unit or "",
+            "unit_price": int(row.unit_price or 0),
+            "quantity": 0.0,
+            "supply_amount": 0,
+            "tax_amount": 0,
+        })
+        line["quantity"] += quantity
+        line["supply_amount"] += supply
+        line["tax_amount"] += tax
+        if item_totals is not None:
+            total = item_totals.setdefault(row.item_id, {
+                "item_code": row.item_code,
+                "product": row.product,
+                "unit": row.unit or "",
+                "quantity": 0.0,
+                "customers": set(),
+                "supply_amount": 0,
+                "tax_amount": 0,
+            })
+            total["quantity"] += quantity
+            total["customers"].add(row.customer_id)
+            total["supply_amount"] += supply
+            total["tax_amount"] += tax
+    if current is not None:
+        yield _close_statement(current)
+
+
+def finish_item_totals(item_totals: dict) -> list[dict]:
+    """iter_customer_statements가 누적한 품목별 합계를 품목코드 순 목록으로"""
+    result = []
+    for t in sorted(item_totals.values(), key=lambda t: t["item_code"] or ""):
+        result.append({
+            **t,
+            "customers": len(t["customers"]),
+            "total": t["supply_amount"] + t["tax_amount"],
+        })
+    return result
+
+
+def item_totals(db: Session, start: date, end: date) -> list[dict]:
+    """품목별 월 합계 (명세와 같은 집계 쿼리 1회)"""
+    acc: dict = {}
+    for _ in iter_customer_statements(db, start, end, acc):
+        pass
+    return finish_item_totals(acc)
+
+
+def statement_export_rows(db: Session, start: date, end: date) -> Iterator[list]:
+    """CSV/Excel용 행: 거래처별 품목 라인 + 소계 행"""
+    for st in iter_customer_statements(db, start, end):
+        code, name = st["customer_code"] or "", st["customer_name"]
+        for i in st["items"]:
+            yield [
+                code, name, i["item_code"], i["product"], i["unit"], i["quantity"], i["unit_price"],
+                i["supply_amount"], i["tax_amount"], i["supply_amount"] + i["tax_amount"], "",
+            ]
+        yield [code, name, "", "소계", "", "", "", st["supply_total"], st["tax_total"], st["total"], st["arrears"]]
+
+
+def item_total_export_rows(db: Session, start: date, end: date) -> Iterator[list]:
+    for t in item_totals(db, start, end):
+        yield [
+            t["item_code"], t["product"], t["unit"], t["quantity"], t["customers"],
+            t["supply_amount"], t["tax_amount"], t["total"],
+        ]
@@ -0,0 +1,235 @@
+"""
+리포트 PDF 백그라운드 생성 - 프로세스 풀에서 렌더링하고 (리포트 종류, 기간, 데이터 버전) 키로 디스크에 캐시.
+같은 키의 요청은 진행 중인 작업 하나를 공유하고, 리포트에 쓰인 데이터가 바뀌면 버전이 달라져 새로 생성한다.
+진행률은 작업 프로세스가 캐시 디렉터리의 .progress 파일에 기록한다.
+"""
+import json
+import multiprocessing
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from io import BytesIO
+from pathlib import Path
+from typing import NamedTuple
+
+import structlog
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.report import generate_monthly_report_pdf, generate_statements_pdf
+from app.services.report_data import (
+    driver_summary,
+    finish_item_totals,
+    iter_completion_rows,
+    iter_customer_statements,
+    month_range,
+    monthly_version,
+    statement_version,
+)
+
+log = structlog.get_logger(__name__)
+
+REPORT_MONTHLY = "monthly"  # 월말 정산 (기사별 요약 + 완료 내역)
+REPORT_STATEMENTS = "statements"  # 거래처별 월 명세 + 품목별 합계
+_VERSIONS = {REPORT_MONTHLY: monthly_version, REPORT_STATEMENTS: statement_version}
+PROGRESS_EVERY = 500  # 진행률 기록 간격 (행)
+
+
+class ReportKey(NamedTuple):
+    report_type: str
+    period: str  # YYYY-MM
+    version: str
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.report_type}-{self.period}-{self.version}"
+
+    @property
+    def path(self) -> Path:
+        return cache_dir() / f"{self.job_id}.pdf"
+
+
+def cache_dir() -> Path:
+    path = Path(get_settings().report_cache_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def parse_job_id(job_id: str) -> ReportKey | None:
+    parts = job_id.split("-")
+    if len(parts) != 4 or parts[0] not in _VERSIONS:
+        return None
+    return ReportKey(parts[0], f"{parts[1]}-{parts[2]}", parts[3])
+
+
+def monthly_key(db: Session, year: int, month: int, report_type: str = REPORT_MONTHLY) -> ReportKey:
+    start, end = month_range(year, month)
+    return ReportKey(report_type, f"{year:04d}-{month:02d}", _VERSIONS[report_type](db, start, end))
+
+
+# --- 작업 프로세스 ---
+
+def _write_progress(path: Path, phase: str, done: int = 0, total: int = 0) -> None:
+    progress = Path(f"{path}.progress")
+    tmp = Path(f"{progress}.tmp")
+    tmp.write_text(json.dumps({"phase": phase, "done": done, "total": total}))
+    os.replace(tmp, progress)
+
+
+def _track(rows: Iterable[dict], path: Path, total: int) -> Iterator[dict]:
+    done = 0
+    for row in rows:
+        yield row
+        done += 1
+        if done % PROGRESS_EVERY == 0:
+            _write_progress(path, "rows", done, total)
+    _write_progress(path, "render", done, total)
+
+
+def _render_monthly(db: Session, path: Path, start: date, end: date) -> BytesIO:
+    summary = driver_summary(db, start, end)
+    total = sum(d["completions"] for d in summary)
+    _write_progress(path, "rows", 0, total)
+    rows = _track(iter_completion_rows(db, start, end), path, total)
+    return generate_monthly_report_pdf(start, end, rows, summary)
+
+
+def _render_statements(db: Session, path: Path, start: date, end: date) -> BytesIO:
+    acc: dict = {}
+    _write_progress(path, "rows")
+    statements = _track(iter_customer_statements(db, start, end, acc), path, 0)
+    return generate_statements_pdf(start, end, statements, lambda: finish_item_totals(acc))
+
+
+_RENDERERS = {REPORT_MONTHLY: _render_monthly, REPORT_STATEMENTS: _render_statements}
+
+
+def _render(key: ReportKey) -> str:
+    """리포트 렌더링 후 캐시 파일 경로 반환. 같은 종류/기간의 이전 버전 파일은 삭제."""
+    path = key.path
+    year, month = (int(v) for v in key.period.split("-"))
+    start, end = month_range(year, month)
+    _write_progress(path, "query")
+    db = SessionLocal()
+    try:
+        buf = _RENDERERS[key.report_type](db, path, start, end)
+    finally:
+        db.close()
+    tmp = Path(f"{path}.tmp")
+    tmp.write_bytes(buf.getbuffer())
+    os.replace(tmp, path)
+    Path(f"{path}.progress").unlink(missing_ok=True)
+    for old in path.parent.glob(f"{key.report_type}-{key.period}-*.pdf"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return str(path)
+
+
+def _init_worker() -> None:
+    # spawn으로 새로 import된 엔진이지만, 혹시 상속된 커넥션이 있으면 부모와 공유하지 않도록 정리
+    from app.database import engine
+
+    engine.dispose(close=False)
+
+
+# --- 요청 프로세스 ---
+
+_lock = threading.Lock()
+_executor: ProcessPoolExecutor | None = None
+_jobs: dict[str, Future] = {}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # 스레드가 있는 서버 프로세스에서 fork하지 않도록 spawn 사용
+        _executor = ProcessPoolExecutor(
+            max_workers=max(1, get_settings().report_workers),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def submit(key: ReportKey) -> Future | None:
+    """캐시에 없으면 렌더링 작업 시작 (같은 키는 진행 중 작업 공유). 캐시 적중 시 None."""
+    if key.path.exists():
+        return None
+    with _lock:
+        future = _jobs.get(key.job_id)
+        if future is None or (future.done() and future.exception() is not None):
+            try:
+                future = _get_executor().submit(_render, key)
+            except BrokenProcessPool:
+                # 작업 프로세스가 비정상 종료되면 풀을 새로 만든다
+                _reset_executor()
+                future = _get_executor().submit(_render, key)
+            _jobs[key.job_id] = future
+            future.add_done_callback(lambda f, job_id=key.job_id: _on_done(job_id, f))
+            log.info("report_job_submitted", job_id=key.job_id)
+        return future
+
+
+def _on_done(job_id: str, future: Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        log.error("report_job_failed", job_id=job_id, error=str(exc))
+        return
+    with _lock:
+        # 성공한 작업은 캐시 파일로 대체 (실패한 작업은 상태 조회용으로 남김)
+        _jobs.pop(job_id, None)
+    log.info("report_job_done", job_id=job_id)
+
+
+def status(key: ReportKey) -> dict | None:
+    """작업 상태: done / running / queued / failed. 알 수 없는 작업이면 None."""
+    result = {"job_id": key.job_id, "status": None, "progress": None, "error": None}
+    if key.path.exists():
+        result["status"] = "done"
+        return result
+    with _lock:
+        future = _jobs.get(key.job_id)
+    if future is None:
+        # 조회 사이에 완료되어 레지스트리에서 빠진 경우
+        if key.path.exists():
+            result["status"] = "done"
+            return result
+        return None
+    if future.done():
+        if future.exception() is not None:
+            result["status"] = "failed"
+            result["error"] = str(future.exception())
+        else:
+            result["status"] = "done"
+        return result
+    progress = Path(f"{key.path}.progress")
+    try:
+        result["progress"] = json.loads(progress.read_text())
+        result["status"] = "running"
+    except (OSError, ValueError):
+        result["status"] = "queued"
+    return result
+
+
+def wait(key: ReportKey) -> Path:
+    """렌더링 완료까지 대기 후 캐시 파일 경로 (이미 있으면 바로 반환)"""
+    future = submit(key)
+    if future is not None:
+        future.result()
+    return key.path
+
+
+def shutdown() -> None:
+    with _lock:
+        _reset_executor()
@@ -0,0 +1,133 @@
+"""
+배송 순서 최적화 (TSP) - 외부 API 없이 좌표만으로 계산.
+하버사인 거리 행렬(NumPy) → 최근접 이웃으로 초기 경로 → 시간 예산 안에서 2-opt / Or-opt 개선.
+경로는 start 노드에서 출발해 end 노드로 끝나며(보통 둘 다 회사), 중간 노드 순서만 바꾼다.
+"""
+import time
+
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_000.0
+OR_OPT_MAX_SEGMENT = 3  # Or-opt로 옮기는 연속 구간 최대 길이
+_EPS = 1e-6
+
+
+def haversine(src_lat, src_lon, dst_lat, dst_lon) -> np.ndarray:
+    """출발 좌표 m개 x 도착 좌표 n개(도) → 대원 거리 (m, m x n)"""
+    lat1 = np.radians(np.asarray(src_lat, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(src_lon, dtype=np.float64))[:, None]
+    lat2 = np.radians(np.asarray(dst_lat, dtype=np.float64))[None, :]
+    lon2 = np.radians(np.asarray(dst_lon, dtype=np.float64))[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """좌표 배열(도) → 노드 간 대원 거리 행렬 (m)"""
+    return haversine(lat, lon, lat, lon)
+
+
+def path_length(dist: np.ndarray, path) -> float:
+    path = np.asarray(path)
+    return float(dist[path[:-1], path[1:]].sum())
+
+
+def nearest_neighbor(dist: np.ndarray, start: int, end: int, nodes) -> list[int]:
+    """start에서 가장 가까운 미방문 노드를 차례로 방문, 마지막에 end"""
+    remaining = np.array(list(nodes), dtype=np.int64)
+    path = [start]
+    current = start
+    while remaining.size:
+        k = int(np.argmin(dist[current, remaining]))
+        current = int(remaining[k])
+        path.append(current)
+        remaining = np.delete(remaining, k)
+    path.append(end)
+    return path
+
+
+def _two_opt_pass(dist: np.ndarray, path: np.ndarray) -> bool:
+    """간선 (a,b),(c,d) → (a,c),(b,d) 교환 중 개선되는 것을 적용. i마다 모든 j를 벡터 연산으로 평가."""
+    improved = False
+    m = len(path) - 1  # 간선 수
+    for i in range(m - 2):
+        a, b = path[i], path[i + 1]
+        cs = path[i + 2:m]
+        ds = path[i + 3:m + 1]
+        delta = dist[a, cs] + dist[b, ds] - dist[a, b] - dist[cs, ds]
+        k = int(np.argmin(delta))
+        if delta[k] < -_EPS:
+            j = i + 2 + k
+            path[i + 1:j + 1] = path[i + 1:j + 1][::-1].copy()
+            improved = True
+    return improved
+
+
+def _or_opt_pass(dist: np.ndarray, path: np.ndarray) -> tuple[np.ndarray, bool]:
+    """연속 구간(1~3개)을 떼어 다른 간선 사이에 (정/역방향으로) 끼워 넣어 개선"""
+    improved = False
+    for seg_len in range(1, OR_OPT_MAX_SEGMENT + 1):
+        i = 1
+        while i + seg_len < len(path):
+            j = i + seg_len - 1  # 구간 path[i..j]
+            prev, first, last, nxt = path[i - 1], path[i], path[j], path[j + 1]
+            gain = dist[prev, first] + dist[last, nxt] - dist[prev, nxt]
+            rest = np.concatenate([path[:i], path[j + 1:]])
+            ps, qs = rest[:-1], rest[1:]
+            base = dist[ps, qs]
+            forward = dist[ps, first] + dist[last, qs] - base
+            backward = dist[ps, last] + dist[first, qs] - base
+            forward[i - 1] = np.inf  # 원래 자리 (prev, nxt)
+            backward[i - 1] = np.inf
+            kf, kb = int(np.argmin(forward)), int(np.argmin(backward))
+            best = min(forward[kf], backward[kb])
+            if best < gain - _EPS:
+                reverse = backward[kb] < forward[kf]
+                k = kb if reverse else kf
+                segment = path[i:j + 1][::-1] if reverse else path[i:j + 1]
+                path = np.concatenate([rest[:k + 1], segment, rest[k + 1:]])
+                improved = True
+            else:
+                i += 1
+    return path, improved
+
+
+def improve(dist: np.ndarray, path, deadline: float) -> list[int]:
+    """기존 경로(양 끝 고정)를 개선이 없거나 deadline(perf_counter)이 될 때까지 2-opt/Or-opt로 개선"""
+    path = np.array(path, dtype=np.int64)
+    if len(path) <= 3:
+        return path.tolist()
+    while time.perf_counter() < deadline:
+        improved = _two_opt_pass(dist, path)
+        if time.perf_counter() >= deadline:
+            break
+        path, moved = _or_opt_pass(dist, path)
+        if not (improved or moved):
+            break
+    return path.tolist()
+
+
+def solve(dist: np.ndarray, start: int, end: int, nodes, time_budget: float = 0.5) -> list[int]:
+    """
+    start → nodes 전체 → end 경로. 최근접 이웃 후 개선이 없거나 time_budget(초)을 넘을 때까지 2-opt/Or-opt 반복.
+    반환값은 start/end를 포함한 노드 순서.
+    """
+    deadline = time.perf_counter() + time_budget
+    return improve(dist, nearest_neighbor(dist, start, end, nodes), deadline)
+
+
+def coordinate_distances(depot: tuple[float, float], points: list[tuple[int, float, float]]) -> np.ndarray:
+    """노드 0 = depot, 1..k = points(키, 위도, 경도)의 하버사인 거리 행렬 (캐시 없이 바로 계산)"""
+    arr = np.array([depot] + [(lat, lon) for _, lat, lon in points], dtype=np.float64)
+    return haversine_matrix(arr[:, 0], arr[:, 1])
+
+
+def optimize_order(dist: np.ndarray, start: int = 0, time_budget: float = 0.5) -> tuple[list[int], float, float]:
+    """
+    dist: 노드 0 = 회사, 나머지 = 현재 순서의 스탑 (start가 0이 아니면 그 노드에서 출발, 예: 마지막 완료 지점).
+    회사로 돌아오는 경로 기준. 반환: (최적 순서의 노드 번호, 현재 순서 거리 m, 최적 순서 거리 m)
+    """
+    nodes = [i for i in range(1, len(dist)) if i != start]
+    before = path_length(dist, [start, *nodes, 0])
+    path = solve(dist, start, 0, nodes, time_budget)
+    return path[1:-1], before, path_length(dist, path)
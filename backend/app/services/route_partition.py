@@ -0,0 +1,263 @@
+"""
+플랜 배송 분배 (용량 제약 VRP) - 하루치 스탑을 여러 호차에 나누고 호차별 배송 순서까지 제안.
+회사 기준 방위각 스윕으로 초기 분할 → 호차 간 스탑 이동(relocate) 지역 탐색 → 호차별 순서 개선(route_optimizer).
+목적함수 = 총 이동거리 + (적재량 편차 x balance + 용량 초과 x OVERLOAD_PENALTY)를 거리 단위로 환산한 벌점.
+배송완료 스탑과 좌표 없는 스탑은 현재 호차에 그대로 두고, 이미 출발한 호차는 분배 대상에서 제외한다.
+"""
+import math
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import Customer, Item, Route, Stop, StopCompletion, StopOrderItem
+from app.services.route_optimizer import coordinate_distances, improve, nearest_neighbor, path_length
+
+DEFAULT_ITEM_WEIGHT = 1  # 무게 미입력 품목의 단위당 무게
+OVERLOAD_PENALTY = 100.0  # 용량 초과량 1단위의 벌점 (편차 1단위 대비 배수)
+_EPS = 1e-6
+
+
+class PlanStop(NamedTuple):
+    id: int
+    route_id: int
+    customer_id: int
+    latitude: float | None
+    longitude: float | None
+    load: float  # 주문 수량 x 품목 무게 합
+    completed: bool
+
+    @property
+    def located(self) -> bool:
+        return self.latitude is not None and self.longitude is not None
+
+
+def load_plan_stops(db: Session, plan_id: int) -> tuple[list[Route], list[PlanStop]]:
+    """플랜의 루트 목록과 스탑(좌표/적재량/완료 여부) - 쿼리 2회"""
+    routes = list(db.execute(
+        select(Route).where(Route.plan_id == plan_id).order_by(Route.sequence, Route.id)
+    ).scalars())
+    loads = (
+        select(
+            StopOrderItem.stop_id,
+            func.sum(StopOrderItem.quantity * func.coalesce(Item.weight, DEFAULT_ITEM_WEIGHT)).label("load"),
+        )
+        .join(Item, StopOrderItem.item_id == Item.id)
+        .group_by(StopOrderItem.stop_id)
+        .subquery("stop_loads")
+    )
+    completed = select(StopCompletion.id).where(StopCompletion.stop_id == Stop.id).exists()
+    rows = db.execute(
+        select(
+            Stop.id, Stop.route_id, Stop.customer_id, Customer.latitude, Customer.longitude,
+            func.coalesce(loads.c.load, 0).label("load"), completed.label("completed"),
+        )
+        .join(Route, Stop.route_id == Route.id)
+        .join(Customer, Stop.customer_id == Customer.id)
+        .outerjoin(loads, loads.c.stop_id == Stop.id)
+        .where(Route.plan_id == plan_id)
+        .order_by(Route.sequence, Route.id, Stop.sequence, Stop.id)
+    ).all()
+    stops = [
+        PlanStop(
+            r.id, r.route_id, r.customer_id,
+            float(r.latitude) if r.latitude is not None else None,
+            float(r.longitude) if r.longitude is not None else None,
+            float(r.load), bool(r.completed),
+        )
+        for r in rows
+    ]
+    return routes, stops
+
+
+class _Partition:
+    """노드 0 = 회사, 1..n = 이동 가능한 스탑, 그 뒤 = 호차별 출발점(마지막 완료 지점)"""
+
+    def __init__(self, dist, weights, fixed_loads, starts, capacity, balance):
+        self.dist = dist
+        self.weights = weights
+        self.fixed_loads = np.asarray(fixed_loads, dtype=np.float64)
+        self.starts = starts
+        self.capacity = capacity
+        self.balance = balance
+        self.scale = 0.0  # 적재량 1단위 → 거리(m) 환산 계수, 초기 분할 후 결정
+
+    def loads(self, members: list[list[int]]) -> np.ndarray:
+        return self.fixed_loads + np.array([self.weights[m].sum() if m else 0.0 for m in members])
+
+    def penalty(self, loads: np.ndarray) -> float:
+        if not self.scale:
+            return 0.0
+        cost = self.balance * float(np.abs(loads - loads.mean()).sum())
+        if self.capacity:
+            cost += OVERLOAD_PENALTY * float(np.clip(loads - self.capacity, 0, None).sum())
+        return self.scale * cost
+
+    def sweep(self, nodes: list[int], angles: np.ndarray) -> list[list[int]]:
+        """회사 기준 방위각 순으로 정렬해 (가장 큰 각 간격에서 시작) 적재량이 고르도록 연속 구간 분할"""
+        k = len(self.starts)
+        members: list[list[int]] = [[] for _ in range(k)]
+        if not nodes:
+            return members
+        order = np.argsort(angles)
+        sorted_angles = angles[order]
+        gaps = np.diff(np.append(sorted_angles, sorted_angles[0] + 2 * math.pi))
+        order = np.roll(order, -(int(np.argmax(gaps)) + 1))
+        total = self.fixed_loads.sum() + self.weights[nodes].sum()
+        target = total / k
+        if self.capacity:
+            target = min(target, self.capacity)
+        route = 0
+        load = self.fixed_loads[0]
+        for idx in order:
+            node = nodes[idx]
+            w = self.weights[node]
+            # 목표 적재량을 절반 이상 넘기게 되면 다음 호차로 (마지막 호차는 나머지 전부)
+            if members[route] and load + w / 2 > target and route < k - 1:
+                route += 1
+                load = self.fixed_loads[route]
+            members[route].append(node)
+            load += w
+        return members
+
+    def relocate_pass(self, paths: list[list[int]], deadline: float) -> bool:
+        """스탑 하나를 다른 호차의 가장 싼 위치로 옮겨 목적함수가 줄면 적용"""
+        dist, w = self.dist, self.weights
+        improved = False
+        loads = self.loads([p[1:-1] for p in paths])
+        for a in range(len(paths)):
+            i = 1
+            while i < len(paths[a]) - 1:
+                if time.perf_counter() >= deadline:
+                    return improved
+                path_a = paths[a]
+                prev, v, nxt = path_a[i - 1], path_a[i], path_a[i + 1]
+                gain = dist[prev, v] + dist[v, nxt] - dist[prev, nxt]
+                base_penalty = self.penalty(loads)
+                best = (-_EPS, None, None)
+                for b in range(len(paths)):
+                    if b == a:
+                        continue
+                    pb = np.asarray(paths[b])
+                    ps, qs = pb[:-1], pb[1:]
+                    ins = dist[ps, v] + dist[v, qs] - dist[ps, qs]
+                    pos = int(np.argmin(ins))
+                    moved = loads.copy()
+                    moved[a] -= w[v]
+                    moved[b] += w[v]
+                    delta = ins[pos] - gain + self.penalty(moved) - base_penalty
+                    if delta < best[0]:
+                        best = (delta, b, pos)
+                _, b, pos = best
+                if b is None:
+                    i += 1
+                    continue
+                del path_a[i]
+                paths[b].insert(pos + 1, v)
+                loads[a] -= w[v]
+                loads[b] += w[v]
+                improved = True
+        return improved
+
+
+def propose_partition(
+    depot: tuple[float, float],
+    routes: list[Route],
+    stops: list[PlanStop],
+    capacity: float | None = None,
+    balance: float = 1.0,
+    time_budget: float = 2.0,
+    distances: Callable[[tuple[float, float], list[tuple[int, float, float]]], np.ndarray] = coordinate_distances,
+) -> dict:
+    """
+    분배 제안. 출발한(started_at) 루트는 제외, 배송완료/좌표 없는 스탑은 현재 루트에 고정.
+    적재량이 모두 0(주문 품목 없음)이면 스탑 수를 적재량으로 본다.
+    distances(회사, [(거래처 id, 위도, 경도)]) → 노드 0 = 회사인 거리 행렬 (거리 행렬 캐시의 submatrix 등).
+    반환: routes(호차별 stop_ids/적재량/거리, 변경 전 값 포함), 총 거리 전/후, 제외된 루트.
+    """
+    deadline = time.perf_counter() + time_budget
+    active = [r for r in routes if r.started_at is None]
+    if not active:
+        return {"routes": [], "excluded_route_ids": [r.id for r in routes],
+                "distance_before_m": 0, "distance_after_m": 0}
+    index = {r.id: k for k, r in enumerate(active)}
+    movable = [s for s in stops if s.route_id in index and s.located and not s.completed]
+    fixed: list[list[PlanStop]] = [[] for _ in active]
+    for s in stops:
+        if s.route_id in index and (s.completed or not s.located):
+            fixed[index[s.route_id]].append(s)
+
+    # 노드 배치: 회사, 이동 가능 스탑, 호차별 출발점
+    points = [(s.customer_id, s.latitude, s.longitude) for s in movable]
+    starts = []
+    for k in range(len(active)):
+        last = next((s for s in reversed(fixed[k]) if s.completed and s.located), None)
+        if last is None:
+            starts.append(0)
+        else:
+            points.append((last.customer_id, last.latitude, last.longitude))
+            starts.append(len(points))
+    dist = distances(depot, points)
+    weights = np.zeros(len(points) + 1)
+    weights[1:len(movable) + 1] = [s.load for s in movable]
+    fixed_loads = [sum(s.load for s in f) for f in fixed]
+    if not weights.any() and not any(fixed_loads):
+        # 주문 품목이 없으면 스탑 수로 균형
+        weights[1:len(movable) + 1] = 1.0
+        fixed_loads = [float(len(f)) for f in fixed]
+    problem = _Partition(dist, weights, fixed_loads, starts, capacity, balance)
+
+    # 변경 전 (현재 배정/순서)
+    current: list[list[int]] = [[] for _ in active]
+    for node, s in enumerate(movable, start=1):
+        current[index[s.route_id]].append(node)
+    before_paths = [[starts[k], *current[k], 0] for k in range(len(active))]
+    loads_before = problem.loads(current)
+
+    # 초기 분할 + 호차별 순서
+    xy = np.array([(s.latitude, s.longitude) for s in movable], dtype=np.float64).reshape(-1, 2)
+    d_lat = xy[:, 0] - depot[0]
+    d_lon = (xy[:, 1] - depot[1]) * math.cos(math.radians(depot[0]))
+    members = problem.sweep(list(range(1, len(movable) + 1)), np.arctan2(d_lon, d_lat))
+    step = time_budget / 10 / len(active)
+    paths = [
+        improve(dist, nearest_neighbor(dist, starts[k], 0, members[k]), time.perf_counter() + step)
+        for k in range(len(active))
+    ]
+    mean_load = float(problem.loads(members).mean())
+    if mean_load > 0:
+        problem.scale = sum(path_length(dist, p) for p in paths) / len(paths) / mean_load
+
+    # 호차 간 이동 + 호차별 순서 개선 반복
+    final_deadline = deadline - time_budget / 10
+    while time.perf_counter() < final_deadline:
+        moved = problem.relocate_pass(paths, final_deadline)
+        paths = [improve(dist, p, final_deadline) for p in paths]
+        if not moved:
+            break
+    paths = [improve(dist, p, deadline) for p in paths]
+
+    result = []
+    loads_after = problem.loads([p[1:-1] for p in paths])
+    for k, route in enumerate(active):
+        done = [s.id for s in fixed[k] if s.completed]
+        unlocated = [s.id for s in fixed[k] if not s.completed]
+        result.append({
+            "route_id": route.id,
+            "route_name": route.name,
+            "stop_ids": done + [movable[n - 1].id for n in paths[k][1:-1]] + unlocated,
+            "load_before": round(float(loads_before[k]), 2),
+            "load": round(float(loads_after[k]), 2),
+            "distance_before_m": round(path_length(dist, before_paths[k])),
+            "distance_m": round(path_length(dist, paths[k])),
+            "over_capacity": bool(capacity and loads_after[k] > capacity + _EPS),
+        })
+    return {
+        "routes": result,
+        "excluded_route_ids": [r.id for r in routes if r.started_at is not None],
+        "distance_before_m": sum(r["distance_before_m"] for r in result),
+        "distance_after_m": sum(r["distance_m"] for r in result),
+    }
@@ -0,0 +1,105 @@
+"""
+루트 스탑 목록의 열(column) 형식 - 기사 앱 전체 로드용.
+스탑/주문 품목/완료는 열별 배열, 거래처와 품목은 한 번씩만 담은 조회표로 두고 id로 참조한다.
+ORM 객체 없이 필요한 열만 select (거래처/품목 전체 행과 사진 행을 읽지 않음).
+"""
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+
+from app.models import Customer, Item, Photo, Stop, StopCompletion, StopOrderItem
+from app.services.route_sync import snapshot_token
+
+STOP_FIELDS = ("sequence", "memo", "customer_id", "is_completed", "eta", "order_items", "completions")
+CUSTOMER_FIELDS = ("name", "address", "phone", "latitude", "longitude")
+ITEM_FIELDS = ("code", "product", "unit")
+FIELDS = frozenset(STOP_FIELDS) | {f"customer.{f}" for f in CUSTOMER_FIELDS}
+
+
+def parse_fields(value: str | None) -> set[str] | None:
+    """쉼표 구분 필드 → 집합 (비우면 전체). 모르는 필드가 있으면 None."""
+    if not value:
+        return set(FIELDS)
+    fields = {f.strip() for f in value.split(",") if f.strip()}
+    if not fields <= FIELDS:
+        return None
+    if any(f.startswith("customer.") for f in fields):
+        fields.add("customer_id")
+    return fields
+
+
+def _columns(rows, names: tuple[str, ...]) -> dict[str, list]:
+    cols = list(zip(*rows)) if rows else [()] * len(names)
+    return {name: list(col) for name, col in zip(names, cols)}
+
+
+def _number(value):
+    return float(value) if value is not None else None
+
+
+def compact_route(db: Session, route_id: int, fields: set[str], etas: dict[int, datetime]) -> dict:
+    """
+    반환: token(증분 동기화 시작점), stops, 선택 시 customers / order_items + items / completions (모두 열별 배열).
+    token을 먼저 잡으므로 이후 변경은 다음 동기화에 포함된다.
+    """
+    token = snapshot_token(db)
+    stop_cols = [c for c in ("sequence", "memo", "customer_id") if c in fields]
+    stmt = select(Stop.id, *(getattr(Stop, c) for c in stop_cols))
+    if "is_completed" in fields:
+        stop_cols.append("is_completed")
+        stmt = stmt.add_columns(select(StopCompletion.id).where(StopCompletion.stop_id == Stop.id).exists())
+    rows = db.execute(stmt.where(Stop.route_id == route_id).order_by(Stop.sequence, Stop.id)).all()
+    stops = _columns(rows, ("id", *stop_cols))
+    if "eta" in fields:
+        stops["eta"] = [etas.get(sid) for sid in stops["id"]]
+    payload = {"route_id": route_id, "token": str(token), "stops": stops}
+
+    customer_cols = tuple(f for f in CUSTOMER_FIELDS if f"customer.{f}" in fields)
+    if customer_cols:
+        customer_ids = sorted(set(stops["customer_id"]))
+        rows = db.execute(
+            select(Customer.id, *(getattr(Customer, c) for c in customer_cols))
+            .where(Customer.id.in_(customer_ids))
+            .order_by(Customer.id)
+        ).all()
+        customers = _columns(rows, ("id", *customer_cols))
+        for c in ("latitude", "longitude"):
+            if c in customers:
+                customers[c] = [_number(v) for v in customers[c]]
+        payload["customers"] = customers
+
+    if "order_items" in fields:
+        rows = db.execute(
+            select(StopOrderItem.id, StopOrderItem.stop_id, StopOrderItem.item_id, StopOrderItem.quantity, StopOrderItem.memo)
+            .join(Stop, StopOrderItem.stop_id == Stop.id)
+            .where(Stop.route_id == route_id)
+            .order_by(StopOrderItem.id)
+        ).all()
+        order_items = _columns(rows, ("id", "stop_id", "item_id", "quantity", "memo"))
+        order_items["quantity"] = [_number(q) for q in order_items["quantity"]]
+        payload["order_items"] = order_items
+        rows = db.execute(
+            select(Item.id, *(getattr(Item, c) for c in ITEM_FIELDS))
+            .where(Item.id.in_(sorted(set(order_items["item_id"]))))
+            .order_by(Item.id)
+        ).all()
+        payload["items"] = _columns(rows, ("id", *ITEM_FIELDS))
+
+    if "completions" in fields:
+        photo_ids = (
+            select(func.array_agg(aggregate_order_by(Photo.id, Photo.id)))
+            .where(Photo.completion_id == StopCompletion.id)
+            .scalar_subquery()
+        )
+        rows = db.execute(
+            select(StopCompletion.id, StopCompletion.stop_id, photo_ids)
+            .join(Stop, StopCompletion.stop_id == Stop.id)
+            .where(Stop.route_id == route_id)
+            .order_by(StopCompletion.id)
+        ).all()
+        completions = _columns(rows, ("id", "stop_id", "photo_ids"))
+        completions["photo_ids"] = [p or [] for p in completions["photo_ids"]]
+        payload["completions"] = completions
+    return payload
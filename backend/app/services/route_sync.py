@@ -0,0 +1,128 @@
+"""
+기사 앱 증분 동기화 - route_changes(트리거 기록)에서 토큰 이후 바뀐 스탑/주문 품목/완료만 골라 보낸다.
+토큰 = 조회 시점 스냅샷의 xmin. 그때 끝나지 않은 트랜잭션은 모두 txid >= xmin이라 늦게 커밋된 변경도 다음 동기화에 포함.
+같은 변경이 두 번 올 수는 있어도(덮어쓰기라 무해) 빠지지는 않는다. 보존 기간이 지난 기록은 정리하고, 그보다 오래된 토큰은 전체 전송.
+"""
+import threading
+import time
+
+from sqlalchemy import BigInteger, String, cast, delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.config import get_settings
+from app.models import AppSetting, RouteChange, Stop, StopCompletion, StopOrderItem
+
+PRUNED_KEY = "route_changes_pruned_txid"  # 정리된 기록의 최대 txid
+PRUNE_INTERVAL = 3600.0  # 워커별 정리 주기 (초)
+
+_prune_lock = threading.Lock()
+_pruned_at = 0.0
+
+
+def snapshot_token(db: Session) -> int:
+    """현재 스냅샷의 xmin - 동기화 토큰"""
+    return db.execute(text("SELECT (pg_snapshot_xmin(pg_current_snapshot())::text)::bigint")).scalar()
+
+
+def _pruned_txid(db: Session) -> int:
+    value = db.execute(select(AppSetting.value).where(AppSetting.key == PRUNED_KEY)).scalar()
+    return int(value) if value else 0
+
+
+def prune_route_changes(db: Session) -> int:
+    """보존 기간(route_change_retention_days)이 지난 기록 삭제 + 정리 지점 기록. 삭제 건수 반환 (커밋은 호출자가)."""
+    days = get_settings().route_change_retention_days
+    horizon = db.execute(
+        delete(RouteChange)
+        .where(RouteChange.created_at < func.now() - func.make_interval(0, 0, 0, days))
+        .returning(RouteChange.txid)
+    ).scalars().all()
+    if not horizon:
+        return 0
+    db.execute(
+        pg_insert(AppSetting)
+        .values(key=PRUNED_KEY, value=str(max(horizon)))
+        .on_conflict_do_update(
+            index_elements=["key"],
+            set_={"value": cast(func.greatest(cast(AppSetting.value, BigInteger), max(horizon)), String)},
+        )
+    )
+    return len(horizon)
+
+
+def _maybe_prune(db: Session) -> None:
+    global _pruned_at
+    if time.monotonic() - _pruned_at < PRUNE_INTERVAL or not _prune_lock.acquire(blocking=False):
+        return
+    try:
+        _pruned_at = time.monotonic()
+        prune_route_changes(db)
+        db.commit()
+    finally:
+        _prune_lock.release()
+
+
+def _stops(db: Session, route_id: int, ids: set[int] | None) -> list[Stop]:
+    stmt = select(Stop).where(Stop.route_id == route_id).options(joinedload(Stop.customer))
+    if ids is not None:
+        stmt = stmt.where(Stop.id.in_(ids))
+    return list(db.execute(stmt.order_by(Stop.sequence, Stop.id)).scalars())
+
+
+def _order_items(db: Session, route_id: int, ids: set[int] | None) -> list[StopOrderItem]:
+    stmt = (
+        select(StopOrderItem)
+        .join(Stop, StopOrderItem.stop_id == Stop.id)
+        .where(Stop.route_id == route_id)
+        .options(joinedload(StopOrderItem.item))
+    )
+    if ids is not None:
+        stmt = stmt.where(StopOrderItem.id.in_(ids))
+    return list(db.execute(stmt.order_by(StopOrderItem.id)).scalars())
+
+
+def _completions(db: Session, route_id: int, ids: set[int] | None) -> list[StopCompletion]:
+    stmt = (
+        select(StopCompletion)
+        .join(Stop, StopCompletion.stop_id == Stop.id)
+        .where(Stop.route_id == route_id)
+        .options(selectinload(StopCompletion.photos))
+    )
+    if ids is not None:
+        stmt = stmt.where(StopCompletion.id.in_(ids))
+    return list(db.execute(stmt.order_by(StopCompletion.id)).scalars())
+
+
+def route_changes_since(db: Session, route_id: int, since: int | None) -> dict:
+    """
+    since(이전 토큰) 이후 루트의 변경. 토큰이 없거나 정리된 기록보다 오래되었으면 전체(full=True).
+    반환: token, full, stops / order_items / completions(현재 값), deleted(엔터티별 id).
+    """
+    _maybe_prune(db)
+    token = snapshot_token(db)
+    loaders = {"stop": _stops, "order_item": _order_items, "completion": _completions}
+    full = since is None or since <= _pruned_txid(db) or since > token
+    if full:
+        rows = {entity: load(db, route_id, None) for entity, load in loaders.items()}
+        return {"token": token, "full": True, **_plural(rows), "deleted": _plural({e: [] for e in loaders})}
+
+    # 엔터티별 마지막 기록만 (삭제 여부 판단), 값은 현재 행에서 읽는다
+    latest = db.execute(
+        select(RouteChange.entity, RouteChange.entity_id, RouteChange.deleted)
+        .where(RouteChange.route_id == route_id, RouteChange.txid >= since)
+        .order_by(RouteChange.entity, RouteChange.entity_id, RouteChange.id.desc())
+        .distinct(RouteChange.entity, RouteChange.entity_id)
+    ).all()
+    changed = {entity: {r.entity_id for r in latest if r.entity == entity and not r.deleted} for entity in loaders}
+    deleted = {entity: {r.entity_id for r in latest if r.entity == entity and r.deleted} for entity in loaders}
+    rows = {}
+    for entity, load in loaders.items():
+        rows[entity] = load(db, route_id, changed[entity]) if changed[entity] else []
+        # 기록 후 다른 루트로 옮겨졌거나 삭제된 행 (그 변경은 아직 보이지 않는 트랜잭션일 수 있음)
+        deleted[entity] |= changed[entity] - {row.id for row in rows[entity]}
+    return {"token": token, "full": False, **_plural(rows), "deleted": _plural({e: sorted(v) for e, v in deleted.items()})}
+
+
+def _plural(by_entity: dict) -> dict:
+    return {f"{entity}s": value for entity, value in by_entity.items()}
@@ -0,0 +1,161 @@
+"""거래처/품목 검색 - pg_trgm 인덱스 우선, 확장이 없으면 rapidfuzz 인메모리 인덱스로 폴백"""
+import threading
+from typing import Any, NamedTuple
+
+import structlog
+from rapidfuzz import fuzz, process, utils
+from sqlalchemy import case, func, literal, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.models import Customer, Item
+
+log = structlog.get_logger(__name__)
+
+
+class SearchTarget(NamedTuple):
+    """검색 대상 모델과 컬럼 (label은 목록 표시/접두 일치 우선순위용)"""
+    model: type
+    fields: tuple[str, ...]
+    label: str
+
+
+CUSTOMER_TARGET = SearchTarget(Customer, ("name", "code", "representative_name", "address"), "name")
+ITEM_TARGET = SearchTarget(Item, ("product", "code"), "product")
+
+_trgm_available: bool | None = None
+
+
+def has_pg_trgm(db: Session) -> bool:
+    """pg_trgm 확장 설치 여부 (프로세스당 1회 확인)"""
+    global _trgm_available
+    if _trgm_available is None:
+        try:
+            row = db.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+            _trgm_available = row is not None
+        except Exception:
+            db.rollback()
+            _trgm_available = False
+        log.info("search_engine", engine="pg_trgm" if _trgm_available else "rapidfuzz")
+    return _trgm_available
+
+
+def table_version(db: Session, model: type) -> str:
+    """테이블 버전 (행 수 + 최종 수정시각) - 캐시 무효화/ETag용"""
+    count, last = db.execute(select(func.count(model.id), func.max(model.updated_at))).one()
+    return f"{count}:{last.isoformat() if last else ''}"
+
+
+def highlight_spans(value: str | None, q: str) -> list[list[int]]:
+    """값에서 검색어 일치 구간 [start, end) 목록. 정확히 포함되지 않으면 fuzzy 정렬 구간 1개 (3자 이상)."""
+    if not value:
+        return []
+    low, ql = value.lower(), q.lower()
+    spans = []
+    start = low.find(ql)
+    while start != -1:
+        spans.append([start, start + len(ql)])
+        start = low.find(ql, start + len(ql))
+    if spans or len(ql) < 3:
+        return spans
+    al = fuzz.partial_ratio_alignment(ql, low, score_cutoff=60)
+    if al and al.dest_end > al.dest_start:
+        return [[al.dest_start, al.dest_end]]
+    return []
+
+
+def _to_hit(target: SearchTarget, row: Any, score: float, q: str) -> dict:
+    hit = {"id": row.id}
+    highlights = {}
+    for f in target.fields:
+        value = getattr(row, f)
+        hit[f] = value
+        spans = highlight_spans(value, q)
+        if spans:
+            highlights[f] = spans
+    hit["score"] = round(float(score), 1)
+    hit["highlights"] = highlights
+    return hit
+
+
+def like_escape(q: str) -> str:
+    """ILIKE 패턴에서 검색어의 \\, %, _ 를 문자 그대로 일치하도록 이스케이프"""
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_trgm(db: Session, target: SearchTarget, q: str, limit: int) -> list[dict]:
+    """ILIKE / word_similarity(<%) 조건은 gin_trgm_ops 인덱스를 사용"""
+    cols = [getattr(target.model, f) for f in target.fields]
+    label = getattr(target.model, target.label)
+    escaped = like_escape(q)
+    pattern = f"%{escaped}%"
+    sim = func.greatest(*[func.coalesce(func.word_similarity(q, c), 0) for c in cols])
+    rank = case(
+        (label.ilike(f"{escaped}%", escape="\\"), 2),
+        (or_(*[c.ilike(pattern, escape="\\") for c in cols]), 1),
+        else_=0,
+    )
+    stmt = (
+        select(target.model.id, *cols, (sim * 100).label("score"))
+        .where(or_(*[c.ilike(pattern, escape="\\") for c in cols], *[literal(q).op("<%")(c) for c in cols]))
+        .order_by(rank.desc(), sim.desc(), label)
+        .limit(limit)
+    )
+    return [_to_hit(target, r, r.score, q) for r in db.execute(stmt).all()]
+
+
+class _FuzzyIndex:
+    """pg_trgm이 없을 때 쓰는 rapidfuzz 인메모리 인덱스. 테이블 버전이 바뀌면 다시 적재."""
+
+    def __init__(self, target: SearchTarget):
+        self.target = target
+        self._lock = threading.Lock()
+        self._data: tuple[str | None, list, list[str]] = (None, [], [])
+
+    def _ensure(self, db: Session) -> tuple[list, list[str]]:
+        version = table_version(db, self.target.model)
+        current, rows, choices = self._data
+        if current == version:
+            return rows, choices
+        with self._lock:
+            current, rows, choices = self._data
+            if current != version:
+                cols = [getattr(self.target.model, f) for f in self.target.fields]
+                rows = db.execute(select(self.target.model.id, *cols)).all()
+                choices = [
+                    " ".join(str(getattr(r, f)) for f in self.target.fields if getattr(r, f)) for r in rows
+                ]
+                self._data = (version, rows, choices)
+        return rows, choices
+
+    def search(self, db: Session, q: str, limit: int) -> list[dict]:
+        rows, choices = self._ensure(db)
+        # 짧은 입력(1~2자)은 partial_ratio로 부분 일치, 그 외 WRatio (contract_match와 동일 기준)
+        scorer = fuzz.partial_ratio if len(q) <= 2 else fuzz.WRatio
+        found = process.extract(
+            q, choices, scorer=scorer, processor=utils.default_process, limit=limit * 3, score_cutoff=50
+        )
+        ql = q.lower()
+        ranked = sorted(
+            found,
+            key=lambda m: (
+                not str(getattr(rows[m[2]], self.target.label) or "").lower().startswith(ql),
+                -m[1],
+            ),
+        )
+        return [_to_hit(self.target, rows[idx], score, q) for _, score, idx in ranked[:limit]]
+
+
+_fuzzy_indexes = {
+    CUSTOMER_TARGET.model: _FuzzyIndex(CUSTOMER_TARGET),
+    ITEM_TARGET.model: _FuzzyIndex(ITEM_TARGET),
+}
+
+
+def search(db: Session, target: SearchTarget, q: str, limit: int = 10) -> tuple[list[dict], str]:
+    """상위 limit건 검색 결과와 사용한 엔진 이름 반환"""
+    q = (q or "").strip()
+    if not q:
+        return [], "none"
+    if has_pg_trgm(db):
+        return _search_trgm(db, target, q, limit), "pg_trgm"
+    return _fuzzy_indexes[target.model].search(db, q, limit), "rapidfuzz"
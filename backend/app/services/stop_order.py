@@ -0,0 +1,57 @@
+"""스탑 순서 변경 - 검증 조회 1회 + UPDATE 1회 (전체는 UPDATE ... FROM (VALUES ...), 이동은 영향 구간만)"""
+from sqlalchemy import Integer, case, column, select, update, values
+from sqlalchemy.orm import Session
+
+from app.models import Stop
+
+
+def route_stop_ids(db: Session, route_id: int, lock: bool = False) -> list[tuple[int, int]]:
+    """루트의 (스탑 id, sequence) 현재 순서. lock이면 행 잠금 (동시 순서 변경 직렬화)."""
+    stmt = select(Stop.id, Stop.sequence).where(Stop.route_id == route_id).order_by(Stop.sequence, Stop.id)
+    if lock:
+        stmt = stmt.with_for_update()
+    return [(r.id, r.sequence) for r in db.execute(stmt)]
+
+
+def set_stop_order(db: Session, assignments: list[tuple[int, int, int]]) -> None:
+    """(스탑 id, 루트 id, sequence) 목록을 UPDATE 1회로 반영 (세션의 Stop 객체는 갱신하지 않음)"""
+    if not assignments:
+        return
+    new_order = values(
+        column("id", Integer), column("route_id", Integer), column("sequence", Integer), name="new_order"
+    ).data(assignments)
+    db.execute(
+        update(Stop)
+        .where(Stop.id == new_order.c.id)
+        .values(route_id=new_order.c.route_id, sequence=new_order.c.sequence)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def move_stop(db: Session, route_id: int, stop_id: int, position: int) -> int | None:
+    """
+    스탑을 position(0부터)으로 이동 - 사이 구간의 sequence만 한 칸씩 밀거나 당김. 실제 위치 반환.
+    sequence가 0..n-1로 정리되어 있지 않으면(중복/빈 번호) 이번에 전체를 정리한다.
+    잠금 시점에 스탑이 이 루트에 없으면(그 사이 다른 루트로 이동/삭제) 아무것도 바꾸지 않고 None.
+    """
+    current = route_stop_ids(db, route_id, lock=True)
+    ids = [sid for sid, _ in current]
+    if stop_id not in ids:
+        return None
+    src = ids.index(stop_id)
+    dst = min(max(position, 0), len(ids) - 1)
+    if [seq for _, seq in current] != list(range(len(current))):
+        ids.insert(dst, ids.pop(src))
+        set_stop_order(db, [(sid, route_id, seq) for seq, sid in enumerate(ids)])
+        return dst
+    if src == dst:
+        return dst
+    lo, hi = min(src, dst), max(src, dst)
+    shift = -1 if src < dst else 1
+    db.execute(
+        update(Stop)
+        .where(Stop.route_id == route_id, Stop.sequence.between(lo, hi))
+        .values(sequence=case((Stop.id == stop_id, dst), else_=Stop.sequence + shift))
+        .execution_options(synchronize_session=False)
+    )
+    return dst
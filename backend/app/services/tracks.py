@@ -0,0 +1,239 @@
+"""
+기사 GPS 이동 경로 - 기사 앱이 모아 보낸 위치 묶음을 Douglas-Peucker로 단순화하고 델타 인코딩(+zlib)해 묶음당 1행으로 저장.
+루트별 최신 위치는 워커 메모리에 두고, 이벤트(live_events)로 다른 워커의 메모리와 관리자 화면도 갱신한다.
+보존 기간(track_retention_days)이 지난 경로는 수신 처리 중 주기적으로 삭제.
+"""
+import math
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import Route, RouteTrack
+from app.services.live_events import publish
+
+SIMPLIFY_TOLERANCE_M = 5.0  # 직선에서 이만큼 벗어나지 않는 점은 버림
+KEEP_EVERY_SECONDS = 120  # 정차 중에도 이 간격으로는 점을 남김 (정차 시간 보존)
+MAX_ACCURACY_M = 100.0  # 이보다 부정확한 위치는 버림
+COORD_SCALE = 1_000_000  # 마이크로도 정수 (약 0.1m)
+M_PER_DEG = 111_320.0
+PRUNE_INTERVAL = 3600.0
+_HEADER = struct.Struct("<Bqiii")  # 형식 버전, 첫 점(시각 초, 위도, 경도, 정확도)
+_FORMAT = 1
+
+
+class TrackPoint(NamedTuple):
+    recorded_at: datetime
+    latitude: float
+    longitude: float
+    accuracy: float | None = None
+
+
+def simplify(lat: np.ndarray, lon: np.ndarray, tolerance_m: float = SIMPLIFY_TOLERANCE_M) -> np.ndarray:
+    """Douglas-Peucker (반복형) - 남길 점의 mask. 첫 점 기준 평면(m)으로 근사."""
+    n = len(lat)
+    keep = np.zeros(n, dtype=bool)
+    if n <= 2:
+        keep[:] = True
+        return keep
+    y = (lat - lat[0]) * M_PER_DEG
+    x = (lon - lon[0]) * M_PER_DEG * math.cos(math.radians(lat[0]))
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        px, py = x[a + 1:b], y[a + 1:b]
+        dx, dy = x[b] - x[a], y[b] - y[a]
+        seg = math.hypot(dx, dy)
+        if seg == 0:
+            d = np.hypot(px - x[a], py - y[a])
+        else:
+            d = np.abs(dx * (y[a] - py) - (x[a] - px) * dy) / seg
+        k = int(np.argmax(d))
+        if d[k] > tolerance_m:
+            i = a + 1 + k
+            keep[i] = True
+            stack += [(a, i), (i, b)]
+    return keep
+
+
+def _keep_time_gaps(ts: np.ndarray, keep: np.ndarray) -> np.ndarray:
+    """남긴 점 사이가 KEEP_EVERY_SECONDS보다 벌어지면 그 사이 점을 간격마다 하나씩 추가"""
+    last = ts[0]
+    for i in range(1, len(ts)):
+        if keep[i] or ts[i] - last >= KEEP_EVERY_SECONDS:
+            keep[i] = True
+            last = ts[i]
+    return keep
+
+
+def encode_points(ts: np.ndarray, lat: np.ndarray, lon: np.ndarray, acc: np.ndarray) -> bytes:
+    """첫 점은 절대값, 이후는 이전 점과의 차이(int32) → zlib. ts는 epoch 초, 좌표는 도, 정확도는 m(-1 = 없음)."""
+    cols = np.stack([
+        ts.astype(np.int64),
+        np.round(lat * COORD_SCALE).astype(np.int64),
+        np.round(lon * COORD_SCALE).astype(np.int64),
+        np.round(acc).astype(np.int64),
+    ])
+    header = _HEADER.pack(_FORMAT, *(int(v) for v in cols[:, 0]))
+    deltas = cols[:, 1:].copy()
+    deltas[:3] = np.diff(cols[:3], axis=1)
+    return zlib.compress(header + deltas.T.astype("<i4").tobytes())
+
+
+def decode_points(data: bytes) -> list[TrackPoint]:
+    raw = zlib.decompress(data)
+    version, *first = _HEADER.unpack_from(raw)
+    if version != _FORMAT:
+        raise ValueError(f"unknown track format {version}")
+    deltas = np.frombuffer(raw, dtype="<i4", offset=_HEADER.size).reshape(-1, 4).T.astype(np.int64)
+    cols = np.concatenate([np.array(first, dtype=np.int64)[:, None], deltas], axis=1)
+    cols[:3] = np.cumsum(cols[:3], axis=1)
+    return [
+        TrackPoint(
+            datetime.fromtimestamp(int(t), tz=timezone.utc), la / COORD_SCALE, lo / COORD_SCALE,
+            float(a) if a >= 0 else None,
+        )
+        for t, la, lo, a in cols.T
+    ]
+
+
+class LatestPositions:
+    """루트별 최신 위치 (워커 메모리). 처음 묻는 루트는 DB의 마지막 묶음에서 한 번 채운다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._positions: dict[int, dict] = {}
+        self._loaded: set[int] = set()
+
+    def update(self, position: dict) -> None:
+        with self._lock:
+            current = self._positions.get(position["route_id"])
+            if current is None or position["ts"] > current["ts"]:
+                self._positions[position["route_id"]] = position
+            self._loaded.add(position["route_id"])
+
+    def on_event(self, event: dict) -> None:
+        """live_events 리스너 - 다른 워커가 받은 위치"""
+        if event.get("type") == "position":
+            self.update(event)
+
+    def get(self, db: Session, route_ids: list[int]) -> dict[int, dict]:
+        with self._lock:
+            missing = [rid for rid in route_ids if rid not in self._loaded]
+        if missing:
+            rows = db.execute(
+                select(RouteTrack.route_id, RouteTrack.driver_id, RouteTrack.points, Route.plan_id)
+                .join(Route, RouteTrack.route_id == Route.id)
+                .where(RouteTrack.route_id.in_(missing))
+                .order_by(RouteTrack.route_id, RouteTrack.ended_at.desc())
+                .distinct(RouteTrack.route_id)
+            ).all()
+            for r in rows:
+                self.update(_position(r.route_id, r.plan_id, r.driver_id, decode_points(r.points)[-1]))
+            with self._lock:
+                self._loaded.update(missing)
+        with self._lock:
+            return {rid: self._positions[rid] for rid in route_ids if rid in self._positions}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._positions.clear()
+            self._loaded.clear()
+
+
+latest_positions = LatestPositions()
+
+
+def _position(route_id: int, plan_id: int, driver_id: int | None, p: TrackPoint) -> dict:
+    return {
+        "type": "position",
+        "route_id": route_id,
+        "plan_id": plan_id,
+        "driver_id": driver_id,
+        "ts": p.recorded_at.timestamp(),
+        "recorded_at": p.recorded_at.isoformat(),
+        "latitude": p.latitude,
+        "longitude": p.longitude,
+        "accuracy": p.accuracy,
+    }
+
+
+def ingest(db: Session, route: Route, driver_id: int | None, points: list[TrackPoint]) -> dict:
+    """
+    위치 묶음 저장 (커밋은 호출자가). 부정확한 점, 이미 받은 시각 이전의 점(재전송)은 버린다.
+    반환: received(받은 점), stored(저장한 점), latest(최신 위치 또는 None)
+    stored > 0이면 호출자가 커밋 후 latest_positions.update(latest)로 메모리 캐시를 갱신한다.
+    """
+    _maybe_prune(db)
+    last = latest_positions.get(db, [route.id]).get(route.id)
+    since = last["ts"] if last else float("-inf")
+    # 초 단위로 저장 - 같은 초의 점은 마지막 것만
+    by_second = {
+        int(p.recorded_at.timestamp()): p._replace(recorded_at=p.recorded_at.replace(microsecond=0))
+        for p in sorted(points, key=lambda p: p.recorded_at)
+        if (p.accuracy is None or p.accuracy <= MAX_ACCURACY_M) and int(p.recorded_at.timestamp()) > since
+    }
+    accepted = [by_second[t] for t in sorted(by_second)]
+    if not accepted:
+        return {"received": len(points), "stored": 0, "latest": last}
+
+    ts = np.array(sorted(by_second), dtype=np.int64)
+    lat = np.array([p.latitude for p in accepted])
+    lon = np.array([p.longitude for p in accepted])
+    acc = np.array([p.accuracy if p.accuracy is not None else -1 for p in accepted])
+    keep = _keep_time_gaps(ts, simplify(lat, lon))
+    db.add(RouteTrack(
+        route_id=route.id,
+        driver_id=driver_id,
+        started_at=accepted[0].recorded_at,
+        ended_at=accepted[-1].recorded_at,
+        point_count=int(keep.sum()),
+        raw_count=len(accepted),
+        points=encode_points(ts[keep], lat[keep], lon[keep], acc[keep]),
+    ))
+    position = _position(route.id, route.plan_id, driver_id, accepted[-1])
+    publish(db, position)
+    return {"received": len(points), "stored": int(keep.sum()), "latest": position}
+
+
+def load_track(db: Session, route_id: int) -> list[TrackPoint]:
+    """루트의 저장된 경로 전체 (시간순)"""
+    rows = db.execute(
+        select(RouteTrack.points).where(RouteTrack.route_id == route_id).order_by(RouteTrack.started_at, RouteTrack.id)
+    ).scalars()
+    return [p for data in rows for p in decode_points(data)]
+
+
+_prune_lock = threading.Lock()
+_pruned_at = 0.0
+
+
+def prune_tracks(db: Session) -> int:
+    """보존 기간이 지난 경로 삭제. 삭제 건수 반환 (커밋은 호출자가)."""
+    days = get_settings().track_retention_days
+    result = db.execute(
+        delete(RouteTrack).where(RouteTrack.created_at < func.now() - func.make_interval(0, 0, 0, days))
+    )
+    return result.rowcount
+
+
+def _maybe_prune(db: Session) -> None:
+    global _pruned_at
+    if time.monotonic() - _pruned_at < PRUNE_INTERVAL or not _prune_lock.acquire(blocking=False):
+        return
+    try:
+        _pruned_at = time.monotonic()
+        prune_tracks(db)
+        db.commit()
+    finally:
+        _prune_lock.release()
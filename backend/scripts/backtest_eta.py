@@ -0,0 +1,86 @@
+"""
+ETA 예측 백테스트 - 지난 달마다 그 이전 기록으로만 학습하고, 그 달 루트의 완료가 하나씩 생길 때마다
+남은 스탑의 완료 시각을 예측해 실제와 비교한다. 비교 기준: 구간 시간 중앙값만 누적하는 단순 예측.
+사용: python scripts/backtest_eta.py [개월 수(기본 3)]
+"""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import get_settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.services.eta import (  # noqa: E402
+    EtaModel, company_depot, distances, fit, load_history, predict, segments,
+)
+
+HORIZONS = [("전체", 1, None), ("다음 스탑", 1, 1), ("2-5번째", 2, 5), ("6번째 이후", 6, None)]  # 남은 스탑 중 몇 번째인지
+
+
+def month_start(d: date, back: int = 0) -> date:
+    m = d.year * 12 + d.month - 1 - back
+    return date(m // 12, m % 12 + 1, 1)
+
+
+def evaluate(model: EtaModel, baseline: float, routes, depot) -> dict[str, list]:
+    """완료 시점마다 남은 스탑 예측 오차 (분, 예측 - 실제)"""
+    errors = {"model": [], "baseline": [], "horizon": []}
+    for route in routes:
+        done = sorted(s.completed_at for s in route.stops if s.completed_at)
+        if not done:
+            continue
+        dist = distances(depot, route.stops)
+        anchors = ([route.started_at] if route.started_at else []) + done[:-1]
+        for now in anchors:
+            for h, p in enumerate(predict(model, route.started_at or now, route.stops, dist, now), start=1):
+                actual = next(s.completed_at for s in route.stops if s.stop_id == p.stop_id)
+                if actual is None:
+                    continue
+                errors["model"].append((p.done - actual).total_seconds() / 60)
+                errors["baseline"].append(((now - actual).total_seconds() + baseline * h) / 60)
+                errors["horizon"].append(h)
+    return {k: np.array(v) for k, v in errors.items()}
+
+
+def report(label: str, errors: dict) -> None:
+    if not len(errors["model"]):
+        print(f"{label}: 예측 없음")
+        return
+    print(f"{label}: 예측 {len(errors['model'])}건")
+    for name, lo, hi in HORIZONS:
+        sel = (errors["horizon"] >= lo) & (errors["horizon"] <= (hi or errors["horizon"].max()))
+        if not sel.any():
+            continue
+        e, b = errors["model"][sel], errors["baseline"][sel]
+        print(
+            f"  {name:<8} n={sel.sum():<6} MAE={np.abs(e).mean():6.1f}분 중앙값={np.median(np.abs(e)):6.1f}분 "
+            f"p90={np.percentile(np.abs(e), 90):6.1f}분 편향={e.mean():+6.1f}분 | 단순 MAE={np.abs(b).mean():6.1f}분"
+        )
+
+
+def main() -> None:
+    months = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    history_days = get_settings().eta_history_days
+    db = SessionLocal()
+    try:
+        depot = company_depot(db)
+        total = {"model": [], "baseline": [], "horizon": []}
+        for back in range(months, 0, -1):
+            start, end = month_start(date.today(), back), month_start(date.today(), back - 1)
+            seg = segments(load_history(db, start - timedelta(days=history_days), start), depot)
+            model = fit(seg)
+            baseline = float(np.median(seg.seconds)) if len(seg.seconds) else model.typical_travel + model.service
+            errors = evaluate(model, baseline, load_history(db, start, end), depot)
+            report(f"{start:%Y-%m} (학습 구간 {model.samples}개)", errors)
+            for k in total:
+                total[k].extend(errors[k].tolist())
+        report("합계", {k: np.array(v) for k, v in total.items()})
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
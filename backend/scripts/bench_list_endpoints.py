@@ -0,0 +1,61 @@
+"""
+목록 API 요청당 CPU 시간 측정 - 거래처/품목/사용자/플랜 목록을 앱 안에서(TestClient) 반복 호출.
+CPU = 이 프로세스의 process_time (DB 서버 시간 제외), 벽시계 = 응답까지 시간. 변경 전후 같은 DB에서 비교.
+사용: python scripts/bench_list_endpoints.py [반복 수(기본 20)] [결과 JSON 저장 경로]
+"""
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.config import get_settings  # noqa: E402
+from app.core.auth import create_session  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+from app.models.user import Role  # noqa: E402
+
+ENDPOINTS = ["/api/customers", "/api/items", "/api/users", "/api/plans"]
+
+
+def main() -> None:
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    db = SessionLocal()
+    try:
+        admin = db.execute(select(User).where(User.role == Role.ADMIN)).scalars().first()
+        session_id = create_session(db, admin)
+        db.commit()
+    finally:
+        db.close()
+    client = TestClient(app)
+    client.cookies.set(get_settings().session_cookie_name, session_id)
+    headers = {"Accept-Encoding": "identity"}
+    results = {}
+    for path in ENDPOINTS:
+        body = client.get(path, headers=headers).content  # 첫 호출(연결/캐시 준비)은 제외
+        cpu, wall = [], []
+        for _ in range(repeat):
+            c0, w0 = time.process_time(), time.perf_counter()
+            client.get(path, headers=headers).raise_for_status()
+            cpu.append((time.process_time() - c0) * 1000)
+            wall.append((time.perf_counter() - w0) * 1000)
+        results[path] = {
+            "rows": len(json.loads(body)),
+            "bytes": len(body),
+            "cpu_ms": statistics.median(cpu),
+            "wall_ms": statistics.median(wall),
+        }
+        r = results[path]
+        print(f"{path:<16} {r['rows']:>6}행 {r['bytes']:>9,}B  CPU {r['cpu_ms']:8.1f}ms  벽시계 {r['wall_ms']:8.1f}ms")
+    if len(sys.argv) > 2:
+        Path(sys.argv[2]).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+월말 정산 리포트 PDF 렌더링 벤치마크 (DB 불필요, 합성 데이터)
+사용: python scripts/bench_report_pdf.py [행 수]
+"""
+import sys
+import time
+import resource
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.report import FONT_NAME, ROWS_PER_TABLE, generate_monthly_report_pdf  # noqa: E402
+
+
+def synthetic_rows(n: int):
+    base = datetime(2025, 1, 1, 8, 0)
+    for i in range(n):
+        day = i * 31 // n
+        yield {
+            "plan_date": date(2025, 1, 1) + timedelta(days=day),
+            "route_name": f"{i % 12 + 1}호차",
+            "customer_name": f"거래처 {i % 900:03d} 본점 ({'식자재' * (i % 4)})",
+            "driver_name": f"기사{i % 12 + 1}",
+            "completed_at": base + timedelta(days=day, minutes=i % 600),
+        }
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    summary = [
+        {"driver_name": f"기사{d + 1}", "completions": n // 12, "stops": n // 12, "customers": 75, "sales": 1234567}
+        for d in range(12)
+    ]
+    t = time.perf_counter()
+    buf = generate_monthly_report_pdf(date(2025, 1, 1), date(2025, 1, 31), synthetic_rows(n), summary)
+    elapsed = time.perf_counter() - t
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pages = buf.getvalue().count(b"/Type /Page\n")
+    print(f"rows={n} font={FONT_NAME} rows/table={ROWS_PER_TABLE}")
+    print(f"time={elapsed:.2f}s max_rss={peak_kb / 1024:.0f}MB size={len(buf.getvalue()) / 1e6:.2f}MB pages={pages}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""회사 설정 스냅샷 - 저장 시 버전 증가, 다른 워커의 변경은 CHECK_INTERVAL 이후 반영 (PostgreSQL 필요)"""
+import types
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.services import app_settings
+from app.services.app_settings import _current_version, get_company_settings, save_company_settings
+
+
+@pytest.fixture
+def settings_db(monkeypatch):
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(app_settings, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    # 이 워커의 스냅샷은 비운 채로 시작 (테스트 후 원래 값 복원)
+    monkeypatch.setattr(app_settings, "_snapshot", None)
+    monkeypatch.setattr(app_settings, "_checked_at", 0.0)
+    try:
+        yield db, clock
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def test_other_worker_save_visible_after_interval(settings_db):
+    db, clock = settings_db
+    before = get_company_settings(db)
+    # 다른 워커의 저장 - 이 워커의 스냅샷은 invalidate되지 않음
+    save_company_settings(db, {"company_name": "as_회사", "delivery_route_count": 7})
+    assert _current_version(db) == before.version + 1
+
+    clock.now += app_settings.CHECK_INTERVAL / 2
+    assert get_company_settings(db) is before  # 확인 간격 이내 - 메모리 값 그대로
+
+    clock.now += app_settings.CHECK_INTERVAL
+    after = get_company_settings(db)
+    assert after.version == before.version + 1
+    assert (after.company_name, after.delivery_route_count) == ("as_회사", 7)
+
+    clock.now += app_settings.CHECK_INTERVAL
+    assert get_company_settings(db) is after  # 버전이 같으면 다시 적재하지 않음
@@ -0,0 +1,78 @@
+"""미수금 원장 - 잔액 누적, 기준일 잔액, 추가 전용 (PostgreSQL 필요)"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import ArrearsKind, Customer, User
+from app.models.user import Role
+from app.services.arrears import balance_as_of, ledger_page, post_entry, set_balance
+
+
+@pytest.fixture
+def ledger_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        customer_id = conn.execute(
+            insert(Customer).returning(Customer.id), {"name": "ar_customer", "arrears": 1000}
+        ).scalar()
+        yield db, customer_id
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def test_running_balance(ledger_db):
+    db, customer_id = ledger_db
+    post_entry(db, customer_id, ArrearsKind.CHARGE, 5500)
+    post_entry(db, customer_id, ArrearsKind.PAYMENT, -3000, memo="부분변제")
+    assert set_balance(db, customer_id, 0, ArrearsKind.ADJUSTMENT).amount == -3500
+    assert set_balance(db, customer_id, 0, ArrearsKind.ADJUSTMENT) is None
+
+    entries = ledger_page(db, customer_id, 10)
+    assert [(e.kind, int(e.amount), int(e.balance)) for e in reversed(entries)] == [
+        (ArrearsKind.CHARGE, 5500, 6500),
+        (ArrearsKind.PAYMENT, -3000, 3500),
+        (ArrearsKind.ADJUSTMENT, -3500, 0),
+    ]
+    assert int(db.get(Customer, customer_id).arrears) == 0
+    assert [e.id for e in ledger_page(db, customer_id, 10, before_id=entries[0].id)] == [e.id for e in entries[1:]]
+
+
+def test_balance_as_of(ledger_db):
+    db, customer_id = ledger_db
+    now = datetime.now(timezone.utc)
+    assert balance_as_of(db, customer_id, now) is None  # 원장 시작 전
+    post_entry(db, customer_id, ArrearsKind.CHARGE, 200)
+    post_entry(db, customer_id, ArrearsKind.CHARGE, 300)
+    assert balance_as_of(db, customer_id, now - timedelta(days=1)) is None
+    assert int(balance_as_of(db, customer_id, now + timedelta(days=1))) == 1500
+
+
+def test_ledger_rows_are_append_only(ledger_db):
+    db, customer_id = ledger_db
+    entry = post_entry(db, customer_id, ArrearsKind.CHARGE, 100)
+    with pytest.raises(DBAPIError):
+        with db.begin_nested():
+            db.execute(text("UPDATE arrears_ledger SET amount = 0 WHERE id = :id"), {"id": entry.id})
+
+
+def test_deleting_user_keeps_ledger_rows(ledger_db):
+    db, customer_id = ledger_db
+    user = User(username="ar_user", password_hash="x", role=Role.ADMIN, display_name="ar")
+    db.add(user)
+    db.flush()
+    entry = post_entry(db, customer_id, ArrearsKind.PAYMENT, -500, user_id=user.id)
+    db.delete(user)
+    db.flush()
+    db.refresh(entry)
+    assert entry.user_id is None and int(entry.amount) == -500
@@ -0,0 +1,105 @@
+"""코드 채번 - 동시 세션에서도 중복 없음 (카운터/빈 번호 모드), 빈 번호 재사용, 블록 예약 반환 (PostgreSQL 필요)"""
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal, engine
+from app.models import CodeCounter, Customer
+from app.services.code_allocator import CodeAllocator, CodeSpec
+
+THREADS = 6
+PER_THREAD = 3
+
+
+@pytest.fixture
+def spec():
+    """실제 C/P 카운터를 건드리지 않도록 테스트 전용 접두어. 커밋된 행은 끝나면 지운다."""
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    prefix = "T" + uuid.uuid4().hex[:6].upper()
+    try:
+        yield CodeSpec(prefix, 4, Customer.code)
+    finally:
+        with conn.begin():
+            conn.execute(delete(Customer).where(Customer.code.startswith(prefix)))
+            conn.execute(delete(CodeCounter).where(CodeCounter.prefix == prefix))
+        conn.close()
+
+
+def _add(db: Session, codes: list[str]) -> None:
+    db.execute(insert(Customer), [{"name": f"ca_{code}", "code": code} for code in codes])
+
+
+def _allocate_concurrently(spec: CodeSpec, **options) -> list[str]:
+    """스레드마다 다른 세션으로 동시에 PER_THREAD개씩 발급 → 저장 → 커밋 (가져오기와 같은 흐름)"""
+    barrier = threading.Barrier(THREADS)
+    codes: list[str] = []
+    errors: list[BaseException] = []
+
+    def run() -> None:
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            allocator = CodeAllocator(db, spec, **options)
+            got = [allocator.next() for _ in range(PER_THREAD)]
+            _add(db, got)
+            allocator.release()
+            db.commit()
+            codes.extend(got)
+        except BaseException as e:  # 스레드 예외는 메인에서 확인
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=run) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    return codes
+
+
+def _numbers(spec: CodeSpec, codes) -> list[int]:
+    return sorted(int(c[len(spec.prefix):]) for c in codes)
+
+
+def test_counter_mode_concurrent_blocks_unique(spec):
+    with SessionLocal() as db:
+        # 카운터 생성 후 수동 입력된 코드 - 발급 시 건너뛰어야 함
+        db.execute(insert(CodeCounter), {"prefix": spec.prefix, "last_value": 0})
+        _add(db, [spec.format(2)])
+        db.commit()
+    codes = _allocate_concurrently(spec, block_size=50)
+    total = THREADS * PER_THREAD
+    assert len(set(codes)) == total
+    # 사용하지 않은 블록 예약은 반환되어 번호가 연속 (수동 코드 2만 빠짐)
+    assert _numbers(spec, codes) == [n for n in range(1, total + 2) if n != 2]
+    with SessionLocal() as db:
+        assert db.execute(select(CodeCounter.last_value).where(CodeCounter.prefix == spec.prefix)).scalar() == total + 1
+
+
+def test_gap_mode_concurrent_unique(spec):
+    with SessionLocal() as db:
+        _add(db, [spec.format(n) for n in (1, 2, 4, 6)])
+        db.commit()
+    codes = _allocate_concurrently(spec, reuse_gaps=True, block_size=50)
+    total = THREADS * PER_THREAD
+    assert len(set(codes)) == total
+    free = [n for n in range(1, total + 5) if n not in (1, 2, 4, 6)][:total]
+    assert _numbers(spec, codes) == free
+
+
+def test_gap_mode_reuses_smallest_free_numbers(spec):
+    with SessionLocal() as db:
+        _add(db, [spec.format(n) for n in (1, 2, 4, 7)])
+        allocator = CodeAllocator(db, spec, reuse_gaps=True)
+        # 확보만 하고 아직 저장 전인 번호는 다시 주지 않음
+        assert [allocator.next(), *allocator.reserve(3)] == [spec.format(n) for n in (3, 5, 6, 8)]
+        db.rollback()
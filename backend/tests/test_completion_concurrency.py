@@ -0,0 +1,90 @@
+"""동시 완료 - 같은 스탑을 여러 연결에서 동시에 완료해도 완료/미수금 청구는 1건 (PostgreSQL 필요)"""
+import threading
+import uuid
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import OperationalError
+
+from app.api.completions import _complete, _get_stop_with_route
+from app.database import SessionLocal, engine
+from app.models import ArrearsEntry, ArrearsKind, Customer, Item, Plan, Route, Stop, StopCompletion, StopOrderItem, User
+from app.models.user import Role
+
+THREADS = 8
+
+
+@pytest.fixture
+def committed_stop():
+    """스레드마다 다른 연결이 보도록 실제로 커밋하고, 끝나면 지운다"""
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    tag = uuid.uuid4().hex[:8]
+    with conn.begin():
+        customer_id = conn.execute(insert(Customer).returning(Customer.id), {"name": f"cc_{tag}"}).scalar()
+        item_id = conn.execute(
+            insert(Item).returning(Item.id), {"code": f"cc_{tag}", "product": "cc", "unit_price": 1000}
+        ).scalar()
+        plan_id = conn.execute(insert(Plan).returning(Plan.id), {"plan_date": date(2001, 1, 4), "name": "cc"}).scalar()
+        route_id = conn.execute(insert(Route).returning(Route.id), {"plan_id": plan_id, "name": "1호차"}).scalar()
+        stop_id = conn.execute(
+            insert(Stop).returning(Stop.id), {"route_id": route_id, "customer_id": customer_id, "sequence": 0}
+        ).scalar()
+        conn.execute(insert(StopOrderItem), {"stop_id": stop_id, "item_id": item_id, "quantity": 3})
+        user_id = conn.execute(
+            insert(User).returning(User.id),
+            {"username": f"cc_{tag}", "password_hash": "x", "role": Role.ADMIN, "display_name": "cc"},
+        ).scalar()
+    try:
+        yield stop_id, customer_id, user_id
+    finally:
+        with conn.begin():
+            conn.execute(delete(Plan).where(Plan.id == plan_id))
+            conn.execute(delete(Customer).where(Customer.id == customer_id))
+            conn.execute(delete(Item).where(Item.id == item_id))
+            conn.execute(delete(User).where(User.id == user_id))
+        conn.close()
+
+
+def test_simultaneous_completions_charge_once(committed_stop):
+    stop_id, customer_id, user_id = committed_stop
+    barrier = threading.Barrier(THREADS)
+    results: list[str] = []
+
+    def tap(i: int) -> None:
+        db = SessionLocal()
+        try:
+            stop = _get_stop_with_route(db, stop_id)
+            user = db.get(User, user_id)
+            barrier.wait()
+            try:
+                # 절반은 같은 멱등 키로 재시도, 나머지는 키 없는 연타
+                _, created = _complete(db, stop, user, None, "cc-key" if i % 2 else None)
+                db.commit()
+                results.append("created" if created else "duplicate")
+            except HTTPException as e:
+                db.rollback()
+                results.append(str(e.status_code))
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=tap, args=(i,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count("created") == 1
+    assert set(results) <= {"created", "duplicate", "400"}
+    with engine.connect() as conn:
+        completions = conn.execute(select(func.count()).where(StopCompletion.stop_id == stop_id)).scalar()
+        charges = conn.execute(
+            select(ArrearsEntry.amount).where(ArrearsEntry.stop_id == stop_id, ArrearsEntry.kind == ArrearsKind.CHARGE)
+        ).scalars().all()
+        arrears = conn.execute(select(Customer.arrears).where(Customer.id == customer_id)).scalar()
+    assert completions == 1
+    assert len(charges) == 1 and arrears == charges[0]
@@ -0,0 +1,73 @@
+"""완료 멱등 키 - 같은 키 재요청은 처음 완료를 돌려주고, 오프라인 대기열은 항목별 결과 (PostgreSQL 필요)"""
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.api.completions import _complete, replay_completions
+from app.database import engine
+from app.models import Customer, Plan, Route, Stop, StopCompletion, User
+from app.models.user import Role
+from app.schemas.completion import CompletionReplayRequest
+
+
+@pytest.fixture
+def stops_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        customer_id = conn.execute(insert(Customer).returning(Customer.id), {"name": "cr_customer"}).scalar()
+        plan_id = conn.execute(insert(Plan).returning(Plan.id), {"plan_date": date(2001, 1, 3), "name": "cr"}).scalar()
+        route_id = conn.execute(insert(Route).returning(Route.id), {"plan_id": plan_id, "name": "1호차"}).scalar()
+        stop_ids = conn.execute(
+            insert(Stop).returning(Stop.id),
+            [{"route_id": route_id, "customer_id": customer_id, "sequence": s} for s in range(2)],
+        ).scalars().all()
+        admin = User(username="cr_admin", password_hash="x", role=Role.ADMIN, display_name="cr")
+        db.add(admin)
+        db.flush()
+        yield db, admin, stop_ids
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def test_same_key_returns_first_completion(stops_db):
+    db, admin, stop_ids = stops_db
+    stop = db.get(Stop, stop_ids[0])
+    first, created = _complete(db, stop, admin, "memo", "key-00000001")
+    again, created_again = _complete(db, stop, admin, "memo", "key-00000001")
+    assert created and not created_again
+    assert again.id == first.id
+    with pytest.raises(HTTPException) as e:
+        _complete(db, stop, admin, None, "key-00000002")
+    assert e.value.status_code == 400
+    with pytest.raises(HTTPException) as e:
+        _complete(db, db.get(Stop, stop_ids[1]), admin, None, "key-00000001")
+    assert e.value.status_code == 409
+
+
+def test_replay_reports_each_item(stops_db):
+    db, admin, stop_ids = stops_db
+    offline_at = datetime(2001, 1, 3, 9, 30, tzinfo=timezone.utc)
+    data = CompletionReplayRequest(items=[
+        {"client_key": "replay-0001", "stop_id": stop_ids[0], "completed_at": offline_at},
+        {"client_key": "replay-0001", "stop_id": stop_ids[0]},
+        {"client_key": "replay-0002", "stop_id": stop_ids[0]},
+        {"client_key": "replay-0003", "stop_id": -1},
+    ])
+    results = replay_completions(data, db, admin)
+    assert [(r.status, r.status_code) for r in results] == [
+        ("created", 201), ("duplicate", 200), ("error", 400), ("error", 404),
+    ]
+    completions = db.execute(select(StopCompletion).where(StopCompletion.stop_id == stop_ids[0])).scalars().all()
+    assert len(completions) == 1
+    assert completions[0].completed_at == offline_at
@@ -0,0 +1,76 @@
+"""응답 압축 미들웨어 / 열 형식 필드 선택 (DB 불필요)"""
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, choose_encoding
+from app.services.route_payload import FIELDS, parse_fields
+
+BIG = {"stops": [{"id": i, "name": f"거래처{i}"} for i in range(200)]}
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+
+@app.get("/big")
+def big():
+    return BIG
+
+
+@app.get("/small")
+def small():
+    return {"ok": True}
+
+
+@app.get("/csv")
+def csv():
+    return StreamingResponse((f"{i},{i * 2}\n" for i in range(2000)), media_type="text/csv")
+
+
+@app.get("/events")
+def events():
+    return StreamingResponse(iter(["data: 1\n\n"] * 100), media_type="text/event-stream")
+
+
+@app.get("/photo")
+def photo():
+    return PlainTextResponse(b"\xff" * 2000, media_type="image/jpeg")
+
+
+client = TestClient(app)
+
+
+def _raw(path: str, encoding: str):
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+def test_brotli_preferred_and_round_trips():
+    r, body = _raw("/big", "gzip, deflate, br")
+    assert r.headers["content-encoding"] == "br"
+    assert int(r.headers["content-length"]) == len(body)
+    assert "accept-encoding" in r.headers["vary"].lower()
+    assert brotli.decompress(body) == client.get("/big", headers={"Accept-Encoding": "identity"}).content
+
+
+def test_gzip_streaming_response():
+    r, body = _raw("/csv", "gzip")
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert gzip.decompress(body).decode().splitlines()[-1] == "1999,3998"
+
+
+def test_skips_small_sse_binary_and_refused():
+    for path, encoding in [("/small", "br"), ("/events", "br"), ("/photo", "gzip"), ("/big", "br;q=0, gzip;q=0")]:
+        r, _ = _raw(path, encoding)
+        assert "content-encoding" not in r.headers, path
+    assert choose_encoding("identity") is None
+
+
+def test_parse_fields():
+    assert parse_fields(None) == set(FIELDS)
+    assert parse_fields("sequence, customer.name") == {"sequence", "customer.name", "customer_id"}
+    assert parse_fields("sequence,password") is None
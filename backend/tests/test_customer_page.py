@@ -0,0 +1,94 @@
+"""거래처 페이지 - keyset 커서 연속성(정렬 키 동률 포함), ETag/304, 검색어 와일드카드 (PostgreSQL 필요)"""
+import json
+import uuid
+from decimal import Decimal
+from urllib.parse import urlencode
+
+import pytest
+from sqlalchemy import func, insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app.api.customers import list_customers_page
+from app.database import engine
+from app.models import Customer, User
+from app.models.user import Role
+
+
+@pytest.fixture
+def page_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    tag = uuid.uuid4().hex[:8]
+    try:
+        # 루트/미수금 값이 겹치도록 (정렬 키 동률 → id로 구분)
+        ids = conn.execute(
+            insert(Customer).returning(Customer.id, sort_by_parameter_order=True),
+            [
+                {"name": f"cp{tag} {i:02d}", "route": f"{i % 3 + 1}호차", "arrears": Decimal(i % 2 * 1000)}
+                for i in range(11)
+            ],
+        ).scalars().all()
+        admin = User(username=f"cp_admin_{tag}", password_hash="x", role=Role.ADMIN, display_name="cp")
+        db.add(admin)
+        db.flush()
+        yield db, conn, admin, tag, ids
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def _page(db, admin, if_none_match=None, **params):
+    params = {"sort": "name", "order": "asc", "limit": 100} | params
+    query = urlencode({k: v for k, v in params.items() if v is not None})
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    request = Request({"type": "http", "method": "GET", "path": "/api/customers/page",
+                       "query_string": query.encode(), "headers": headers})
+    return list_customers_page(
+        request, route=None, contract=None, arrears_min=None, arrears_max=None, q=params.get("q"),
+        sort=params["sort"], order=params["order"], limit=params["limit"], cursor=params.get("cursor"),
+        fields=params.get("fields"), db=db, current_user=admin, _=admin,
+    )
+
+
+def _names(db, admin, q) -> list[str]:
+    return [c["name"] for c in json.loads(_page(db, admin, q=q).body)["items"]]
+
+
+@pytest.mark.parametrize("sort,order", [("route", "asc"), ("arrears", "desc"), ("name", "asc")])
+def test_cursor_pages_cover_all_rows_once(page_db, sort, order):
+    db, _, admin, tag, ids = page_db
+    seen, cursor = [], None
+    while True:
+        body = json.loads(_page(db, admin, q=f"cp{tag}", sort=sort, order=order, limit=3, cursor=cursor).body)
+        seen += [c["id"] for c in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    full = [c["id"] for c in json.loads(_page(db, admin, q=f"cp{tag}", sort=sort, order=order).body)["items"]]
+    assert seen == full and sorted(seen) == sorted(ids)
+
+
+def test_etag_not_modified_and_changes_after_update(page_db):
+    db, conn, admin, tag, ids = page_db
+    etag = _page(db, admin, q=f"cp{tag}").headers["etag"]
+    assert _page(db, admin, if_none_match=etag, q=f"cp{tag}").status_code == 304
+    # 같은 트랜잭션에서는 now()가 고정이므로 다음 요청(트랜잭션)의 수정 시각을 흉내냄
+    conn.execute(
+        update(Customer).where(Customer.id == ids[0]).values(name=f"cp{tag} 수정", updated_at=func.clock_timestamp())
+    )
+    response = _page(db, admin, if_none_match=etag, q=f"cp{tag}")
+    assert response.status_code == 200 and response.headers["etag"] != etag
+
+
+def test_search_wildcards_match_literally(page_db):
+    db, conn, admin, tag, _ = page_db
+    conn.execute(insert(Customer), [{"name": f"cp{tag} 50%"}, {"name": f"cp{tag} 500"}, {"name": f"cp{tag}_x"}])
+    assert _names(db, admin, f"cp{tag} 50%") == [f"cp{tag} 50%"]
+    assert _names(db, admin, f"cp{tag}_") == [f"cp{tag}_x"]
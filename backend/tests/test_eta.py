@@ -0,0 +1,45 @@
+"""ETA 학습/예측 (DB 불필요)"""
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services.eta import EtaModel, EtaStop, Segments, fit, predict
+
+
+def test_fit_recovers_pace_and_customer_service():
+    rng = np.random.default_rng(0)
+    n = 2000
+    meters = rng.uniform(500, 8000, n)
+    customers = rng.integers(1, 21, n)
+    service = 60.0 * customers  # 거래처 k: k분
+    seconds = meters / 7.0 + service + rng.normal(0, 30, n)
+    model = fit(Segments(meters, seconds, customers, np.full(n, 10)))
+    assert abs(1 / model.pace - 7.0) < 0.3
+    assert abs(model.service_seconds(5) - 300) < 60
+    assert abs(model.service_seconds(20) - 1200) < 60
+    assert model.service_seconds(999) == model.service  # 모르는 거래처는 전체 평균
+
+
+def test_fit_falls_back_with_few_samples():
+    model = fit(Segments(np.array([1000.0]), np.array([600.0]), np.array([1]), np.array([9])))
+    assert model == EtaModel(samples=1)
+
+
+def test_predict_from_last_completion():
+    model = EtaModel(pace=0.1, service=100.0, pace_by_hour=(0.1,) * 24, service_by_customer={2: 200.0})
+    start = datetime(2025, 1, 6, 8, 0, tzinfo=timezone.utc)
+    stops = [
+        EtaStop(11, 1, 37.5, 127.0, start + timedelta(minutes=10)),
+        EtaStop(12, 2, 37.5, 127.0, None),
+        EtaStop(13, 3, 37.5, 127.0, None),
+    ]
+    dist = np.full((4, 4), 1000.0)  # 구간마다 100초 이동
+    now = start + timedelta(minutes=11)
+    p = predict(model, start, stops, dist, now)
+    assert [x.stop_id for x in p] == [12, 13]
+    assert p[0].arrival == start + timedelta(minutes=11, seconds=40)  # 마지막 완료 + 100초
+    assert p[0].done == p[0].arrival + timedelta(seconds=200)
+    assert p[1].arrival == p[0].done + timedelta(seconds=100)
+    # 예상보다 늦어지면 도착 예정은 지금으로 밀린다
+    late = predict(model, start, stops, dist, start + timedelta(minutes=30))
+    assert late[0].arrival == start + timedelta(minutes=30)
@@ -0,0 +1,38 @@
+"""실시간 이벤트 허브 - 구독 조건별 전달, 느린 구독자는 resync 한 건으로 대체"""
+import asyncio
+
+from app.services.live_events import QUEUE_SIZE, RESYNC, EventHub, Subscription
+
+
+def _drain(sub: Subscription) -> list[dict]:
+    events = []
+    while not sub.queue.empty():
+        events.append(sub.queue.get_nowait())
+    return events
+
+
+def test_dispatch_filters_by_subscription():
+    async def run():
+        hub = EventHub()
+        plan_1 = Subscription(lambda e: e.get("plan_id") == 1)
+        plan_2 = Subscription(lambda e: e.get("plan_id") == 2)
+        hub._subscribers.update({plan_1, plan_2})
+        hub.dispatch({"type": "stop_completed", "plan_id": 1})
+        hub.dispatch(RESYNC)
+        return _drain(plan_1), _drain(plan_2)
+
+    events_1, events_2 = asyncio.run(run())
+    assert [e["type"] for e in events_1] == ["stop_completed", "resync"]
+    assert events_2 == [RESYNC]
+
+
+def test_full_queue_collapses_to_resync():
+    async def run():
+        sub = Subscription(lambda e: True)
+        for i in range(QUEUE_SIZE + 5):
+            sub.put({"type": "stop_completed", "stop_id": i})
+        return _drain(sub)
+
+    events = asyncio.run(run())
+    assert RESYNC in events
+    assert len(events) < QUEUE_SIZE
@@ -0,0 +1,84 @@
+"""플랜 목록 - 배달 수량/매출/루트별 배송상태를 한 번에 집계, 기사는 배정된 플랜만 (PostgreSQL 필요)"""
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.api.plans import list_plans
+from app.database import engine
+from app.models import Customer, Item, Plan, Route, RouteAssignment, Stop, StopCompletion, StopOrderItem, User
+from app.models.user import Role
+
+DAY = date(2001, 1, 5)
+
+
+@pytest.fixture
+def plans_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    tag = uuid.uuid4().hex[:8]
+    try:
+        customer_id = conn.execute(insert(Customer).returning(Customer.id), {"name": "pl_customer"}).scalar()
+        item_id = conn.execute(
+            insert(Item).returning(Item.id), {"code": f"pl_{tag}", "product": "곱슬이", "unit": "박스", "unit_price": 1500}
+        ).scalar()
+        plan_id, empty_plan_id = conn.execute(
+            insert(Plan).returning(Plan.id, sort_by_parameter_order=True),
+            [{"plan_date": DAY, "name": "pl"}, {"plan_date": DAY, "name": "pl-empty"}],
+        ).scalars().all()
+        route_ids = conn.execute(
+            insert(Route).returning(Route.id, sort_by_parameter_order=True),
+            [
+                {"plan_id": plan_id, "name": "1호차", "sequence": 0, "started_at": None},
+                {"plan_id": plan_id, "name": "2호차", "sequence": 1, "started_at": datetime.now(timezone.utc)},
+                {"plan_id": plan_id, "name": "3호차", "sequence": 2, "started_at": None},
+            ],
+        ).scalars().all()
+        stop_ids = conn.execute(
+            insert(Stop).returning(Stop.id, sort_by_parameter_order=True),
+            [{"route_id": route_ids[0], "customer_id": customer_id, "sequence": s} for s in range(3)]
+            + [{"route_id": route_ids[1], "customer_id": customer_id, "sequence": 0}],
+        ).scalars().all()
+        conn.execute(insert(StopOrderItem), [{"stop_id": s, "item_id": item_id, "quantity": 2} for s in stop_ids])
+        conn.execute(insert(StopCompletion), {"stop_id": stop_ids[0]})
+        admin = User(username=f"pl_admin_{tag}", password_hash="x", role=Role.ADMIN, display_name="pl")
+        driver = User(username=f"pl_driver_{tag}", password_hash="x", role=Role.DRIVER, display_name="pl")
+        db.add_all([admin, driver])
+        db.flush()
+        db.add(RouteAssignment(route_id=route_ids[1], driver_id=driver.id))
+        db.flush()
+        yield db, admin, driver, plan_id, empty_plan_id
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def _plans(db, user) -> dict[int, dict]:
+    response = list_plans(from_date=DAY, to_date=DAY, db=db, current_user=user)
+    return {p["id"]: p for p in json.loads(response.body)}
+
+
+def test_plan_list_summaries(plans_db):
+    db, admin, _, plan_id, empty_plan_id = plans_db
+    plans = _plans(db, admin)
+    assert plans[plan_id]["delivery_quantity"] == "곱슬이 8박스"
+    assert plans[plan_id]["daily_sales"] == 12000
+    assert plans[plan_id]["delivery_status"] == "1호차: 배송중(1/3), 2호차: 배송시작, 3호차: 배송전"
+    assert plans[empty_plan_id] | {"id": 0} == {
+        "id": 0, "plan_date": DAY.isoformat(), "route": None, "name": "pl-empty", "memo": None,
+        "delivery_quantity": "", "daily_sales": 0, "delivery_status": "배송전",
+    }
+
+
+def test_driver_sees_assigned_plans_once(plans_db):
+    db, _, driver, plan_id, _ = plans_db
+    assert list(_plans(db, driver)) == [plan_id]
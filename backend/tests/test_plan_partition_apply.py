@@ -0,0 +1,69 @@
+"""분배 제안 수락 - 출발하지 않은 루트의 스탑은 모두 지정해야 저장 (PostgreSQL 필요)"""
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.api.routes import apply_plan_partition
+from app.database import engine
+from app.models import Customer, Plan, Route, Stop
+from app.schemas.route import PartitionApply
+
+
+@pytest.fixture
+def partition_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        customer_id = conn.execute(insert(Customer).returning(Customer.id), {"name": "pa_customer"}).scalar()
+        plan_id = conn.execute(insert(Plan).returning(Plan.id), {"plan_date": date(2001, 1, 6), "name": "pa"}).scalar()
+        route_ids = conn.execute(
+            insert(Route).returning(Route.id, sort_by_parameter_order=True),
+            [
+                {"plan_id": plan_id, "name": "1호차", "sequence": 0, "started_at": None},
+                {"plan_id": plan_id, "name": "2호차", "sequence": 1, "started_at": None},
+                {"plan_id": plan_id, "name": "3호차", "sequence": 2, "started_at": datetime.now(timezone.utc)},
+            ],
+        ).scalars().all()
+        stop_ids = conn.execute(
+            insert(Stop).returning(Stop.id, sort_by_parameter_order=True),
+            [{"route_id": route_ids[r], "customer_id": customer_id, "sequence": s} for r in range(3) for s in range(2)],
+        ).scalars().all()
+        yield db, plan_id, route_ids, stop_ids
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def _apply(db, plan_id, routes: dict[int, list[int]]) -> None:
+    data = PartitionApply(routes=[{"route_id": rid, "stop_ids": ids} for rid, ids in routes.items()])
+    apply_plan_partition(plan_id, data, db=db, current_user=None, _=None)
+
+
+def test_partial_partition_rejected(partition_db):
+    db, plan_id, route_ids, stop_ids = partition_db
+    # 2호차 스탑 하나(stop_ids[3])를 빠뜨림 → 기존 순서가 남아 겹칠 수 있으므로 거부
+    with pytest.raises(HTTPException) as exc:
+        _apply(db, plan_id, {route_ids[0]: [stop_ids[2], stop_ids[0], stop_ids[1]]})
+    assert exc.value.status_code == 400
+
+
+def test_full_partition_applied(partition_db):
+    db, plan_id, route_ids, stop_ids = partition_db
+    # 출발한 3호차는 생략 가능
+    _apply(db, plan_id, {route_ids[0]: [stop_ids[2], stop_ids[0], stop_ids[1]], route_ids[1]: [stop_ids[3]]})
+    rows = db.execute(
+        select(Stop.route_id, Stop.id).where(Stop.id.in_(stop_ids)).order_by(Stop.route_id, Stop.sequence)
+    ).all()
+    assert [tuple(r) for r in rows] == [
+        (route_ids[0], stop_ids[2]), (route_ids[0], stop_ids[0]), (route_ids[0], stop_ids[1]),
+        (route_ids[1], stop_ids[3]), (route_ids[2], stop_ids[4]), (route_ids[2], stop_ids[5]),
+    ]
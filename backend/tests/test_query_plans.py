@@ -0,0 +1,159 @@
+"""쿼리 플랜 회귀 테스트 - 주요 API 조회 경로가 인덱스를 사용하는지 확인 (PostgreSQL + 마이그레이션 필요)"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.exc import OperationalError
+
+from app.database import engine
+from app.models import (
+    Customer,
+    Item,
+    Photo,
+    Plan,
+    Route,
+    RouteAssignment,
+    Stop,
+    StopCompletion,
+    StopOrderItem,
+    User,
+)
+from app.models.user import Role
+
+# 반년치 운영 규모 - 순차 스캔을 끄지 않고 ANALYZE 통계만으로 플래너가 인덱스를 고르는지 본다
+DAYS, ROUTES, STOPS, DRIVERS = 180, 5, 20, 20
+
+
+def _ids(conn, model, rows):
+    return [r[0] for r in conn.execute(insert(model).returning(model.id), rows)]
+
+
+def _seed(conn) -> dict:
+    """180일치 플랜 x 5루트 x 20스탑 (스탑 18000, 주문 품목 36000), 기사 20명"""
+    driver_ids = _ids(conn, User, [
+        {"username": f"qp_driver_{i}", "password_hash": "x", "role": Role.DRIVER} for i in range(DRIVERS)
+    ])
+    customer_ids = _ids(conn, Customer, [{"name": f"qp_customer_{i}", "code": f"QPC{i:05d}"} for i in range(500)])
+    item_ids = _ids(conn, Item, [{"code": f"QPP{i:05d}", "product": f"qp_item_{i}", "unit": "박스"} for i in range(50)])
+    plan_ids = _ids(conn, Plan, [
+        {"plan_date": date(2001, 1, 1) + timedelta(days=i), "name": f"qp_plan_{i}"} for i in range(DAYS)
+    ])
+    route_rows = [{"plan_id": p, "name": f"{r + 1}호차", "sequence": r} for p in plan_ids for r in range(ROUTES)]
+    route_ids = _ids(conn, Route, route_rows)
+    conn.execute(insert(RouteAssignment), [
+        {"route_id": rid, "driver_id": driver_ids[i % len(driver_ids)]} for i, rid in enumerate(route_ids)
+    ])
+    stop_ids = _ids(conn, Stop, [
+        {"route_id": rid, "customer_id": customer_ids[(i * STOPS + s) % len(customer_ids)], "sequence": s}
+        for i, rid in enumerate(route_ids)
+        for s in range(STOPS)
+    ])
+    conn.execute(insert(StopOrderItem), [
+        {"stop_id": sid, "item_id": item_ids[(i + k) % len(item_ids)], "quantity": 1 + k}
+        for i, sid in enumerate(stop_ids)
+        for k in range(2)
+    ])
+    completion_ids = _ids(conn, StopCompletion, [
+        {"stop_id": sid, "completed_by_user_id": driver_ids[i % len(driver_ids)]}
+        for i, sid in enumerate(stop_ids[::2])
+    ])
+    conn.execute(insert(Photo), [
+        {"completion_id": cid, "file_path": f"qp/{cid}.jpg"} for cid in completion_ids[::3]
+    ])
+    for table in ("users", "customers", "items", "plans", "routes", "route_assignments",
+                  "stops", "stop_order_items", "stop_completions", "photos"):
+        conn.execute(text(f"ANALYZE {table}"))
+    return {
+        "plan_id": plan_ids[10],
+        "route_id": route_ids[25],
+        "stop_ids": stop_ids[500:520],
+        "customer_id": customer_ids[7],
+        "completion_id": completion_ids[42],
+        "driver_id": driver_ids[1],
+    }
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    try:
+        migrated = conn.execute(
+            text("SELECT 1 FROM pg_indexes WHERE indexname = 'ix_stops_route_id_sequence'")
+        ).first()
+        if not migrated:
+            pytest.skip("인덱스 마이그레이션(020)이 적용되지 않았습니다")
+        ids = _seed(conn)
+        yield conn, ids
+    finally:
+        trans.rollback()
+        conn.close()
+
+
+def _plan_index_names(conn, stmt) -> set[str]:
+    sql = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    names: set[str] = set()
+
+    def walk(node: dict) -> None:
+        if "Index Name" in node:
+            names.add(node["Index Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return names
+
+
+# (설명, 쿼리 생성 함수, 기대 인덱스) - 각각 API 엔드포인트의 조회 경로
+CASES = [
+    (
+        "list_stops_by_route",
+        lambda ids: select(Stop).where(Stop.route_id == ids["route_id"]).order_by(Stop.sequence, Stop.id),
+        "ix_stops_route_id_sequence",
+    ),
+    (
+        "list_routes_by_plan",
+        lambda ids: select(Route).where(Route.plan_id == ids["plan_id"]).order_by(Route.sequence, Route.id),
+        "ix_routes_plan_id_sequence",
+    ),
+    (
+        "stop_order_items",
+        lambda ids: select(StopOrderItem).where(StopOrderItem.stop_id.in_(ids["stop_ids"])),
+        "ix_stop_order_items_stop_id",
+    ),
+    (
+        "stop_completions",
+        lambda ids: select(StopCompletion).where(StopCompletion.stop_id == ids["stop_ids"][0]),
+        "uq_stop_completions_stop_id",
+    ),
+    (
+        "completion_photos",
+        lambda ids: select(Photo).where(Photo.completion_id == ids["completion_id"]),
+        "ix_photos_completion_id",
+    ),
+    (
+        "route_assignments_by_route",
+        lambda ids: select(RouteAssignment).where(RouteAssignment.route_id == ids["route_id"]),
+        "uq_route_assignments_route_id_driver_id",
+    ),
+    (
+        "driver_plans",
+        lambda ids: select(RouteAssignment.route_id).where(RouteAssignment.driver_id == ids["driver_id"]),
+        "ix_route_assignments_driver_id",
+    ),
+    (
+        "stops_by_customer",
+        lambda ids: select(Stop.id).where(Stop.customer_id == ids["customer_id"]),
+        "ix_stops_customer_id",
+    ),
+]
+
+
+@pytest.mark.parametrize("name,build,index", CASES, ids=[c[0] for c in CASES])
+def test_query_uses_index(seeded, name, build, index):
+    conn, ids = seeded
+    assert index in _plan_index_names(conn, build(ids))
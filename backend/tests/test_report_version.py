@@ -0,0 +1,57 @@
+"""리포트 캐시 버전 - 완료 외에 주문 품목/스탑이 바뀌어도 버전이 바뀜 (PostgreSQL 필요)"""
+from datetime import date
+
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import Customer, Item, Plan, Route, Stop, StopCompletion, StopOrderItem
+from app.services.report_data import month_range, monthly_version, statement_version
+
+START, END = month_range(2001, 3)
+
+
+@pytest.fixture
+def report_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn)
+    try:
+        customer_id = conn.execute(insert(Customer).returning(Customer.id), {"name": "rv_customer"}).scalar()
+        item_id = conn.execute(
+            insert(Item).returning(Item.id), {"code": "rv_item", "product": "rv", "unit": "박스", "unit_price": 1000}
+        ).scalar()
+        plan_id = conn.execute(insert(Plan).returning(Plan.id), {"plan_date": START, "name": "rv"}).scalar()
+        route_id = conn.execute(insert(Route).returning(Route.id), {"plan_id": plan_id, "name": "1호차"}).scalar()
+        stop_id = conn.execute(
+            insert(Stop).returning(Stop.id), {"route_id": route_id, "customer_id": customer_id, "sequence": 0}
+        ).scalar()
+        line_id = conn.execute(
+            insert(StopOrderItem).returning(StopOrderItem.id), {"stop_id": stop_id, "item_id": item_id, "quantity": 2}
+        ).scalar()
+        conn.execute(insert(StopCompletion), {"stop_id": stop_id})
+        yield db, conn, route_id, customer_id, line_id
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def _versions(db) -> tuple[str, str]:
+    return monthly_version(db, START, END), statement_version(db, START, END)
+
+
+def test_version_follows_order_lines_and_stops(report_db):
+    db, conn, route_id, customer_id, line_id = report_db
+    before = _versions(db)
+    assert _versions(db) == before
+    conn.execute(update(StopOrderItem).where(StopOrderItem.id == line_id).values(quantity=3))
+    after_quantity = _versions(db)
+    assert after_quantity[0] != before[0] and after_quantity[1] != before[1]
+    conn.execute(insert(Stop), {"route_id": route_id, "customer_id": customer_id, "sequence": 1})
+    assert monthly_version(db, START, END) != after_quantity[0]
@@ -0,0 +1,61 @@
+"""배송 순서 최적화 / 호차 분배 / 거리 행렬 캐시 - 무작위 좌표에서 순서 보존, 거리 감소, 증분 갱신 확인"""
+import random
+import time
+
+import numpy as np
+
+from app.services.distance_matrix import DistanceMatrix, HaversineMetric
+from app.services.route_optimizer import coordinate_distances, optimize_order
+
+DEPOT = (37.55, 127.0)
+
+
+def _points(n: int, seed: int = 7) -> list[tuple[int, float, float]]:
+    rng = random.Random(seed)
+    return [(i, 37.4 + rng.random() * 0.3, 126.8 + rng.random() * 0.4) for i in range(n)]
+
+
+def test_optimize_order_is_permutation_and_shorter():
+    points = _points(120)
+    t0 = time.perf_counter()
+    order, before, after = optimize_order(coordinate_distances(DEPOT, points), time_budget=0.5)
+    assert time.perf_counter() - t0 < 1.0
+    assert sorted(order) == list(range(1, len(points) + 1))
+    assert after < before * 0.5
+
+
+def test_optimize_order_small_and_start():
+    assert optimize_order(coordinate_distances(DEPOT, [])) == ([], 0.0, 0.0)
+    dist = coordinate_distances(DEPOT, _points(2) + [(99, 37.6, 126.9)])
+    order, _, after = optimize_order(dist, start=3)
+    assert sorted(order) == [1, 2] and after > 0
+
+
+def test_propose_partition_balances_loads():
+    from types import SimpleNamespace
+
+    from app.services.route_partition import PlanStop, propose_partition
+
+    routes = [SimpleNamespace(id=i, name=f"{i}호차", started_at=None) for i in (1, 2, 3)]
+    # 모두 1호차에 몰린 상태 + 1호차 배송완료 1곳 + 좌표 없는 1곳
+    stops = [PlanStop(i, 1, 100 + i, lat, lon, 10.0, i == 0) for i, lat, lon in _points(90)]
+    stops.append(PlanStop(999, 2, 999, None, None, 10.0, False))
+    result = propose_partition(DEPOT, routes, stops, capacity=350, time_budget=1.0)
+    by_route = {r["route_id"]: r for r in result["routes"]}
+    assert sorted(i for r in result["routes"] for i in r["stop_ids"]) == sorted(s.id for s in stops)
+    assert by_route[1]["stop_ids"][0] == 0 and by_route[2]["stop_ids"][-1] == 999
+    assert not any(r["over_capacity"] for r in result["routes"])
+    assert result["distance_after_m"] < result["distance_before_m"]
+
+
+def test_distance_matrix_incremental_update(tmp_path):
+    points = [(i + 1, lat, lon) for i, lat, lon in _points(300)]
+    cache = DistanceMatrix(tmp_path, HaversineMetric())
+    dist = cache.submatrix(DEPOT, points)
+    assert np.allclose(dist, coordinate_distances(DEPOT, points), atol=1.0)  # float32 저장
+
+    # 좌표가 바뀐 거래처만 다시 계산, 다른 워커(새 인스턴스)도 디스크에서 같은 값을 읽음
+    moved = [(1, 37.7, 127.1)] + points[1:]
+    assert cache.update({cid: (lat, lon) for cid, lat, lon in moved}) == 1
+    other = DistanceMatrix(tmp_path, HaversineMetric())
+    assert np.allclose(other.submatrix(DEPOT, moved), coordinate_distances(DEPOT, moved), atol=1.0)
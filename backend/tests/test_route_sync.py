@@ -0,0 +1,80 @@
+"""기사 앱 증분 동기화 - 트리거 기록(route_changes)으로 변경/삭제 전달 (PostgreSQL 필요)"""
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import AppSetting, Customer, Item, Plan, Route, Stop, StopCompletion, StopOrderItem
+from app.services.route_sync import PRUNED_KEY, route_changes_since
+
+
+@pytest.fixture
+def sync_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn)
+    try:
+        customer_id = conn.execute(insert(Customer).returning(Customer.id), {"name": "rs_customer"}).scalar()
+        item_id = conn.execute(insert(Item).returning(Item.id), {"code": "PRS0001", "product": "rs"}).scalar()
+        plan_id = conn.execute(insert(Plan).returning(Plan.id), {"plan_date": date(2001, 1, 2), "name": "rs"}).scalar()
+        routes = conn.execute(
+            insert(Route).returning(Route.id), [{"plan_id": plan_id, "name": f"{k}호차"} for k in (1, 2)]
+        ).scalars().all()
+        stops = conn.execute(
+            insert(Stop).returning(Stop.id),
+            [{"route_id": routes[0], "customer_id": customer_id, "sequence": s} for s in range(3)],
+        ).scalars().all()
+        order_item = conn.execute(
+            insert(StopOrderItem).returning(StopOrderItem.id), {"stop_id": stops[0], "item_id": item_id, "quantity": 2}
+        ).scalar()
+        yield db, conn, routes, stops, order_item
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def test_full_sync_without_token(sync_db):
+    db, _, routes, stops, order_item = sync_db
+    result = route_changes_since(db, routes[0], None)
+    assert result["full"]
+    assert [s.id for s in result["stops"]] == stops
+    assert [oi.id for oi in result["order_items"]] == [order_item]
+
+
+def test_moved_and_deleted_stops(sync_db):
+    # 같은 트랜잭션 안이라 토큰(xmin) = 현재 트랜잭션 → 이 트랜잭션의 변경은 모두 토큰 이후
+    db, conn, routes, stops, order_item = sync_db
+    token = route_changes_since(db, routes[0], None)["token"]
+    conn.execute(update(Stop).where(Stop.id == stops[0]).values(route_id=routes[1]))
+    conn.execute(delete(Stop).where(Stop.id == stops[1]))
+    completion = conn.execute(insert(StopCompletion).returning(StopCompletion.id), {"stop_id": stops[2]}).scalar()
+
+    old = route_changes_since(db, routes[0], token)
+    assert not old["full"]
+    assert [s.id for s in old["stops"]] == [stops[2]]
+    assert old["deleted"]["stops"] == sorted(stops[:2])
+    assert old["deleted"]["order_items"] == [order_item]
+    assert [c.id for c in old["completions"]] == [completion]
+
+    new = route_changes_since(db, routes[1], token)
+    assert [s.id for s in new["stops"]] == [stops[0]]
+    assert [oi.id for oi in new["order_items"]] == [order_item]
+
+
+def test_token_older_than_pruned_log_is_full(sync_db):
+    db, conn, routes, _, _ = sync_db
+    token = route_changes_since(db, routes[0], None)["token"]
+    conn.execute(
+        pg_insert(AppSetting)
+        .values(key=PRUNED_KEY, value=str(token))
+        .on_conflict_do_update(index_elements=["key"], set_={"value": str(token)})
+    )
+    assert route_changes_since(db, routes[0], token)["full"]
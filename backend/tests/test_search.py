@@ -0,0 +1,67 @@
+"""거래처 검색 - 검색어 와일드카드는 문자 그대로, pg_trgm이 없으면 rapidfuzz 폴백 (PostgreSQL 필요)"""
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import Customer
+from app.services import search as search_service
+from app.services.search import CUSTOMER_TARGET, has_pg_trgm, like_escape, search
+
+
+@pytest.fixture
+def search_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn, join_transaction_mode="create_savepoint")
+    try:
+        yield db, conn
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def _names(hits) -> list[str]:
+    return [h["name"] for h in hits]
+
+
+def test_like_escape():
+    assert like_escape("50%_a\\b") == "50\\%\\_a\\\\b"
+
+
+def test_trgm_wildcards_match_literally(search_db, monkeypatch):
+    db, conn = search_db
+    monkeypatch.setattr(search_service, "_trgm_available", None)
+    if not has_pg_trgm(db):
+        pytest.skip("pg_trgm 확장이 없습니다")
+    conn.execute(insert(Customer), [{"name": "qa_b 마트"}, {"name": "qaxb 마트"}])
+    hits, engine_name = search(db, CUSTOMER_TARGET, "qa_b", 50)
+    assert engine_name == "pg_trgm"
+    assert "qa_b 마트" in _names(hits) and "qaxb 마트" not in _names(hits)
+
+
+def test_fallback_ranking_without_trgm(search_db, monkeypatch):
+    db, conn = search_db
+    monkeypatch.setattr(search_service, "_trgm_available", False)
+    # 다른 테스트/요청의 인메모리 인덱스와 섞이지 않도록 새 인덱스
+    monkeypatch.setattr(search_service, "_fuzzy_indexes", {Customer: search_service._FuzzyIndex(CUSTOMER_TARGET)})
+    conn.execute(insert(Customer), [
+        {"name": "서울 폴백상회"},
+        {"name": "폴백상회 본점"},
+        {"name": "무관한 가게"},
+    ])
+    hits, engine_name = search(db, CUSTOMER_TARGET, "폴백상회", 10)
+    assert engine_name == "rapidfuzz"
+    names = _names(hits)
+    # 상호가 검색어로 시작하는 거래처 우선, 일치 구간 표시
+    assert names[:2] == ["폴백상회 본점", "서울 폴백상회"] and "무관한 가게" not in names
+    assert hits[0]["highlights"]["name"] == [[0, 4]]
+
+    # 테이블이 바뀌면(행 수) 인덱스를 다시 적재
+    conn.execute(insert(Customer), {"name": "폴백상회 2호점"})
+    assert "폴백상회 2호점" in _names(search(db, CUSTOMER_TARGET, "폴백상회", 10)[0])
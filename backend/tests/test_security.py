@@ -0,0 +1,47 @@
+"""비밀번호 프로세스 풀 / IP별 로그인 동시 처리 제한"""
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.config import get_settings
+from app.core import login_limit
+from app.core.security import hash_password_pooled, shutdown_password_pool, verify_password_pooled
+
+
+def test_password_pool_roundtrip():
+    try:
+        hashed = hash_password_pooled("secret-pw")
+        assert [verify_password_pooled("secret-pw", hashed), verify_password_pooled("x", hashed)] == [True, False]
+    finally:
+        shutdown_password_pool()
+
+
+def _request(ip: str) -> Request:
+    return Request({"type": "http", "client": (ip, 1234), "headers": []})
+
+
+def test_login_slot_limits_per_ip(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "login_concurrency_per_ip", 1)
+    monkeypatch.setattr(settings, "login_wait_seconds", 0.05)
+    entered = threading.Event()
+
+    def hold():
+        with login_limit.login_slot(_request("10.0.0.1")):
+            entered.set()
+            time.sleep(0.2)
+
+    first = threading.Thread(target=hold)
+    first.start()
+    entered.wait()
+    with pytest.raises(HTTPException) as exc:
+        with login_limit.login_slot(_request("10.0.0.1")):  # 같은 IP는 대기 한도 초과 → 429
+            pass
+    with login_limit.login_slot(_request("10.0.0.2")):  # 다른 IP는 영향 없음
+        pass
+    first.join()
+    assert exc.value.status_code == 429
+    assert login_limit._slots == {}
@@ -0,0 +1,75 @@
+"""스탑 순서 변경 - 전체 순서는 UPDATE 1회, 이동은 사이 구간만 변경 (PostgreSQL 필요)"""
+from datetime import date
+
+import pytest
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import engine
+from app.models import Customer, Plan, Route, Stop
+from app.services.stop_order import move_stop, route_stop_ids, set_stop_order
+
+
+@pytest.fixture
+def route_db():
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("PostgreSQL에 연결할 수 없습니다")
+    trans = conn.begin()
+    db = Session(bind=conn)
+    try:
+        customer_id = conn.execute(insert(Customer).returning(Customer.id), {"name": "so_customer"}).scalar()
+        plan_id = conn.execute(insert(Plan).returning(Plan.id), {"plan_date": date(2001, 1, 1), "name": "so"}).scalar()
+        route_id = conn.execute(insert(Route).returning(Route.id), {"plan_id": plan_id, "name": "1호차"}).scalar()
+        conn.execute(insert(Stop), [
+            {"route_id": route_id, "customer_id": customer_id, "sequence": s} for s in range(10)
+        ])
+        yield db, conn, route_id
+    finally:
+        db.close()
+        trans.rollback()
+        conn.close()
+
+
+def _statements(conn) -> list[str]:
+    seen: list[str] = []
+    event.listen(conn, "before_cursor_execute", lambda *args: seen.append(args[2]))
+    return seen
+
+
+def _order(db, route_id) -> list[int]:
+    return [sid for sid, _ in route_stop_ids(db, route_id)]
+
+
+def test_set_stop_order_single_update(route_db):
+    db, conn, route_id = route_db
+    ids = _order(db, route_id)
+    seen = _statements(conn)
+    set_stop_order(db, [(sid, route_id, seq) for seq, sid in enumerate(reversed(ids))])
+    assert len(seen) == 1 and seen[0].lstrip().upper().startswith("UPDATE")
+    assert _order(db, route_id) == list(reversed(ids))
+
+
+def test_move_stop_touches_range_only(route_db):
+    db, conn, route_id = route_db
+    ids = _order(db, route_id)
+    seen = _statements(conn)
+    assert move_stop(db, route_id, ids[7], 2) == 2
+    assert len(seen) == 2  # 잠금 조회 + 구간 UPDATE
+    expected = ids[:2] + [ids[7]] + ids[2:7] + ids[8:]
+    assert _order(db, route_id) == expected
+    sequences = dict(db.execute(select(Stop.id, Stop.sequence).where(Stop.route_id == route_id)).tuples().all())
+    assert [sequences[sid] for sid in expected] == list(range(10))
+
+
+def test_move_stop_missing_from_locked_route(route_db):
+    db, conn, route_id = route_db
+    ids = _order(db, route_id)
+    # 엔드포인트가 읽은 뒤 다른 루트로 옮겨진 경우 - 잠근 목록에 없으면 변경 없이 None
+    plan_id = conn.execute(select(Route.plan_id).where(Route.id == route_id)).scalar()
+    other_id = conn.execute(insert(Route).returning(Route.id), {"plan_id": plan_id, "name": "2호차"}).scalar()
+    set_stop_order(db, [(ids[3], other_id, 0)])
+    assert move_stop(db, route_id, ids[3], 0) is None
+    assert _order(db, route_id) == ids[:3] + ids[4:]
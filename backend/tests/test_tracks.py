@@ -0,0 +1,42 @@
+"""GPS 경로 단순화/인코딩 (DB 불필요)"""
+import math
+
+import numpy as np
+
+from app.services.tracks import KEEP_EVERY_SECONDS, _keep_time_gaps, decode_points, encode_points, simplify
+
+
+def test_simplify_keeps_corners_only():
+    # 직선 100점 → 직각으로 꺾여 직선 100점: 양 끝과 꺾인 점만 남음
+    lat = np.concatenate([37.5 + np.arange(100) * 1e-4, np.full(100, 37.5 + 99e-4)])
+    lon = np.concatenate([np.full(100, 127.0), 127.0 + np.arange(1, 101) * 1e-4])
+    keep = simplify(lat, lon, tolerance_m=5.0)
+    assert list(np.flatnonzero(keep)) == [0, 99, 199]
+
+
+def test_simplify_keeps_points_beyond_tolerance():
+    t = np.linspace(0, math.pi, 200)
+    lat = 37.5 + 0.01 * np.sin(t)  # 약 1.1km 높이의 호
+    lon = 127.0 + 0.02 * t / math.pi
+    keep = simplify(lat, lon, tolerance_m=5.0)
+    assert 3 < keep.sum() < 60
+
+
+def test_time_gaps_keep_dwell():
+    ts = np.arange(0, 600, 10)
+    keep = np.zeros(len(ts), dtype=bool)
+    keep[0] = keep[-1] = True
+    kept = ts[_keep_time_gaps(ts, keep)]
+    assert np.all(np.diff(kept) <= KEEP_EVERY_SECONDS)
+
+
+def test_encode_decode_round_trip():
+    ts = np.array([1_700_000_000, 1_700_000_005, 1_700_000_030])
+    lat = np.array([37.5012345, 37.5013, 37.4999999])
+    lon = np.array([127.0001, 127.0002, 126.9999995])
+    acc = np.array([5.0, -1, 12.4])
+    points = decode_points(encode_points(ts, lat, lon, acc))
+    assert [int(p.recorded_at.timestamp()) for p in points] == list(ts)
+    assert np.allclose([p.latitude for p in points], lat, atol=1e-6)
+    assert np.allclose([p.longitude for p in points], lon, atol=1e-6)
+    assert [p.accuracy for p in points] == [5.0, None, 12.0]
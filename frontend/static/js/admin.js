@@ -115,6 +115,87 @@ async function loadPlans() {
   bindPlanSortHandlers();
   renderPlans();
   updatePlanSortIcons();
+  watchTodayEvents();
+}
+
+// 실시간 배송 현황 (SSE) - 플랜 목록은 오늘 스트림, 플랜 상세는 해당 플랜 스트림. 재연결/resync 시 전체 재조회
+const LIVE_EVENT_TYPES = ['route_started', 'stop_completed', 'assignment_changed', 'position'];
+let todayEvents = null;
+let planEvents = null;
+
+function openEventStream(path, onEvent, onResync) {
+  const es = new EventSource(API_BASE + path, { withCredentials: true });
+  let opened = false;
+  es.onopen = () => {
+    if (opened) onResync();
+    opened = true;
+  };
+  LIVE_EVENT_TYPES.forEach(t => es.addEventListener(t, (e) => onEvent(JSON.parse(e.data))));
+  es.addEventListener('resync', onResync);
+  return es;
+}
+
+function replaceRouteStatus(summary, label, status) {
+  const parts = (summary || '').split(', ');
+  const idx = parts.findIndex(x => x.startsWith(label + ': '));
+  if (idx < 0) return summary;
+  parts[idx] = `${label}: ${status}`;
+  return parts.join(', ');
+}
+
+function watchTodayEvents() {
+  if (todayEvents) return;
+  todayEvents = openEventStream('/events/today', (ev) => {
+    const p = plansData.find(x => x.id === ev.plan_id);
+    if (!p) return;
+    p.delivery_status = replaceRouteStatus(p.delivery_status, ev.route_label, ev.delivery_status);
+    renderPlans();
+  }, () => loadPlans());
+}
+
+function planStatusClass(statusText) {
+  return statusText === '배송완료' ? 'plan-status-done' : statusText.startsWith('배송중') ? 'plan-status-progress' : 'plan-status-pending';
+}
+
+function watchPlanEvents(planId) {
+  if (planEvents?.planId === planId) return;
+  planEvents?.close();
+  planEvents = openEventStream(`/events/plan/${planId}`, (ev) => {
+    if (ev.type === 'assignment_changed') {
+      openPlan(planId);
+      return;
+    }
+    if (ev.type === 'position') {
+      const el = document.querySelector(`#planDetail [data-route-id="${ev.route_id}"] .route-position`);
+      if (el) el.innerHTML = routePositionHtml(ev);
+      return;
+    }
+    const eta = document.querySelector(`#planDetail [data-route-id="${ev.route_id}"] .route-eta`);
+    if (eta) eta.textContent = routeEtaText(ev);
+    const badge = document.querySelector(`#planDetail [data-route-id="${ev.route_id}"] .plan-status-badge`);
+    if (!badge) return;
+    badge.textContent = ev.delivery_status;
+    badge.className = `plan-status-badge ${planStatusClass(ev.delivery_status)}`;
+  }, () => openPlan(planId));
+  planEvents.planId = planId;
+}
+
+function routeEtaText(r) {
+  const fmt = (iso) => new Date(iso).toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
+  return r.next_eta ? `다음 도착 예상 ${fmt(r.next_eta)} · 종료 예상 ${fmt(r.finish_eta)}` : '';
+}
+
+function routePositionHtml(pos) {
+  if (!pos) return '';
+  const time = new Date(pos.recorded_at).toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
+  return `최근 위치: <a href="https://map.kakao.com/link/map/${pos.latitude},${pos.longitude}" target="_blank">${time}</a>`;
+}
+
+function closePlanDetail() {
+  planEvents?.close();
+  planEvents = null;
+  document.getElementById('planDetail').style.display = 'none';
+  loadPlans();
 }
 
 let newPlanFormData = null;
@@ -220,9 +301,10 @@ async function deletePlan(planId) {
 }
 
 async function openPlan(planId) {
-  const [detail, users] = await Promise.all([
+  const [detail, users, positions] = await Promise.all([
     api.plans.getPlanDetail(planId),
     api.users.list(),
+    api.tracks.latest(planId).catch(() => []),
   ]);
   const { plan, routes, previous_day_drivers } = detail;
   const drivers = users.filter(u => u.role === 'DRIVER');
@@ -241,20 +323,23 @@ async function openPlan(planId) {
       const defaultId = (currentDriver?.driver_id) || (prevDriver?.driver_id) || null;
       const driverName = getDriverName(defaultId);
       const statusText = r.delivery_status || '배송전';
-      const statusClass = statusText === '배송완료' ? 'plan-status-done' : statusText.startsWith('배송중') ? 'plan-status-progress' : 'plan-status-pending';
+      const statusClass = planStatusClass(statusText);
       return `
-      <div class="card">
+      <div class="card" data-route-id="${r.id}">
         <h3>${r.name} <span class="plan-status-badge ${statusClass}">${statusText}</span></h3>
         <p class="driver-assign-row"><span class="driver-assign-label">기사 배정:</span> <span class="driver-assign-name">${driverName}</span> <button type="button" class="btn btn-secondary btn-sm" onclick="showDriverAssignModal(${r.id}, ${planId}, '${(r.name || '').replace(/'/g, "\\'")}', ${defaultId || 'null'})">기사 변경</button></p>
-        <p><a href="#" onclick="event.preventDefault();openRoute(${r.id}, ${planId})">스탑 목록</a></p>
+        <p class="route-eta">${routeEtaText(r)}</p>
+        <p class="route-position">${routePositionHtml(positions.find(p => p.route_id === r.id))}</p>
+        <p><a href="#" onclick="event.preventDefault();openRoute(${r.id}, ${planId})">스탑 목록</a> · <a href="/receipt.html?route_id=${r.id}" target="_blank">거래명세표 일괄 인쇄</a></p>
       </div>
     `}).join('')}
-    <p><button class="btn btn-secondary" onclick="openPlan(${planId})">새로고침</button> <button class="btn btn-secondary" onclick="document.getElementById('planDetail').style.display='none'; loadPlans();">닫기</button></p>
+    <p><button class="btn btn-secondary" onclick="openPlan(${planId})">새로고침</button> <a class="btn btn-secondary" href="/receipt.html?plan_id=${planId}" target="_blank">거래명세표 전체 인쇄</a> <button class="btn btn-secondary" onclick="partitionPlan(${planId})">호차 분배 최적화</button> <button class="btn btn-secondary" onclick="closePlanDetail()">닫기</button></p>
   `;
   document.getElementById('planDetail').innerHTML = html;
   document.getElementById('planDetail').dataset.planId = planId;
   document.getElementById('planDetail').style.display = 'block';
   window._planDrivers = drivers;
+  watchPlanEvents(planId);
 }
 
 function showDriverAssignModal(routeId, planId, routeName, currentDriverId) {
@@ -370,7 +455,7 @@ async function openRoute(routeId, planId) {
     `}).join('')}
     </tbody></table>
     <p><small style="color:var(--muted)">드래그하여 순서 변경</small></p>
-    <p><button class="btn btn-secondary" onclick="openRoute(${routeId}, ${planId})">새로고침</button> <button class="btn btn-secondary" onclick="openPlan(${planId})">뒤로</button></p>
+    <p><button class="btn btn-secondary" onclick="openRoute(${routeId}, ${planId})">새로고침</button> <button class="btn btn-secondary" onclick="optimizeRoute(${routeId}, ${planId})">순서 최적화</button> <a class="btn btn-secondary" href="/receipt.html?route_id=${routeId}" target="_blank">거래명세표 일괄 인쇄</a> <button class="btn btn-secondary" onclick="openPlan(${planId})">뒤로</button></p>
   `;
   document.getElementById('planDetail').innerHTML = html;
   bindStopRowDragDrop(routeId, planId);
@@ -520,11 +605,8 @@ function bindStopRowDragDrop(routeId, planId) {
       const targetIdx = rows.indexOf(tr);
       const sourceIdx = rows.indexOf(draggedEl);
       if (targetIdx < 0 || sourceIdx < 0) return;
-      const stopIds = rows.map(r => parseInt(r.dataset.stopId));
-      const [moved] = stopIds.splice(sourceIdx, 1);
-      stopIds.splice(targetIdx, 0, moved);
       try {
-        await api.stops.reorder(routeId, stopIds);
+        await api.stops.move(parseInt(draggedEl.dataset.stopId), targetIdx);
         openRoute(routeId, planId);
       } catch (err) {
         alert(err?.detail || err?.message || '순서 변경 실패');
@@ -533,13 +615,67 @@ function bindStopRowDragDrop(routeId, planId) {
   });
 }
 
-function addStop(routeId, planId) {
-  api.customers.list().then(customers => {
-    const c = prompt('거래처 ID 입력 (목록: ' + customers.slice(0,5).map(x => x.id + ':' + x.name).join(', ') + '...)');
-    if (!c) return;
-    const customerId = parseInt(c);
-    api.stops.create(routeId, { customer_id: customerId, sequence: 0, order_items: [] }).then(() => openRoute(routeId, planId));
-  });
+async function partitionPlan(planId) {
+  const cap = prompt('호차당 적재 용량 (수량 x 품목 무게, 비우면 균형만 맞춤)', '');
+  if (cap === null) return;
+  try {
+    const body = cap.trim() ? { capacity: parseFloat(cap) } : {};
+    const r = await api.routes.proposePartition(planId, body);
+    if (!r.routes.length) {
+      alert('분배할 수 있는 루트가 없습니다 (이미 출발한 루트는 제외)');
+      return;
+    }
+    const km = (m) => (m / 1000).toFixed(1);
+    const lines = r.routes.map(x =>
+      `${x.route_name}: ${x.stop_ids.length}곳, 적재 ${x.load_before} → ${x.load}${x.over_capacity ? ' (용량 초과)' : ''}, ${km(x.distance_before_m)}km → ${km(x.distance_m)}km`
+    );
+    const msg = `총 이동거리 ${km(r.distance_before_m)}km → ${km(r.distance_after_m)}km (직선거리 기준)\n` + lines.join('\n');
+    if (!confirm(msg + '\n\n이 분배로 변경할까요?')) return;
+    await api.routes.applyPartition(planId, r.routes.map(x => ({ route_id: x.route_id, stop_ids: x.stop_ids })));
+    openPlan(planId);
+  } catch (e) {
+    alert(e?.detail || e?.message || '호차 분배 실패');
+  }
+}
+
+async function optimizeRoute(routeId, planId) {
+  try {
+    const r = await api.stops.optimize(routeId);
+    const km = (m) => (m / 1000).toFixed(1);
+    let msg = `예상 이동거리 ${km(r.distance_before_m)}km → ${km(r.distance_after_m)}km (직선거리 기준)`;
+    if (r.unlocated_stop_ids.length) msg += `\n좌표 없는 스탑 ${r.unlocated_stop_ids.length}곳은 맨 뒤로 보냅니다.`;
+    if (!confirm(msg + '\n이 순서로 변경할까요?')) return;
+    await api.stops.reorder(routeId, r.stop_ids);
+    openRoute(routeId, planId);
+  } catch (e) {
+    alert(e?.detail || e?.message || '순서 최적화 실패');
+  }
+}
+
+async function addStop(routeId, planId) {
+  const q = prompt('거래처 검색 (상호, 코드, 주소, 대표)');
+  if (!q || !q.trim()) return;
+  try {
+    const { customers } = await api.search(q.trim(), 'customer', 10);
+    if (!customers.length) {
+      alert('검색 결과가 없습니다');
+      return;
+    }
+    let customer = customers[0];
+    if (customers.length > 1) {
+      const pick = prompt(
+        '번호 선택:\n' + customers.map((c, i) => `${i + 1}. ${c.name} (${c.code || '-'}) ${c.address || ''}`).join('\n'),
+        '1'
+      );
+      if (!pick) return;
+      customer = customers[parseInt(pick) - 1];
+      if (!customer) return;
+    }
+    await api.stops.create(routeId, { customer_id: customer.id, sequence: 0, order_items: [] });
+    openRoute(routeId, planId);
+  } catch (e) {
+    alert(e?.detail || e?.message || '스탑 추가 실패');
+  }
 }
 
 async function deleteAllCustomers() {
@@ -608,6 +744,10 @@ async function importCustomersExcel(ev) {
 let customerSortCol = 'name';
 let customerSortAsc = true;
 let customersData = [];
+let customerNextCursor = null;
+// 서버에서 정렬 가능한 컬럼 (나머지는 불러온 행 안에서 정렬)
+const CUSTOMER_SERVER_SORT = ['name', 'code', 'route', 'arrears'];
+const CUSTOMER_LIST_FIELDS = 'code,route,name,business_registration_number,representative_name,contract,business_type,business_category,arrears,contract_content,address,latitude,longitude';
 let contractContentItemsData = [];
 let contractContentItemsList = [];
 
@@ -617,6 +757,10 @@ function bindCustomerSortHandlers() {
       const col = th.dataset.sort;
       if (customerSortCol === col) customerSortAsc = !customerSortAsc;
       else { customerSortCol = col; customerSortAsc = true; }
+      if (CUSTOMER_SERVER_SORT.includes(col)) {
+        fetchCustomerPage();
+        return;
+      }
       renderCustomers();
       updateCustomerSortIcons();
     };
@@ -624,24 +768,42 @@ function bindCustomerSortHandlers() {
 }
 
 let customerSearchTerm = '';
+let _customerSearchTimer = null;
 
 function bindCustomerSearch() {
   const inp = document.getElementById('customerSearchInput');
   if (!inp) return;
   inp.oninput = () => {
-    customerSearchTerm = inp.value.trim().toLowerCase();
-    renderCustomers();
+    customerSearchTerm = inp.value.trim();
+    clearTimeout(_customerSearchTimer);
+    _customerSearchTimer = setTimeout(() => fetchCustomerPage(), 250);
   };
 }
 
 async function loadCustomers() {
-  customersData = await api.customers.list();
   const inp = document.getElementById('customerSearchInput');
   if (inp) inp.value = '';
   customerSearchTerm = '';
+  await fetchCustomerPage();
+  bindCustomerSortHandlers();
+}
+
+/** 서버 페이지 조회 (검색/정렬은 서버에서, append=true면 다음 페이지 이어붙임) */
+async function fetchCustomerPage(append = false) {
+  const params = { limit: 100, fields: CUSTOMER_LIST_FIELDS };
+  if (customerSearchTerm) params.q = customerSearchTerm;
+  if (CUSTOMER_SERVER_SORT.includes(customerSortCol)) {
+    params.sort = customerSortCol;
+    params.order = customerSortAsc ? 'asc' : 'desc';
+  }
+  if (append && customerNextCursor) params.cursor = customerNextCursor;
+  const page = await api.customers.page(params);
+  customersData = append ? customersData.concat(page.items) : page.items;
+  customerNextCursor = page.next_cursor;
+  const more = document.getElementById('customerMore');
+  if (more) more.style.display = customerNextCursor ? '' : 'none';
   renderCustomers();
   updateCustomerSortIcons();
-  bindCustomerSortHandlers();
 }
 
 let arrearsSortCol = 'arrears';
@@ -712,9 +874,12 @@ function renderArrears() {
 }
 
 async function fullRepayment(customerId) {
-  if (!confirm('미수금액을 0원으로 초기화하시겠습니까?')) return;
+  const c = arrearsData.find(x => x.id === customerId);
+  const amt = c ? Number(c.arrears) || 0 : 0;
+  if (amt <= 0) return;
+  if (!confirm(`미수금 ${amt.toLocaleString('ko-KR')}원을 전액 변제 처리하시겠습니까?`)) return;
   try {
-    await api.customers.update(customerId, { arrears: 0 });
+    await api.customers.pay(customerId, amt, '전액변제');
     loadArrears();
     loadCustomers();
   } catch (e) {
@@ -725,7 +890,7 @@ async function fullRepayment(customerId) {
 async function doFullRepaymentFromModal() {
   if (!_partialRepayCustomerId) return;
   try {
-    await api.customers.update(_partialRepayCustomerId, { arrears: 0 });
+    await api.customers.pay(_partialRepayCustomerId, _partialRepayCurrentArrears, '전액변제');
     closePartialRepayModal();
     loadArrears();
     loadCustomers();
@@ -768,9 +933,8 @@ async function submitPartialRepay() {
     alert(`변제 금액은 미수금액(${_partialRepayCurrentArrears.toLocaleString('ko-KR')}원)을 초과할 수 없습니다.`);
     return;
   }
-  const newArrears = _partialRepayCurrentArrears - amount;
   try {
-    await api.customers.update(_partialRepayCustomerId, { arrears: newArrears });
+    await api.customers.pay(_partialRepayCustomerId, amount, '부분변제');
     closePartialRepayModal();
     loadArrears();
     loadCustomers();
@@ -810,16 +974,10 @@ function updateCustomerSortIcons() {
 
 function renderCustomers() {
   const numCols = ['latitude', 'longitude', 'arrears'];
-  let list = customersData;
-  if (customerSearchTerm) {
-    const q = customerSearchTerm;
-    list = list.filter(c => {
-      const s = [
-        c.code, c.name, c.route, c.address, c.representative_name,
-        c.business_registration_number, c.contract_content, c.business_type, c.business_category
-      ].filter(Boolean).join(' ').toLowerCase();
-      return s.includes(q);
-    });
+  const list = customersData;
+  if (CUSTOMER_SERVER_SORT.includes(customerSortCol)) {
+    renderCustomerRows(list);
+    return;
   }
   const sorted = [...list].sort((a, b) => {
     const av = a[customerSortCol];
@@ -834,6 +992,10 @@ function renderCustomers() {
     }
     return customerSortAsc ? cmp : -cmp;
   });
+  renderCustomerRows(sorted);
+}
+
+function renderCustomerRows(sorted) {
   document.getElementById('customersList').innerHTML = sorted.map(c => {
     const amt = (c.arrears != null && c.arrears !== '' ? Number(c.arrears) : 0);
     return `
@@ -1768,10 +1930,35 @@ if (userFormEl) userFormEl.onsubmit = async (e) => {
   }
 };
 
-function downloadReport() {
+function downloadReportExport(kind, format) {
+  const y = document.getElementById('reportYear').value;
+  const m = document.getElementById('reportMonth').value;
+  location.href = `/api/reports/monthly/${kind}?` + new URLSearchParams({ year: y, month: m, format });
+}
+
+const REPORT_PHASES = { query: '조회 중', rows: '내역 작성 중', render: 'PDF 렌더링 중' };
+
+async function downloadReport(type = 'monthly') {
   const y = document.getElementById('reportYear').value;
   const m = document.getElementById('reportMonth').value;
-  window.open('/api/reports/monthly/pdf?year=' + y + '&month=' + m, '_blank');
+  const statusEl = document.getElementById('reportStatus');
+  try {
+    let job = await api.reports.startMonthly(y, m, type);
+    while (job.status === 'queued' || job.status === 'running') {
+      const p = job.progress;
+      statusEl.textContent = p
+        ? `${REPORT_PHASES[p.phase] || p.phase}${p.total ? ` (${p.done}/${p.total})` : ''}`
+        : '대기 중';
+      await new Promise(r => setTimeout(r, 1000));
+      job = await api.reports.job(job.job_id);
+    }
+    if (job.status === 'failed') throw { detail: job.error };
+    statusEl.textContent = '';
+    location.href = job.download_url;
+  } catch (e) {
+    statusEl.textContent = '';
+    alert('리포트 생성 실패: ' + (e.detail || e.message || e));
+  }
 }
 
 let addressCheckTimeout = null;
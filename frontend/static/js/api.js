@@ -77,9 +77,11 @@ const api = {
   },
   customers: {
     list: () => fetchApi('/customers'),
+    page: (params) => fetchApi('/customers/page?' + new URLSearchParams(params)),
     create: (d) => fetchApi('/customers', { method: 'POST', body: JSON.stringify(d) }),
     update: (id, d) => fetchApi(`/customers/${id}`, { method: 'PATCH', body: JSON.stringify(d) }),
     delete: (id) => fetch(API_BASE + `/customers/${id}`, { method: 'DELETE', credentials: 'include' }),
+    pay: (id, amount, memo) => fetchApi(`/customers/${id}/arrears/payments`, { method: 'POST', body: JSON.stringify({ amount, memo }) }),
   },
   items: {
     list: () => fetchApi('/items'),
@@ -107,6 +109,8 @@ const api = {
   },
   routes: {
     listByPlan: (planId) => fetchApi(`/routes/plan/${planId}`),
+    proposePartition: (planId, d) => fetchApi(`/routes/plan/${planId}/partition`, { method: 'POST', body: JSON.stringify(d) }),
+    applyPartition: (planId, routes) => fetchApi(`/routes/plan/${planId}/partition`, { method: 'PUT', body: JSON.stringify({ routes }) }),
     get: (routeId) => fetchApi(`/routes/${routeId}`),
     start: (routeId) => fetch(API_BASE + `/routes/${routeId}/start`, {
       method: 'POST',
@@ -130,6 +134,8 @@ const api = {
   },
   stops: {
     listByRoute: (routeId) => fetchApi(`/stops/route/${routeId}`),
+    compactByRoute: (routeId, fields) => fetchApi(`/stops/route/${routeId}/compact` + (fields ? `?fields=${encodeURIComponent(fields)}` : '')),
+    syncByRoute: (routeId, since) => fetchApi(`/stops/route/${routeId}/sync` + (since ? `?since=${encodeURIComponent(since)}` : '')),
     getReceipt: (stopId) => fetchApi(`/stops/${stopId}/receipt`),
     create: (routeId, d) => fetchApi(`/stops/route/${routeId}`, { method: 'POST', body: JSON.stringify(d) }),
     reorder: (routeId, stopIds) => fetch(API_BASE + `/stops/route/${routeId}/reorder`, {
@@ -137,28 +143,49 @@ const api = {
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({ stop_ids: stopIds }),
     }).then(r => { if (!r.ok) return r.json().then(d => { throw { detail: d.detail || r.statusText }; }); }),
+    move: (stopId, position) => fetchApi(`/stops/${stopId}/move`, { method: 'POST', body: JSON.stringify({ position }) }),
+    optimize: (routeId, apply = false) => fetchApi(`/stops/route/${routeId}/optimize`, {
+      method: 'POST', body: JSON.stringify({ apply }),
+    }),
   },
   completions: {
-    complete: (stopId, memo) => {
+    complete: (stopId, memo, idempotencyKey = null) => {
       const fd = new FormData();
       fd.append('memo', memo ?? '');
       return fetch(API_BASE + `/completions/stop/${stopId}`, {
         method: 'POST', credentials: 'include', body: fd,
+        headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
       }).then(async (r) => {
         const text = await r.text();
         const data = text ? (() => { try { return JSON.parse(text); } catch { return {}; } })() : {};
-        if (!r.ok) throw { detail: data?.detail || r.statusText };
+        if (!r.ok) throw { status: r.status, detail: data?.detail || r.statusText };
         return data;
       });
     },
-    uploadPhotos: (stopId, files) => {
+    uploadPhotos: (stopId, files, idempotencyKey = null) => {
       const fd = new FormData();
       for (const f of files) fd.append('files', f);
       return fetch(API_BASE + `/completions/stop/${stopId}/photos`, {
         method: 'POST', credentials: 'include', body: fd,
-      }).then(r => r.json());
+        headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
+      }).then(async (r) => {
+        const data = await r.json().catch(() => ({}));
+        if (!r.ok) throw { status: r.status, detail: data.detail || r.statusText };
+        return data;
+      });
     },
+    replay: (items) => fetchApi('/completions/replay', { method: 'POST', body: JSON.stringify({ items }) }),
+  },
+  tracks: {
+    send: (routeId, points) => fetchApi(`/tracks/route/${routeId}`, { method: 'POST', body: JSON.stringify({ points }) }),
+    latest: (planId) => fetchApi(`/tracks/latest?plan_id=${planId}`),
+  },
+  reports: {
+    startMonthly: (year, month, type = 'monthly') =>
+      fetchApi('/reports/monthly?' + new URLSearchParams({ year, month, type }), { method: 'POST' }),
+    job: (jobId) => fetchApi(`/reports/jobs/${jobId}`),
   },
+  search: (q, type = 'all', limit = 10) => fetchApi('/search?' + new URLSearchParams({ q, type, limit })),
   settings: {
     get: () => fetchApi('/settings'),
     getCompanyLocation: () => fetchApi('/settings/company-location'),
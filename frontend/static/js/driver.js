@@ -25,6 +25,7 @@ let currentUser = null;
   }
   bindDriverTabs();
   loadPlans();
+  syncOutbox();
 })();
 
 function bindDriverTabs() {
@@ -65,7 +66,9 @@ function loadMyInfo() {
 }
 
 async function doLogout() {
+  await stopTracking();
   await api.logout();
+  await clearOfflineCaches();
   location.href = '/';
 }
 
@@ -134,6 +137,11 @@ async function startRouteAndShow(route, planId, title) {
   try {
     await api.routes.start(route.id);
   } catch (e) {
+    if (isNetworkError(e)) {
+      // 오프라인 - 저장된 루트로 진행 (출발 시각은 다음 시작 때 기록)
+      await showRoute(route, planId, title);
+      return;
+    }
     alert(e?.detail || e?.message || '배송 시작 처리 실패');
     return;
   }
@@ -151,8 +159,58 @@ async function showRoute(route, planId, title) {
   await loadStops(route.id, planId);
   document.getElementById('plansSection').style.display = 'none';
   document.getElementById('routeSection').style.display = 'block';
+  startTracking(route.id);
 }
 
+// 배송 중 위치 기록 - 모아 두었다가 주기적으로 한 번에 전송 (실패하면 다음 전송에 포함, 서버가 중복 점은 버림)
+const TRACK_SEND_INTERVAL = 30000;
+const TRACK_BUFFER_MAX = 2000;
+const TRACK_BATCH_MAX = 1000;
+let _trackWatchId = null;
+let _trackRouteId = null;
+let _trackBuffer = [];
+
+function startTracking(routeId) {
+  if (!navigator.geolocation || _trackRouteId === routeId) return;
+  stopTracking();
+  _trackRouteId = routeId;
+  _trackWatchId = navigator.geolocation.watchPosition((pos) => {
+    _trackBuffer.push({
+      recorded_at: new Date(pos.timestamp).toISOString(),
+      latitude: pos.coords.latitude,
+      longitude: pos.coords.longitude,
+      accuracy: pos.coords.accuracy,
+    });
+    if (_trackBuffer.length > TRACK_BUFFER_MAX) _trackBuffer.splice(0, _trackBuffer.length - TRACK_BUFFER_MAX);
+  }, () => {}, { enableHighAccuracy: true, maximumAge: 5000 });
+}
+
+function stopTracking() {
+  if (_trackWatchId !== null) navigator.geolocation.clearWatch(_trackWatchId);
+  const last = _trackRouteId ? _sendTrack(_trackRouteId, _trackBuffer) : null;  // 남은 점은 이 루트로 마지막 전송
+  _trackWatchId = null;
+  _trackRouteId = null;
+  _trackBuffer = [];
+  return last;
+}
+
+function sendTrack() {
+  if (_trackRouteId) return _sendTrack(_trackRouteId, _trackBuffer);
+}
+
+async function _sendTrack(routeId, buffer) {
+  if (!buffer.length || !navigator.onLine) return;
+  const batch = buffer.slice(0, TRACK_BATCH_MAX);
+  try {
+    await api.tracks.send(routeId, batch);
+    buffer.splice(0, batch.length);
+  } catch (e) {
+    if (!isNetworkError(e) && e.status < 500) buffer.splice(0, batch.length);  // 권한 없음 등은 버림
+  }
+}
+
+setInterval(sendTrack, TRACK_SEND_INTERVAL);
+
 function renderRouteContext(stops) {
   const next = getNextStop(stops || []);
   window._nextRouteStop = next;
@@ -166,6 +224,7 @@ function renderRouteContext(stops) {
       <h3 style="margin:0 0 0.5rem">다음 목적지</h3>
       <p style="margin:0.25rem 0;font-weight:600">#${seqNum} ${escapeHtml(c.name || '거래처')}</p>
       <p style="color:var(--muted);font-size:0.9rem;margin:0.25rem 0">${escapeHtml(c.address || '-')}</p>
+      ${next.eta ? `<p style="margin:0.25rem 0;font-size:0.9rem">${etaText(next)}</p>` : ''}
       <p class="delivery-items-highlight" style="margin:0.5rem 0;font-size:1.05rem;font-weight:600;color:var(--highlight)">${escapeHtml(itemsStr(next))}</p>
       <p style="margin:0.5rem 0 0;display:flex;gap:0.5rem;flex-wrap:wrap">
         ${hasCoord ? '<button class="btn btn-secondary" onclick="openNextDestFullscreen()">다음 목적지</button>' : ''}
@@ -177,6 +236,11 @@ function renderRouteContext(stops) {
   }
 }
 
+function etaText(s) {
+  if (!s.eta) return '';
+  return '도착 예상 ' + new Date(s.eta).toLocaleTimeString('ko-KR', { hour: '2-digit', minute: '2-digit' });
+}
+
 function renderStopCard(s, isFirstUncompleted) {
   const name = escapeHtml(s.customer?.name || '거래처');
   const seqNum = (s.sequence || 0) + 1;
@@ -184,7 +248,7 @@ function renderStopCard(s, isFirstUncompleted) {
     ? '<span style="color:green">완료</span>'
     : isFirstUncompleted
       ? '<span style="color:var(--highlight)">배송중</span>'
-      : '<span style="color:var(--muted)">배송전</span>';
+      : `<span style="color:var(--muted)">${etaText(s) || '배송전'}</span>`;
   const bodyHtml = `
     <p style="margin:0.25rem 0;color:var(--muted);font-size:0.9rem">${escapeHtml((s.customer?.address || '')) || '-'}</p>
     <p class="delivery-items-highlight" style="margin:0.5rem 0;font-size:1.05rem;font-weight:600;color:var(--highlight)">${escapeHtml(itemsStr(s))}</p>
@@ -204,30 +268,168 @@ function renderStopCard(s, isFirstUncompleted) {
   `;
 }
 
+// 루트별 스탑 캐시 - 처음엔 전체, 이후엔 token 이후 변경분만 받아 병합. 오늘 날짜분은 IndexedDB에도 보관 (오프라인 표시용)
+const _routeCache = new Map();
+
+function _newRouteCache() {
+  return { token: null, stops: new Map(), orderItems: new Map(), completions: new Map() };
+}
+
+function _mergeRouteSync(routeId, delta) {
+  let cache = _routeCache.get(routeId);
+  if (!cache || delta.full) {
+    cache = _newRouteCache();
+    _routeCache.set(routeId, cache);
+  }
+  delta.stops.forEach(s => cache.stops.set(s.id, s));
+  delta.order_items.forEach(oi => cache.orderItems.set(oi.id, oi));
+  delta.completions.forEach(c => cache.completions.set(c.id, c));
+  delta.deleted.stops.forEach(id => cache.stops.delete(id));
+  delta.deleted.order_items.forEach(id => cache.orderItems.delete(id));
+  delta.deleted.completions.forEach(id => cache.completions.delete(id));
+  cache.token = delta.token;
+  cache.etas = delta.etas || {};
+  return cache;
+}
+
+// 열 형식 전체 로드(/compact) → sync 전체 응답과 같은 모양 (거래처/품목 조회표를 다시 펼침)
+function _expandCompactRoute(routeId, payload) {
+  const rows = (cols) => (cols?.id || []).map((_, i) => Object.fromEntries(Object.keys(cols).map(k => [k, cols[k][i]])));
+  const byId = (cols) => new Map(rows(cols).map(r => [r.id, r]));
+  const customers = byId(payload.customers);
+  const items = byId(payload.items);
+  const stops = rows(payload.stops);
+  const etas = {};
+  stops.forEach(s => { if (s.eta) etas[s.id] = s.eta; });
+  return {
+    token: payload.token,
+    full: true,
+    stops: stops.map(({ eta, is_completed, ...s }) => ({ ...s, route_id: routeId, customer: customers.get(s.customer_id) || null })),
+    order_items: rows(payload.order_items).map(oi => ({ ...oi, item: items.get(oi.item_id) || null })),
+    completions: rows(payload.completions).map(({ photo_ids, ...c }) => ({ ...c, photos: photo_ids.map(id => ({ id })) })),
+    deleted: { stops: [], order_items: [], completions: [] },
+    etas,
+  };
+}
+
+async function _restoreRouteCache(routeId) {
+  const saved = await offlineStore.loadRoute(routeId).catch(() => null);
+  // 다른 날 저장분은 버림 (거래처/품목 정보 변경은 증분 동기화에 포함되지 않음)
+  if (!saved || saved.date !== getLocalDateString()) return null;
+  const cache = _newRouteCache();
+  cache.token = saved.token;
+  saved.stops.forEach(s => cache.stops.set(s.id, s));
+  saved.order_items.forEach(oi => cache.orderItems.set(oi.id, oi));
+  saved.completions.forEach(c => cache.completions.set(c.id, c));
+  _routeCache.set(routeId, cache);
+  return cache;
+}
+
+function _persistRouteCache(routeId, cache) {
+  offlineStore.saveRoute({
+    route_id: routeId,
+    date: getLocalDateString(),
+    token: cache.token,
+    stops: [...cache.stops.values()],
+    order_items: [...cache.orderItems.values()],
+    completions: [...cache.completions.values()],
+  }).catch(() => {});
+}
+
+function _routeStopsFromCache(cache, pending = []) {
+  const byStop = (values) => {
+    const grouped = new Map();
+    values.forEach(v => {
+      if (!grouped.has(v.stop_id)) grouped.set(v.stop_id, []);
+      grouped.get(v.stop_id).push(v);
+    });
+    return grouped;
+  };
+  const items = byStop(cache.orderItems);
+  const completions = byStop(cache.completions);
+  // 전송 대기 중인 완료도 완료로 표시
+  const queued = byStop(pending.map(e => ({ id: e.client_key, stop_id: e.stop_id, photos: [], pending: true })));
+  return [...cache.stops.values()].map(s => {
+    const done = completions.get(s.id) || queued.get(s.id) || [];
+    const eta = done.length ? null : (cache.etas || {})[s.id] || null;
+    return { ...s, order_items: items.get(s.id) || [], completions: done, is_completed: done.length > 0, eta };
+  });
+}
+
 async function loadStops(routeId, planId) {
   window._currentRouteId = routeId;
   window._currentPlanId = planId;
-  const stops = await api.stops.listByRoute(routeId);
-  const sorted = [...(stops || [])].sort((a, b) => (a.sequence || 0) - (b.sequence || 0));
+  let cache = _routeCache.get(routeId) || await _restoreRouteCache(routeId);
+  try {
+    // 캐시가 없으면 열 형식으로 전체를 받고, 이후엔 token 이후 변경분만
+    const delta = cache?.token
+      ? await api.stops.syncByRoute(routeId, cache.token)
+      : _expandCompactRoute(routeId, await api.stops.compactByRoute(routeId));
+    cache = _mergeRouteSync(routeId, delta);
+    _persistRouteCache(routeId, cache);
+  } catch (e) {
+    if (!cache || !isNetworkError(e)) throw e;
+  }
+  const pending = (await offlineStore.outbox().catch(() => [])).filter(e => e.route_id === routeId);
+  const stops = _routeStopsFromCache(cache, pending);
+  const sorted = [...(stops || [])].sort((a, b) => (a.sequence || 0) - (b.sequence || 0) || a.id - b.id);
   const firstUncompleted = sorted.find(s => !s.is_completed);
   renderRouteContext(stops);
+  renderOfflineStatus();
   document.getElementById('stopsList').innerHTML = sorted.map(s =>
     renderStopCard(s, !!firstUncompleted && firstUncompleted.id === s.id)
   ).join('');
 }
 
+async function renderOfflineStatus() {
+  const el = document.getElementById('offlineStatus');
+  if (!el) return;
+  const count = (await offlineStore.outbox().catch(() => [])).length;
+  const parts = [];
+  if (!navigator.onLine) parts.push('오프라인');
+  if (count) parts.push(`완료 ${count}건 전송 대기`);
+  el.textContent = parts.join(' · ');
+  el.style.display = parts.length ? 'block' : 'none';
+}
+
+// 대기열 전송 후 현재 루트 다시 표시 - 연결 실패면 다음 기회(온라인 전환/주기 재시도)에
+async function syncOutbox() {
+  try {
+    const rejected = await flushOutbox();
+    if (rejected.length) {
+      alert('완료 처리되지 않은 스탑이 있습니다:\n' + rejected.map(e => `#${e.stop_id} ${e.detail || ''}`).join('\n'));
+    }
+  } catch (e) {
+    if (!isNetworkError(e)) console.warn('outbox flush failed', e);
+  }
+  if (window._currentRouteId && document.getElementById('routeSection').style.display !== 'none') {
+    await loadStops(window._currentRouteId, window._currentPlanId).catch(() => renderOfflineStatus());
+  } else {
+    renderOfflineStatus();
+  }
+}
+
+window.addEventListener('online', syncOutbox);
+window.addEventListener('offline', renderOfflineStatus);
+setInterval(async () => {
+  if (navigator.onLine && (await offlineStore.outbox().catch(() => [])).length) syncOutbox();
+}, 30000);
+
 async function completeStop(stopId) {
   if (!stopId || !window._currentRouteId) {
     alert('잘못된 요청입니다. 화면을 새로고침해주세요.');
     return;
   }
-  try {
-    await api.completions.complete(stopId, null);
-    await loadStops(window._currentRouteId, window._currentPlanId);
-  } catch (e) {
-    const msg = e?.detail || (e?.message || '') || '완료 처리 실패';
-    alert(typeof msg === 'string' ? msg : JSON.stringify(msg));
-  }
+  // 먼저 대기열에 넣고 전송 - 연결이 없으면 대기열에 남아 연결되면 자동 전송 (같은 키라 중복 완료 없음)
+  await offlineStore.enqueue({
+    client_key: newClientKey(),
+    stop_id: stopId,
+    route_id: window._currentRouteId,
+    memo: null,
+    completed_at: new Date().toISOString(),
+    photos: [],
+  });
+  await syncOutbox();
 }
 
 function _encodeKakaoName(name) {
@@ -354,6 +556,7 @@ async function completeFromNextDest() {
 }
 
 function backToPlans() {
+  stopTracking();
   document.getElementById('routeSection').style.display = 'none';
   document.getElementById('plansSection').style.display = 'block';
   loadPlans();
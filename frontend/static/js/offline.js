@@ -0,0 +1,101 @@
+// 기사 앱 오프라인 지원 - 서비스 워커 등록, IndexedDB 보관소(완료 대기열 outbox / 루트 스탑 캐시)
+const OFFLINE_DB = 'yummy-driver';
+const OFFLINE_DB_VERSION = 1;
+const SW_CACHE_PREFIX = 'yummy-driver';
+
+if ('serviceWorker' in navigator) {
+  window.addEventListener('load', () => {
+    navigator.serviceWorker.register('/sw.js').catch(() => {});
+  });
+}
+
+let _offlineDbPromise = null;
+
+function _openOfflineDb() {
+  if (!_offlineDbPromise) {
+    _offlineDbPromise = new Promise((resolve, reject) => {
+      const req = indexedDB.open(OFFLINE_DB, OFFLINE_DB_VERSION);
+      req.onupgradeneeded = () => {
+        const db = req.result;
+        if (!db.objectStoreNames.contains('outbox')) db.createObjectStore('outbox', { keyPath: 'client_key' });
+        if (!db.objectStoreNames.contains('routes')) db.createObjectStore('routes', { keyPath: 'route_id' });
+      };
+      req.onsuccess = () => resolve(req.result);
+      req.onerror = () => reject(req.error);
+    });
+  }
+  return _offlineDbPromise;
+}
+
+async function _idb(storeName, mode, fn) {
+  const db = await _openOfflineDb();
+  return new Promise((resolve, reject) => {
+    const tx = db.transaction(storeName, mode);
+    const req = fn(tx.objectStore(storeName));
+    tx.oncomplete = () => resolve(req.result);
+    tx.onerror = () => reject(tx.error);
+  });
+}
+
+const offlineStore = {
+  // outbox: { client_key, stop_id, route_id, memo, completed_at, photos: [Blob] }
+  outbox: () => _idb('outbox', 'readonly', s => s.getAll()),
+  enqueue: (entry) => _idb('outbox', 'readwrite', s => s.put(entry)),
+  dequeue: (clientKey) => _idb('outbox', 'readwrite', s => s.delete(clientKey)),
+  // routes: { route_id, date, token, stops, order_items, completions }
+  loadRoute: (routeId) => _idb('routes', 'readonly', s => s.get(routeId)),
+  saveRoute: (entry) => _idb('routes', 'readwrite', s => s.put(entry)),
+  clearRoutes: () => _idb('routes', 'readwrite', s => s.clear()),
+};
+
+function newClientKey() {
+  if (crypto.randomUUID) return crypto.randomUUID();
+  // http 접속(보안 컨텍스트 아님)에서는 randomUUID가 없음
+  return Array.from(crypto.getRandomValues(new Uint8Array(16)), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+function isNetworkError(e) {
+  return e instanceof TypeError;
+}
+
+let _flushing = null;
+
+// 대기 중인 완료를 replay로 한 번에 전송 (동시 호출은 하나로 합침). 반환: 재시도해도 안 되는 실패 항목
+function flushOutbox() {
+  if (!_flushing) _flushing = _flushOutbox().finally(() => { _flushing = null; });
+  return _flushing;
+}
+
+async function _flushOutbox() {
+  const pending = await offlineStore.outbox();
+  if (!pending.length || !navigator.onLine) return [];
+  const results = await api.completions.replay(pending.map(({ client_key, stop_id, memo, completed_at }) => (
+    { client_key, stop_id, memo, completed_at }
+  )));
+  const rejected = [];
+  for (const r of results) {
+    const entry = pending.find(e => e.client_key === r.client_key);
+    if (r.status === 'error') {
+      // 권한 없음/삭제된 스탑/다른 기기에서 이미 완료 등은 대기열에서 빼고 알림, 서버 오류는 다음에 재시도
+      if (r.status_code < 500) {
+        await offlineStore.dequeue(r.client_key);
+        rejected.push({ ...entry, detail: r.detail });
+      }
+      continue;
+    }
+    if (entry.photos?.length) {
+      await api.completions.uploadPhotos(entry.stop_id, entry.photos, entry.client_key);
+    }
+    await offlineStore.dequeue(r.client_key);
+  }
+  return rejected;
+}
+
+// 로그아웃 시 캐시된 화면/조회 응답과 루트 캐시 삭제 (전송 대기 중인 완료는 유지)
+async function clearOfflineCaches() {
+  if (window.caches) {
+    const keys = await caches.keys();
+    await Promise.all(keys.filter(k => k.startsWith(SW_CACHE_PREFIX)).map(k => caches.delete(k)));
+  }
+  await offlineStore.clearRoutes().catch(() => {});
+}
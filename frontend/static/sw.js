@@ -0,0 +1,67 @@
+// 기사 앱 서비스 워커 - 화면 파일은 캐시 우선(백그라운드 갱신), 기사 화면 조회 API는 네트워크 우선(실패 시 마지막 응답)
+const CACHE = 'yummy-driver-v1';
+const SHELL = [
+  '/driver.html',
+  '/js/api.js',
+  '/js/offline.js',
+  '/js/driver.js',
+  '/css/common.css',
+  '/manifest.json',
+];
+// 기사 화면이 여는 조회 API (스탑 증분 동기화는 토큰마다 URL이 달라 캐시하지 않고 IndexedDB에 보관)
+const API_CACHED = [
+  /^\/api\/auth\/me$/,
+  /^\/api\/config\/client$/,
+  /^\/api\/plans$/,
+  /^\/api\/routes\/plan\/\d+$/,
+];
+
+self.addEventListener('install', (event) => {
+  event.waitUntil(caches.open(CACHE).then(c => c.addAll(SHELL)).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', (event) => {
+  event.waitUntil(
+    caches.keys()
+      .then(keys => Promise.all(keys.filter(k => k.startsWith('yummy-driver') && k !== CACHE).map(k => caches.delete(k))))
+      .then(() => self.clients.claim())
+  );
+});
+
+async function networkFirst(request) {
+  const cache = await caches.open(CACHE);
+  try {
+    const response = await fetch(request);
+    if (response.ok) cache.put(request, response.clone());
+    return response;
+  } catch (e) {
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    throw e;
+  }
+}
+
+async function staleWhileRevalidate(request) {
+  const cache = await caches.open(CACHE);
+  const cached = await cache.match(request);
+  const update = fetch(request).then((response) => {
+    if (response.ok) cache.put(request, response.clone());
+    return response;
+  });
+  if (cached) {
+    update.catch(() => {});
+    return cached;
+  }
+  return update;
+}
+
+self.addEventListener('fetch', (event) => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+  if (API_CACHED.some(re => re.test(url.pathname))) {
+    event.respondWith(networkFirst(request));
+  } else if (SHELL.includes(url.pathname)) {
+    event.respondWith(staleWhileRevalidate(request));
+  }
+});